@@ -2,16 +2,22 @@
 from .metrics import (
     QuestionMetrics,
     SystemMetrics,
+    LatencyHistogram,
     AnalyticsTracker,
     get_analytics_tracker
 )
 from .storage import AnalyticsStorage, get_analytics_storage
+from .tracing import Trace, OTLPFileExporter, get_trace_exporter
 
 __all__ = [
     "QuestionMetrics",
     "SystemMetrics",
+    "LatencyHistogram",
     "AnalyticsTracker",
     "get_analytics_tracker",
     "AnalyticsStorage",
-    "get_analytics_storage"
+    "get_analytics_storage",
+    "Trace",
+    "OTLPFileExporter",
+    "get_trace_exporter"
 ]
@@ -6,6 +6,7 @@ from typing import Dict, List, Optional
 from datetime import datetime
 from pydantic import BaseModel
 from collections import defaultdict
+import threading
 import numpy as np
 
 
@@ -31,6 +32,56 @@ class SystemMetrics(BaseModel):
     questions_per_day: Dict[str, int]
 
 
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (milliseconds)."""
+    
+    # Upper bounds of the buckets; the last bucket is unbounded
+    BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+    
+    def __init__(self, counts: List[int] = None, total_ms: float = 0.0, max_ms: float = 0.0):
+        self.counts = counts or [0] * (len(self.BUCKETS_MS) + 1)
+        self.total_ms = total_ms
+        self.max_ms = max_ms  # Largest observation, reported for the unbounded bucket
+    
+    def record(self, value_ms: float):
+        """Add one observation (callers serialise access, see AnalyticsTracker)."""
+        self.counts[int(np.searchsorted(self.BUCKETS_MS, value_ms))] += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+    
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+    
+    def percentile(self, q: float) -> float:
+        """
+        Upper bound of the bucket containing the q-th percentile; the largest
+        observation for the unbounded bucket (always finite, JSON-safe).
+        """
+        if not self.count:
+            return 0.0
+        
+        rank = q / 100 * self.count
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        if index >= len(self.BUCKETS_MS):
+            return float(max(self.max_ms, self.BUCKETS_MS[-1]))
+        return float(self.BUCKETS_MS[index])
+    
+    def summary(self) -> Dict:
+        """Count, mean, percentile estimates and bucket counts."""
+        labels = [f"<={bound}" for bound in self.BUCKETS_MS] + [f">{self.BUCKETS_MS[-1]}"]
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_ms,
+            "overflow": self.counts[-1],
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+
 class AnalyticsTracker:
     """Tracks analytics for the RAG system."""
     
@@ -39,6 +90,8 @@ class AnalyticsTracker:
         self.questions: List[QuestionMetrics] = []
         self.risk_categories = defaultdict(int)
         self.confidence_bins = defaultdict(int)
+        self.stage_latencies: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self._lock = threading.Lock()  # Requests are tracked from QA worker threads
     
     def track_question(
         self,
@@ -62,12 +115,44 @@ class AnalyticsTracker:
             processing_time=processing_time
         )
         
-        self.questions.append(metrics)
-        self.risk_categories[risk_category] += 1
-        
         # Bin confidence score
         confidence_bin = self._get_confidence_bin(confidence_score)
-        self.confidence_bins[confidence_bin] += 1
+        
+        with self._lock:
+            self.questions.append(metrics)
+            self.risk_categories[risk_category] += 1
+            self.confidence_bins[confidence_bin] += 1
+    
+    def track_stage_timings(self, timings: Dict[str, float]):
+        """Add per-stage latencies (milliseconds) of one request to the histograms."""
+        with self._lock:
+            for stage, value_ms in timings.items():
+                self.stage_latencies[stage].record(value_ms)
+    
+    def get_stage_latency_stats(self) -> Dict[str, Dict]:
+        """Latency histogram summary per pipeline stage."""
+        return {
+            stage: histogram.summary()
+            for stage, histogram in sorted(self.snapshot()["stage_latencies"].items())
+        }
+    
+    def snapshot(self) -> Dict:
+        """Consistent copy of the tracked questions, counters and histograms (e.g. to save)."""
+        with self._lock:
+            return {
+                "questions": list(self.questions),
+                "risk_categories": dict(self.risk_categories),
+                "confidence_bins": dict(self.confidence_bins),
+                "stage_latencies": {
+                    stage: LatencyHistogram(list(histogram.counts), histogram.total_ms, histogram.max_ms)
+                    for stage, histogram in self.stage_latencies.items()
+                }
+            }
+    
+    def _get_questions(self) -> List[QuestionMetrics]:
+        """Copy of the tracked questions, safe to iterate while others are tracked."""
+        with self._lock:
+            return list(self.questions)
     
     def _get_confidence_bin(self, score: float) -> str:
         """Get confidence bin label."""
@@ -82,7 +167,9 @@ class AnalyticsTracker:
     
     def get_system_metrics(self) -> SystemMetrics:
         """Get aggregated system metrics."""
-        if not self.questions:
+        snapshot = self.snapshot()
+        questions = snapshot["questions"]
+        if not questions:
             return SystemMetrics(
                 total_questions=0,
                 avg_confidence=0.0,
@@ -93,58 +180,60 @@ class AnalyticsTracker:
             )
         
         # Calculate averages
-        confidences = [q.confidence_score for q in self.questions]
-        coverages = [q.evidence_coverage for q in self.questions]
+        confidences = [q.confidence_score for q in questions]
+        coverages = [q.evidence_coverage for q in questions]
         
         avg_confidence = np.mean(confidences)
         avg_coverage = np.mean(coverages)
         
         # Questions per day
         questions_per_day = defaultdict(int)
-        for q in self.questions:
+        for q in questions:
             date = q.timestamp.split('T')[0]
             questions_per_day[date] += 1
         
         return SystemMetrics(
-            total_questions=len(self.questions),
+            total_questions=len(questions),
             avg_confidence=float(avg_confidence),
             avg_evidence_coverage=float(avg_coverage),
-            risk_category_distribution=dict(self.risk_categories),
-            confidence_distribution=dict(self.confidence_bins),
+            risk_category_distribution=snapshot["risk_categories"],
+            confidence_distribution=snapshot["confidence_bins"],
             questions_per_day=dict(questions_per_day)
         )
     
     def get_recent_questions(self, limit: int = 10) -> List[QuestionMetrics]:
         """Get recent questions."""
-        return self.questions[-limit:]
+        with self._lock:
+            return self.questions[-limit:]
     
     def get_questions_by_category(self, category: str) -> List[QuestionMetrics]:
         """Get all questions for a specific risk category."""
-        return [q for q in self.questions if q.risk_category == category]
+        return [q for q in self._get_questions() if q.risk_category == category]
     
     def get_confidence_vs_coverage_stats(self) -> Dict:
         """Analyze relationship between confidence and evidence coverage."""
-        if not self.questions:
+        questions = self._get_questions()
+        if not questions:
             return {
                 "correlation": 0.0,
                 "high_confidence_high_coverage": 0,
                 "low_confidence_low_coverage": 0
             }
         
-        confidences = [q.confidence_score for q in self.questions]
-        coverages = [q.evidence_coverage for q in self.questions]
+        confidences = [q.confidence_score for q in questions]
+        coverages = [q.evidence_coverage for q in questions]
         
         # Calculate correlation
         correlation = np.corrcoef(confidences, coverages)[0, 1]
         
         # Count quadrants
         high_conf_high_cov = sum(
-            1 for q in self.questions
+            1 for q in questions
             if q.confidence_score >= 0.7 and q.evidence_coverage >= 0.7
         )
         
         low_conf_low_cov = sum(
-            1 for q in self.questions
+            1 for q in questions
             if q.confidence_score < 0.5 and q.evidence_coverage < 0.5
         )
         
@@ -152,17 +241,20 @@ class AnalyticsTracker:
             "correlation": float(correlation) if not np.isnan(correlation) else 0.0,
             "high_confidence_high_coverage": high_conf_high_cov,
             "low_confidence_low_coverage": low_conf_low_cov,
-            "total_questions": len(self.questions)
+            "total_questions": len(questions)
         }
 
 
 # Global analytics tracker
 _analytics_tracker = None
+_analytics_tracker_lock = threading.Lock()
 
 
 def get_analytics_tracker() -> AnalyticsTracker:
     """Get or create the global analytics tracker instance."""
     global _analytics_tracker
     if _analytics_tracker is None:
-        _analytics_tracker = AnalyticsTracker()
+        with _analytics_tracker_lock:
+            if _analytics_tracker is None:
+                _analytics_tracker = AnalyticsTracker()
     return _analytics_tracker
@@ -3,10 +3,12 @@ Storage for analytics data.
 Simple JSON-based storage (can be upgraded to PostgreSQL).
 """
 import json
+import os
+import threading
 from pathlib import Path
 from typing import List
 from config import settings
-from analytics.metrics import QuestionMetrics, AnalyticsTracker
+from analytics.metrics import QuestionMetrics, AnalyticsTracker, LatencyHistogram
 
 
 class AnalyticsStorage:
@@ -16,17 +18,30 @@ class AnalyticsStorage:
         """Initialize storage."""
         self.storage_path = storage_path or settings.ANALYTICS_DIR / "analytics.json"
         self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()  # Saves run on QA worker threads
     
     def save(self, tracker: AnalyticsTracker):
-        """Save analytics data."""
-        data = {
-            "questions": [q.model_dump() for q in tracker.questions],
-            "risk_categories": dict(tracker.risk_categories),
-            "confidence_bins": dict(tracker.confidence_bins)
-        }
-        
-        with open(self.storage_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        """
+        Save analytics data.
+        Written to a temporary file and renamed into place, so readers never
+        see a partial file; concurrent saves are serialised, newest last.
+        """
+        with self._lock:
+            snapshot = tracker.snapshot()
+            data = {
+                "questions": [q.model_dump() for q in snapshot["questions"]],
+                "risk_categories": snapshot["risk_categories"],
+                "confidence_bins": snapshot["confidence_bins"],
+                "stage_latencies": {
+                    stage: {"counts": histogram.counts, "total_ms": histogram.total_ms, "max_ms": histogram.max_ms}
+                    for stage, histogram in snapshot["stage_latencies"].items()
+                }
+            }
+            
+            tmp_path = self.storage_path.with_name(self.storage_path.name + ".tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.storage_path)
     
     def load(self, tracker: AnalyticsTracker):
         """Load analytics data."""
@@ -44,15 +59,23 @@ class AnalyticsStorage:
         # Restore counters
         tracker.risk_categories.update(data.get("risk_categories", {}))
         tracker.confidence_bins.update(data.get("confidence_bins", {}))
+        
+        # Restore latency histograms (ignored if the bucket layout changed)
+        for stage, histogram in data.get("stage_latencies", {}).items():
+            if len(histogram["counts"]) == len(LatencyHistogram.BUCKETS_MS) + 1:
+                tracker.stage_latencies[stage] = LatencyHistogram(**histogram)
 
 
 # Global storage instance
 _analytics_storage = None
+_analytics_storage_lock = threading.Lock()
 
 
 def get_analytics_storage() -> AnalyticsStorage:
     """Get or create the global analytics storage instance."""
     global _analytics_storage
     if _analytics_storage is None:
-        _analytics_storage = AnalyticsStorage()
+        with _analytics_storage_lock:
+            if _analytics_storage is None:
+                _analytics_storage = AnalyticsStorage()
     return _analytics_storage
@@ -0,0 +1,175 @@
+"""
+Lightweight tracing of the QA pipeline.
+Each request records a trace of timed spans (one per pipeline stage); finished
+traces can be exported as OpenTelemetry OTLP/JSON lines to a local file.
+"""
+from typing import Dict, List, Optional
+from contextlib import contextmanager
+from pathlib import Path
+import json
+import os
+import threading
+import time
+from config import settings
+
+
+class Span:
+    """A timed operation within a trace."""
+    
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "end_ns", "attributes")
+    
+    def __init__(self, name: str, parent_id: Optional[str] = None, attributes: Dict = None):
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes or {}
+    
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+
+class Trace:
+    """Spans recorded while handling one request."""
+    
+    def __init__(self, name: str = "request", **attributes):
+        """
+        Start a trace with its root span.
+        
+        Args:
+            name: Name of the root span
+            attributes: Attributes of the root span
+        """
+        self.trace_id = os.urandom(16).hex()
+        self.root = Span(name, attributes=attributes)
+        self.spans: List[Span] = [self.root]
+        
+        # Open spans per thread, so stages running in parallel nest correctly
+        self._local = threading.local()
+    
+    @property
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = [self.root]
+        return stack
+    
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Time a block of code as a child of this thread's innermost open span."""
+        stack = self._stack
+        span = Span(name, parent_id=stack[-1].span_id, attributes=attributes)
+        self.spans.append(span)
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            span.end_ns = time.time_ns()
+            stack.pop()
+    
+    def finish(self) -> "Trace":
+        """End the root span and export the trace if an exporter is configured."""
+        if self.root.end_ns is None:
+            self.root.end_ns = time.time_ns()
+            exporter = get_trace_exporter()
+            if exporter is not None:
+                exporter.export(self)
+        return self
+    
+    def timings(self) -> Dict[str, float]:
+        """
+        Milliseconds spent per stage (repeated stages are summed), plus the
+        total. Stages that ran in parallel overlap, so they can add up to
+        more than the total.
+        """
+        timings = {}
+        for span in self.spans[1:]:
+            timings[span.name] = timings.get(span.name, 0.0) + span.duration_ms
+        timings["total"] = self.root.duration_ms
+        return timings
+
+
+class OTLPFileExporter:
+    """
+    Appends traces to a file as OTLP/JSON, one ExportTraceServiceRequest per
+    line (the format of the OpenTelemetry Collector file exporter, readable
+    by its otlpjsonfile receiver).
+    """
+    
+    def __init__(self, path: Path = None, service_name: str = None):
+        """
+        Initialize exporter.
+        
+        Args:
+            path: File to append traces to
+            service_name: service.name resource attribute
+        """
+        self.path = path or settings.TRACE_EXPORT_PATH
+        self.service_name = service_name or settings.APP_NAME
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+    
+    def export(self, trace: Trace):
+        """Append one finished trace."""
+        request = {
+            "resourceSpans": [{
+                "resource": {
+                    "attributes": _attributes({"service.name": self.service_name})
+                },
+                "scopeSpans": [{
+                    "scope": {"name": "axiom.qa"},
+                    "spans": [self._span(trace, span) for span in trace.spans]
+                }]
+            }]
+        }
+        line = json.dumps(request, separators=(",", ":"))
+        
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line + "\n")
+    
+    def _span(self, trace: Trace, span: Span) -> Dict:
+        return {
+            "traceId": trace.trace_id,
+            "spanId": span.span_id,
+            "parentSpanId": span.parent_id or "",
+            "name": span.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns or span.start_ns),
+            "attributes": _attributes(span.attributes)
+        }
+
+
+def _attributes(values: Dict) -> List[Dict]:
+    """Convert a dict to OTLP key/value attributes."""
+    attributes = []
+    for key, value in values.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        attributes.append({"key": key, "value": typed})
+    return attributes
+
+
+# Global trace exporter instance
+_trace_exporter = None
+_trace_exporter_lock = threading.Lock()
+
+
+def get_trace_exporter() -> Optional[OTLPFileExporter]:
+    """Get or create the global trace exporter (None if exporting is disabled)."""
+    global _trace_exporter
+    if _trace_exporter is None and settings.TRACE_EXPORT_ENABLED:
+        with _trace_exporter_lock:
+            if _trace_exporter is None:
+                _trace_exporter = OTLPFileExporter()
+    return _trace_exporter
@@ -4,6 +4,10 @@ Analytics API endpoints.
 from fastapi import APIRouter, HTTPException
 
 from analytics import get_analytics_tracker
+from rag.answer_cache import get_answer_cache
+from rag.qa_engine import get_existing_qa_engine
+from rag.qa_executor import get_qa_executor
+from retrieval.reranker import get_reranker
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
@@ -70,3 +74,100 @@ async def get_confidence_distribution():
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/cache")
+async def get_cache_stats():
+    """Get answer cache hit-rate statistics."""
+    try:
+        cache = get_answer_cache()
+        
+        return {
+            "status": "success",
+            "cache": cache.get_stats()
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/generation")
+async def get_generation_stats():
+    """Get generation batching statistics (batch sizes and queue wait)."""
+    try:
+        # Loading the engine here would block the event loop on model loading
+        engine = get_existing_qa_engine()
+        if engine is None:
+            return {"status": "success", "generation": {"started": False}}
+        scheduler = engine.generation_scheduler
+        
+        return {
+            "status": "success",
+            "generation": scheduler.get_stats() if scheduler else {"enabled": False}
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/coalescing")
+async def get_coalescing_stats():
+    """Get single-flight statistics (identical in-flight questions answered once)."""
+    try:
+        engine = get_existing_qa_engine()
+        if engine is None:
+            return {"status": "success", "coalescing": {"started": False}}
+        single_flight = engine.single_flight
+        
+        return {
+            "status": "success",
+            "coalescing": single_flight.get_stats() if single_flight else {"enabled": False}
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/executor")
+async def get_executor_stats():
+    """Get QA executor queue depth, utilisation and rejection statistics."""
+    try:
+        executor = get_qa_executor()
+        
+        return {
+            "status": "success",
+            "executor": executor.get_stats()
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/reranking")
+async def get_reranking_stats():
+    """Get cross-encoder score cache and latency statistics."""
+    try:
+        cross_encoder = get_reranker().cross_encoder
+        
+        return {
+            "status": "success",
+            "reranking": cross_encoder.get_stats() if cross_encoder else {"enabled": False}
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/latency")
+async def get_stage_latency_stats():
+    """Get per-stage latency histograms of the QA pipeline."""
+    try:
+        tracker = get_analytics_tracker()
+        
+        return {
+            "status": "success",
+            "stages": tracker.get_stage_latency_stats()
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -9,22 +9,11 @@ import uuid
 import shutil
 
 from config import settings
-from ingestion import (
-    DocumentProcessor,
-    SemanticChunker,
-    get_embedding_generator
-)
+from ingestion import get_ingestion_pipeline
 from retrieval import get_vector_store
 
 router = APIRouter(prefix="/api/documents", tags=["documents"])
 
-# Initialize components
-doc_processor = DocumentProcessor()
-chunker = SemanticChunker(
-    chunk_size=settings.CHUNK_SIZE,
-    overlap=settings.CHUNK_OVERLAP
-)
-
 
 @router.post("/upload")
 async def upload_document(file: UploadFile = File(...)):
@@ -33,6 +22,12 @@ async def upload_document(file: UploadFile = File(...)):
     
     Returns document metadata and processing status.
     """
+    if settings.REPLICA_MODE:
+        raise HTTPException(
+            status_code=403,
+            detail="This node is a read-only replica; upload documents to the writer node"
+        )
+    
     try:
         # Validate file type
         allowed_extensions = {".pdf", ".docx", ".md", ".txt"}
@@ -51,41 +46,32 @@ async def upload_document(file: UploadFile = File(...)):
         with open(file_path, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
         
-        # Process document
-        processed_doc = doc_processor.process_file(file_path)
-        
-        # Chunk document
-        chunks = chunker.chunk_with_context(
-            processed_doc.sections,
-            processed_doc.metadata.model_dump()
-        )
+        # Process, chunk, embed and index (only changed chunks of a revised document)
+        pipeline = get_ingestion_pipeline()
+        result = pipeline.ingest_file(file_path, filename=file.filename)
         
-        # Generate embeddings
-        embedding_gen = get_embedding_generator()
-        texts = [chunk.text for chunk in chunks]
-        embeddings = embedding_gen.generate_embeddings(texts)
-        
-        # Store in vector database
-        vector_store = get_vector_store()
-        chunk_data = [
-            {
-                "chunk_id": chunk.chunk_id,
-                "text": chunk.text,
-                "section_title": chunk.section_title
+        if result.duplicate_of:
+            # Identical content is already indexed; don't keep a second copy
+            file_path.unlink()
+            return {
+                "status": "duplicate",
+                "filename": file.filename,
+                "duplicate_of": result.duplicate_of,
+                "chunks_created": 0,
+                "message": "Document content is already indexed"
             }
-            for chunk in chunks
-        ]
-        metadata_list = [chunk.metadata for chunk in chunks]
-        
-        vector_store.add_documents(embeddings, chunk_data, metadata_list)
-        vector_store.save()
         
         return {
             "status": "success",
             "file_id": file_id,
             "filename": file.filename,
-            "metadata": processed_doc.metadata.model_dump(),
-            "chunks_created": len(chunks),
+            "metadata": result.metadata,
+            "chunks_created": result.chunks_created,
+            "chunks_embedded": result.chunks_embedded,
+            "chunks_reused": result.chunks_reused,
+            "chunks_retired": result.chunks_retired,
+            "chunks_suppressed": result.chunks_suppressed,
+            "replaced_document": result.replaced_document,
             "message": "Document processed and indexed successfully"
         }
     
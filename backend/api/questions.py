@@ -2,10 +2,21 @@
 Question answering API endpoints.
 """
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from typing import Optional
+import asyncio
+import json
+import threading
+import time
 import uuid
 
-from rag import QuestionRequest, get_qa_engine
+from rag import (
+    QuestionRequest,
+    BatchQuestionRequest,
+    QueueFullError,
+    get_qa_engine,
+    get_qa_executor
+)
 from analytics import get_analytics_tracker, get_analytics_storage
 
 router = APIRouter(prefix="/api/questions", tags=["questions"])
@@ -17,54 +28,231 @@ async def ask_question(request: QuestionRequest):
     Ask a governance question and get an evidence-based answer.
     
     Returns structured response with answer, citations, and confidence.
+    Responds 429 with Retry-After when the request's lane is saturated.
+    With a deadline, lists the steps degraded to meet it.
     """
+    received_at = time.time()
     try:
-        # Get QA engine
-        qa_engine = get_qa_engine()
-        
-        # Answer question
-        response = qa_engine.answer_question(
-            question=request.question,
-            filters=request.filters,
-            top_k=request.top_k or 5
+        # Answer on the bounded QA executor, keeping the event loop free
+        response = await get_qa_executor().run(
+            _answer,
+            request,
+            received_at,
+            lane=request.priority
         )
         
-        # Track analytics
-        if response.response:
-            tracker = get_analytics_tracker()
-            question_id = str(uuid.uuid4())
-            
-            tracker.track_question(
-                question_id=question_id,
-                question=request.question,
-                risk_category=response.response.risk_category.value,
-                confidence_score=response.response.confidence_score,
-                evidence_coverage=response.response.evidence_coverage or 0.0,
-                retrieved_chunks=response.retrieved_chunks,
-                processing_time=response.processing_time
-            )
-            
-            # Save analytics
-            storage = get_analytics_storage()
-            storage.save(tracker)
+        _track_response(request.question, response)
         
-        return {
-            "status": "success",
-            "question": response.question,
-            "answer": response.response.answer,
-            "risk_category": response.response.risk_category.value,
-            "confidence_score": response.response.confidence_score,
-            "citations": [c.model_dump() for c in response.response.citations],
-            "limitations": response.response.limitations,
-            "evidence_coverage": response.response.evidence_coverage,
-            "retrieved_chunks": response.retrieved_chunks,
-            "processing_time": response.processing_time
-        }
+        return {"status": "success", **_response_payload(response, request.debug)}
+    
+    except QueueFullError as e:
+        raise _too_many_requests(e)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/ask/stream")
+async def ask_question_stream(request: QuestionRequest):
+    """
+    Ask a governance question and stream the answer as server-sent events.
+    
+    Events, in order:
+        retrieval: citations and retrieval metadata, sent once reranking is done
+        token: a piece of generated answer text (repeated)
+        final: the complete response, as returned by /ask
+        error: sent instead of the remaining events if answering fails
+    """
+    received_at = time.time()
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    disconnected = threading.Event()
+    
+    def publish(message: Optional[str]):
+        loop.call_soon_threadsafe(events.put_nowait, message)
+    
+    def produce():
+        stream = None
+        try:
+            stream = get_qa_engine().stream_answer(
+                question=request.question,
+                filters=request.filters,
+                top_k=request.top_k or 5,
+                answer_mode=request.answer_mode,
+                deadline_ms=request.deadline_ms,
+                received_at=received_at
+            )
+            for event, payload in stream:
+                if disconnected.is_set():
+                    break
+                if event == "final":
+                    _track_response(request.question, payload)
+                    payload = _response_payload(payload, request.debug)
+                publish(_sse(event, payload))
+        except Exception as e:
+            publish(_sse("error", {"detail": str(e)}))
+        finally:
+            # Stops generation and frees the worker if the client went away
+            if stream is not None:
+                stream.close()
+            publish(None)
+    
+    # Admission is decided before the stream starts, so a saturated
+    # lane is still reported as 429
+    try:
+        get_qa_executor().submit(produce, lane=request.priority)
+    except QueueFullError as e:
+        raise _too_many_requests(e)
+    
+    async def event_stream():
+        try:
+            while True:
+                message = await events.get()
+                if message is None:
+                    break
+                yield message
+        finally:
+            # Runs when the client disconnects, too
+            disconnected.set()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/batch")
+async def ask_questions_batch(request: BatchQuestionRequest):
+    """
+    Answer many questions at once, streaming results as NDJSON.
+    
+    Questions share batched embedding, search, generation and
+    classification calls. Each line is one answered question with its
+    index in the request, in completion order; a failure ends the stream
+    with an error line. Runs on the batch lane (429 when saturated).
+    """
+    loop = asyncio.get_running_loop()
+    lines = asyncio.Queue()
+    
+    def publish(line: Optional[str]):
+        loop.call_soon_threadsafe(lines.put_nowait, line)
+    
+    def produce():
+        tracker = get_analytics_tracker()
+        try:
+            for index, response in get_qa_engine().answer_batch(
+                questions=request.questions,
+                filters=request.filters,
+                top_k=request.top_k or 5,
+                answer_mode=request.answer_mode
+            ):
+                _track_response(request.questions[index], response, save=False)
+                publish(_ndjson({"index": index, "status": "success", **_response_payload(response)}))
+        except Exception as e:
+            publish(_ndjson({"status": "error", "detail": str(e)}))
+        finally:
+            get_analytics_storage().save(tracker)
+            publish(None)
+    
+    try:
+        get_qa_executor().submit(produce, lane="batch")
+    except QueueFullError as e:
+        raise _too_many_requests(e)
+    
+    async def line_stream():
+        while True:
+            line = await lines.get()
+            if line is None:
+                break
+            yield line
+    
+    return StreamingResponse(
+        line_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _answer(request: QuestionRequest, received_at: float):
+    """Answer a question request (runs on a QA executor worker)."""
+    return get_qa_engine().answer_question(
+        question=request.question,
+        filters=request.filters,
+        top_k=request.top_k or 5,
+        answer_mode=request.answer_mode,
+        deadline_ms=request.deadline_ms,
+        received_at=received_at
+    )
+
+
+def _too_many_requests(error: QueueFullError) -> HTTPException:
+    """429 response telling the client when to retry."""
+    return HTTPException(
+        status_code=429,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+
+def _sse(event: str, data) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _ndjson(data) -> str:
+    """Format one newline-delimited JSON record."""
+    return json.dumps(data) + "\n"
+
+
+def _track_response(question: str, response, save: bool = True):
+    """Record an answered question in analytics."""
+    if not response.response:
+        return
+    
+    tracker = get_analytics_tracker()
+    question_id = str(uuid.uuid4())
+    
+    tracker.track_question(
+        question_id=question_id,
+        question=question,
+        risk_category=response.response.risk_category.value,
+        confidence_score=response.response.confidence_score,
+        evidence_coverage=response.response.evidence_coverage or 0.0,
+        retrieved_chunks=response.retrieved_chunks,
+        processing_time=response.processing_time
+    )
+    
+    if response.timings:
+        tracker.track_stage_timings(response.timings)
+    
+    # Save analytics
+    if save:
+        storage = get_analytics_storage()
+        storage.save(tracker)
+
+
+def _response_payload(response, debug: bool = False) -> dict:
+    """JSON body for an answered question (with stage timings in debug mode)."""
+    payload = {
+        "question": response.question,
+        "answer": response.response.answer,
+        "risk_category": response.response.risk_category.value,
+        "confidence_score": response.response.confidence_score,
+        "citations": [c.model_dump() for c in response.response.citations],
+        "limitations": response.response.limitations,
+        "evidence_coverage": response.response.evidence_coverage,
+        "retrieved_chunks": response.retrieved_chunks,
+        "processing_time": response.processing_time,
+        "cache_hit": response.cache_hit,
+        "answer_mode": response.answer_mode,
+        "degradations": response.degradations
+    }
+    if debug:
+        payload["timings"] = response.timings
+    return payload
+
+
 @router.get("/history")
 async def get_question_history(limit: int = 10):
     """Get recent question history."""
@@ -13,10 +13,14 @@ class Settings(BaseSettings):
     APP_NAME: str = "Axiom"
     APP_VERSION: str = "1.0.0"
     DEBUG: bool = False
+    EAGER_WARMUP: bool = False  # Load models and answer a dummy question at startup (gates /ready)
+    WARMUP_QUESTION: str = "What are the key risks of deploying a machine learning model?"
     
     # API Configuration
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
+    API_WORKERS: int = 4  # Worker processes when served by gunicorn (gunicorn.conf.py)
+    MULTI_WORKER_MODE: bool = False  # Workers serve one memory-mapped index snapshot
     CORS_ORIGINS: list[str] = ["http://localhost:3000", "https://*.vercel.app"]
     
     # Paths
@@ -24,11 +28,15 @@ class Settings(BaseSettings):
     DATA_DIR: Path = BASE_DIR / "data"
     UPLOAD_DIR: Path = DATA_DIR / "uploads"
     VECTOR_STORE_DIR: Path = DATA_DIR / "vector_store"
+    SHARED_INDEX_DIR: Path = VECTOR_STORE_DIR / "shared"  # Snapshots mapped by all workers
     ANALYTICS_DIR: Path = DATA_DIR / "analytics"
+    ONNX_MODEL_DIR: Path = DATA_DIR / "onnx"
     
     # Model Configuration
     EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
     LLM_MODEL: str = "google/flan-t5-base"  # Local model
+    GENERATION_BACKEND: str = "pipeline"  # "pipeline" (fp32), "int8" (dynamic quantisation) or "onnx"
+    GENERATION_STREAM_TIMEOUT_SECONDS: float = 60.0  # Longest wait for the next streamed text before failing
     USE_OPENAI: bool = False
     OPENAI_API_KEY: Optional[str] = None
     
@@ -36,22 +44,83 @@ class Settings(BaseSettings):
     VECTOR_DIMENSION: int = 384  # For all-MiniLM-L6-v2
     TOP_K_RETRIEVAL: int = 5
     SIMILARITY_THRESHOLD: float = 0.7
+    VECTOR_STORE_RELOAD_SECONDS: float = 5.0  # How often to check for a store saved by another process; 0 disables
+    
+    # Read replicas
+    SNAPSHOT_BUNDLE_DIR: Optional[Path] = None  # Writer publishes a bundle per saved version here
+    SNAPSHOT_BUNDLES_KEPT: int = 3
+    REPLICA_MODE: bool = False  # Serve read-only from bundles pulled from SNAPSHOT_BUNDLE_DIR
+    REPLICA_PULL_SECONDS: float = 10.0
+    
+    # Reranking
+    CROSS_ENCODER_ENABLED: bool = False  # Rerank with a cross-encoder instead of the keyword heuristic
+    CROSS_ENCODER_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    CROSS_ENCODER_INT8: bool = False  # Dynamically quantise the cross-encoder's Linear layers to int8
+    CROSS_ENCODER_MAX_CANDIDATES: int = 20  # Vector hits scored per question (at least top_k)
+    CROSS_ENCODER_MAX_LENGTH: int = 512  # Tokens of query and chunk together
+    CROSS_ENCODER_BUDGET_MS: Optional[float] = None  # Fall back to the heuristic when scoring would take longer
+    CROSS_ENCODER_CACHE_SIZE: int = 10000  # Cached (query, chunk) scores
     
     # Chunking
+    CHUNKING_STRATEGY: str = "characters"  # "characters" or "tokens"
     CHUNK_SIZE: int = 512
     CHUNK_OVERLAP: int = 50
+    CHUNK_MAX_TOKENS: Optional[int] = None  # Defaults to the embedding model's max sequence length
+    CHUNK_TOKEN_OVERLAP: int = 32
+    
+    # Ingestion
+    INCREMENTAL_INGESTION: bool = True  # Re-embed only changed chunks of a revised document
+    DEDUPLICATE_UPLOADS: bool = True  # Skip files whose content is already indexed
+    NEAR_DUPLICATE_DETECTION: bool = True  # Index near-identical chunks only once
+    NEAR_DUPLICATE_THRESHOLD: float = 0.9  # Estimated Jaccard similarity of word shingles
+    MINHASH_PERMUTATIONS: int = 128
+    LSH_BANDS: int = 16
     
     # RAG Configuration
-    MAX_CONTEXT_LENGTH: int = 2048
+    MAX_CONTEXT_LENGTH: int = 2048  # Characters; only used when the generator has no tokenizer
+    LLM_MAX_INPUT_TOKENS: int = 512  # Prompt token budget (flan-t5 was trained on 512-token inputs)
     TEMPERATURE: float = 0.1
     MAX_TOKENS: int = 512
     
+    # Answer modes
+    EXTRACTIVE_MAX_SENTENCES: int = 3
+    AUTO_LATENCY_BUDGET_MS: float = 5000.0  # Auto mode extracts if generation would exceed this
+    AUTO_MAX_GENERATION_QUEUE: int = 8  # Auto mode extracts when this many prompts await generation
+    
+    # Latency deadlines (stages degrade to fit the remaining budget)
+    QA_DEFAULT_DEADLINE_MS: Optional[float] = None  # Deadline of requests that set none; None disables
+    DEADLINE_MIN_NEW_TOKENS: int = 32  # Below this token cap, answer extractively instead
+    
+    # Generation batching
+    GENERATION_BATCHING: bool = True  # Batch prompts of concurrent requests
+    GENERATION_MAX_BATCH_SIZE: int = 8
+    GENERATION_BATCH_WAIT_MS: float = 20.0  # How long a prompt waits for others to join its batch
+    GENERATION_LENGTH_TOLERANCE: float = 0.5  # Max relative prompt length difference within a batch
+    
+    # Answer cache
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_MAX_SIZE: int = 1000
+    ANSWER_CACHE_TTL_SECONDS: float = 3600.0
+    ANSWER_CACHE_SEMANTIC: bool = True  # Serve paraphrases of cached questions
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = 0.95  # Cosine similarity of question embeddings
+    SINGLE_FLIGHT_ENABLED: bool = True  # Identical in-flight questions wait for one shared answer (while their deadline allows)
+    
+    # QA execution
+    QA_MAX_CONCURRENCY: int = 8  # Questions answered in parallel (lets generation batches fill)
+    QA_MAX_QUEUE: int = 16  # Waiting interactive questions before answering 429
+    QA_BATCH_MAX_QUEUE: int = 64  # Waiting batch questions before answering 429
+    BATCH_MAX_QUESTIONS: int = 500  # Questions per /api/questions/batch request
+    QA_STAGE_WORKERS: int = 16  # Threads running independent pipeline stages alongside generation
+    
     # Risk Classification
     CONFIDENCE_THRESHOLD: float = 0.6
+    RISK_PROTOTYPE_CACHE_DIR: Path = DATA_DIR / "risk"  # Category prototype embeddings, per embedding model
     MIN_EVIDENCE_CHUNKS: int = 2
     
     # Analytics
     ENABLE_ANALYTICS: bool = True
+    TRACE_EXPORT_ENABLED: bool = False  # Append per-request traces as OTLP/JSON lines
+    TRACE_EXPORT_PATH: Path = ANALYTICS_DIR / "traces.jsonl"
     
     class Config:
         env_file = ".env"
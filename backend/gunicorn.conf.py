@@ -0,0 +1,29 @@
+"""
+Gunicorn configuration for serving with several worker processes.
+Models are loaded once in the master and shared copy-on-write by the forked
+workers; the vector store is served from one memory-mapped snapshot.
+
+Usage:
+    MULTI_WORKER_MODE=true gunicorn -c gunicorn.conf.py main:app
+"""
+from config import settings
+
+
+bind = f"{settings.API_HOST}:{settings.API_PORT}"
+workers = settings.API_WORKERS
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import the app in the master, before forking workers
+preload_app = True
+
+# Model loading and warm-up can take a while on the first request
+timeout = 120
+
+
+def when_ready(server):
+    """Load model weights in the master once, right before workers are forked."""
+    if not settings.MULTI_WORKER_MODE:
+        server.log.warning("MULTI_WORKER_MODE is off: workers will not share the vector store")
+    
+    from rag.warmup import preload_models
+    preload_models()
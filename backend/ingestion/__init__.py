@@ -1,14 +1,33 @@
 """Init file for ingestion module."""
 from .document_processor import DocumentProcessor, ProcessedDocument, DocumentMetadata
-from .chunking import SemanticChunker, Chunk
+from .chunking import SemanticChunker, TokenAwareChunker, Chunk, get_chunker
 from .embeddings import EmbeddingGenerator, get_embedding_generator
+from .keyword_matcher import KeywordMatcher
+from .term_features import extract_terms, term_fields
+from .pipeline import (
+    IngestionPipeline,
+    IngestionResult,
+    PreparedDocument,
+    prepare_document,
+    get_ingestion_pipeline
+)
 
 __all__ = [
     "DocumentProcessor",
     "ProcessedDocument",
     "DocumentMetadata",
     "SemanticChunker",
+    "TokenAwareChunker",
     "Chunk",
+    "get_chunker",
     "EmbeddingGenerator",
-    "get_embedding_generator"
+    "get_embedding_generator",
+    "KeywordMatcher",
+    "extract_terms",
+    "term_fields",
+    "IngestionPipeline",
+    "IngestionResult",
+    "PreparedDocument",
+    "prepare_document",
+    "get_ingestion_pipeline"
 ]
@@ -0,0 +1,252 @@
+"""
+Offline bulk indexer for document corpora.
+Walks a directory tree, prepares documents in parallel worker processes,
+embeds and indexes them in the main process, and checkpoints progress so
+an interrupted run resumes where it left off.
+
+Usage (from the backend directory):
+    python -m ingestion.bulk_indexer ../sample_data --workers 4
+"""
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+
+from config import settings
+from ingestion.chunking import get_chunker
+from ingestion.deduplication import file_hash
+from ingestion.document_processor import DocumentProcessor
+from ingestion.pipeline import IngestionPipeline, PreparedDocument, prepare_document
+from retrieval.vector_store import VectorStore
+
+
+SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".md", ".txt"}
+CHECKPOINT_FILENAME = "bulk_index_checkpoint.json"
+
+# Per-process state of worker processes
+_worker_processor = None
+_worker_chunker = None
+
+
+def _init_worker(chunker):
+    """Set up a worker process with its own processor and the parent's chunker."""
+    global _worker_processor, _worker_chunker
+    _worker_processor = DocumentProcessor()
+    _worker_chunker = chunker
+
+
+def _prepare_in_worker(
+    file_path: Path,
+    filename: str,
+    digest: str
+) -> Tuple[Optional[PreparedDocument], Optional[str]]:
+    """Prepare one document; errors are returned rather than raised."""
+    try:
+        prepared = prepare_document(
+            _worker_processor,
+            _worker_chunker,
+            file_path,
+            filename=filename,
+            digest=digest
+        )
+        return prepared, None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+class BulkIndexer:
+    """Indexes a directory tree into a vector store with checkpoint/resume."""
+    
+    def __init__(
+        self,
+        root: Path,
+        output_dir: Path = None,
+        workers: int = None,
+        checkpoint_every: int = 10
+    ):
+        """
+        Initialize bulk indexer.
+        
+        Args:
+            root: Directory to index recursively
+            output_dir: Vector store directory (defaults to VECTOR_STORE_DIR)
+            workers: Number of worker processes for extraction and chunking
+            checkpoint_every: Save the store and checkpoint every N documents
+        """
+        self.root = root.resolve()
+        self.output_dir = output_dir or settings.VECTOR_STORE_DIR
+        self.store_path = self.output_dir / "vector_store.pkl"
+        self.checkpoint_path = self.output_dir / CHECKPOINT_FILENAME
+        self.workers = workers or os.cpu_count() or 1
+        self.checkpoint_every = max(1, checkpoint_every)
+    
+    def discover(self) -> List[Path]:
+        """All supported files under the root, in a stable order."""
+        return sorted(
+            path for path in self.root.rglob("*")
+            if path.is_file() and path.suffix.lower() in SUPPORTED_EXTENSIONS
+        )
+    
+    def load_checkpoint(self) -> Dict:
+        """Load the checkpoint for this root, or start a fresh one."""
+        if self.checkpoint_path.exists():
+            with open(self.checkpoint_path, 'r') as f:
+                checkpoint = json.load(f)
+            if checkpoint.get("root") == str(self.root):
+                return checkpoint
+        
+        return {"root": str(self.root), "completed": {}, "failed": {}}
+    
+    def save_checkpoint(self, checkpoint: Dict):
+        """Write the checkpoint atomically."""
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
+    
+    def run(self, restart: bool = False) -> Dict:
+        """
+        Index every new or changed file under the root.
+        
+        Args:
+            restart: Ignore any existing checkpoint
+        
+        Returns:
+            Run statistics
+        """
+        start_time = time.time()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        checkpoint = {"root": str(self.root), "completed": {}, "failed": {}}
+        if not restart:
+            checkpoint = self.load_checkpoint()
+        
+        # Skip files already indexed with the same content
+        files = self.discover()
+        pending = []
+        for path in files:
+            filename = path.relative_to(self.root).as_posix()
+            digest = file_hash(path)
+            if checkpoint["completed"].get(filename) != digest:
+                pending.append((path, filename, digest))
+        
+        print(f"Found {len(files)} documents, {len(pending)} to index")
+        
+        vector_store = VectorStore()
+        vector_store.load(self.store_path)
+        chunker = get_chunker()
+        pipeline = IngestionPipeline(chunker=chunker, vector_store=vector_store)
+        
+        stats = {"documents": 0, "chunks": 0, "embedded": 0, "duplicates": 0, "failed": 0}
+        since_checkpoint = 0
+        
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(chunker,)
+        ) as pool:
+            # Keep a bounded window of in-flight documents so prepared
+            # documents never pile up faster than they can be embedded
+            window = deque()
+            queue = iter(pending)
+            for item in queue:
+                window.append((item, pool.submit(_prepare_in_worker, *item)))
+                if len(window) >= self.workers * 2:
+                    break
+            
+            while window:
+                (path, filename, digest), future = window.popleft()
+                next_item = next(queue, None)
+                if next_item is not None:
+                    window.append((next_item, pool.submit(_prepare_in_worker, *next_item)))
+                
+                prepared, error = future.result()
+                if error is not None:
+                    print(f"  ✗ {filename}: {error}")
+                    checkpoint["failed"][filename] = error
+                    stats["failed"] += 1
+                    continue
+                
+                result = pipeline.index_prepared(prepared, save=False)
+                checkpoint["completed"][filename] = digest
+                checkpoint["failed"].pop(filename, None)
+                
+                if result.duplicate_of:
+                    stats["duplicates"] += 1
+                else:
+                    stats["documents"] += 1
+                    stats["chunks"] += result.chunks_created
+                    stats["embedded"] += result.chunks_embedded
+                
+                since_checkpoint += 1
+                if since_checkpoint >= self.checkpoint_every:
+                    # Store first: documents in the store but not yet in the
+                    # checkpoint are recognised as exact duplicates on resume
+                    vector_store.save(self.store_path)
+                    self.save_checkpoint(checkpoint)
+                    since_checkpoint = 0
+        
+        vector_store.save(self.store_path)
+        self.save_checkpoint(checkpoint)
+        
+        elapsed = max(time.time() - start_time, 1e-9)
+        stats.update({
+            "elapsed_seconds": elapsed,
+            "docs_per_second": stats["documents"] / elapsed,
+            "chunks_per_second": stats["chunks"] / elapsed,
+            "peak_rss_mb": _peak_rss_mb(resource.RUSAGE_SELF),
+            "peak_worker_rss_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN),
+            "total_chunks": vector_store.index.ntotal
+        })
+        return stats
+
+
+def _peak_rss_mb(who: int) -> float:
+    """Peak resident set size in MB (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(who).ru_maxrss
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def main(argv: List[str] = None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Bulk index a directory of governance documents.")
+    parser.add_argument("directory", type=Path, help="Directory to index recursively")
+    parser.add_argument("--output", type=Path, default=None, help="Vector store directory")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--checkpoint-every", type=int, default=10, help="Checkpoint every N documents")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args(argv)
+    
+    if not args.directory.is_dir():
+        parser.error(f"Not a directory: {args.directory}")
+    
+    indexer = BulkIndexer(
+        args.directory,
+        output_dir=args.output,
+        workers=args.workers,
+        checkpoint_every=args.checkpoint_every
+    )
+    stats = indexer.run(restart=args.restart)
+    
+    print()
+    print("=" * 60)
+    print(f"Indexed {stats['documents']} documents ({stats['chunks']} chunks, "
+          f"{stats['embedded']} embedded) in {stats['elapsed_seconds']:.1f}s")
+    print(f"Skipped duplicates: {stats['duplicates']}  Failed: {stats['failed']}")
+    print(f"Throughput: {stats['docs_per_second']:.2f} docs/sec, "
+          f"{stats['chunks_per_second']:.2f} chunks/sec")
+    print(f"Peak RSS: {stats['peak_rss_mb']:.0f} MB (workers: {stats['peak_worker_rss_mb']:.0f} MB)")
+    print(f"Vector store: {stats['total_chunks']} chunks in {indexer.output_dir}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
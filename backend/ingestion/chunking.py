@@ -2,8 +2,12 @@
 Semantic chunking strategies for document processing.
 Implements section-aware chunking with overlap for context preservation.
 """
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+from bisect import bisect_left
+import re
+import threading
 from pydantic import BaseModel
+from config import settings
 
 
 class Chunk(BaseModel):
@@ -14,6 +18,9 @@ class Chunk(BaseModel):
     start_char: int
     end_char: int
     metadata: Dict
+    token_count: Optional[int] = None
+    # (start_char, end_char, token_count) per sentence, relative to `text`
+    sentence_offsets: Optional[List[Tuple[int, int, int]]] = None
 
 
 class SemanticChunker:
@@ -151,3 +158,228 @@ class SemanticChunker:
                 chunk.text = f"[{chunk.section_title}]\n{chunk.text}"
         
         return chunks
+
+
+class TokenAwareChunker(SemanticChunker):
+    """
+    Packs whole sentences into chunks bounded by a token budget.
+    
+    Tokens are counted with the embedding model's tokenizer so that no chunk
+    is silently truncated at encode time, and small sections are not split
+    needlessly. Each chunk keeps its token count and per-sentence offsets so
+    later stages can pack context without re-tokenizing.
+    """
+    
+    # Sentence ends followed by whitespace, or line breaks (list items, tables)
+    SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+|\n+')
+    
+    # [CLS] and [SEP] added by the embedding model
+    SPECIAL_TOKENS = 2
+    
+    def __init__(self, tokenizer, max_tokens: int, overlap: int = 32):
+        """
+        Initialize chunker.
+        
+        Args:
+            tokenizer: Fast (offset-mapping capable) tokenizer of the embedding model
+            max_tokens: Maximum sequence length of the embedding model
+            overlap: Number of tokens to overlap between consecutive chunks
+        """
+        super().__init__(chunk_size=max_tokens, overlap=overlap)
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+    
+    def chunk_document(
+        self,
+        sections: List[Dict[str, str]],
+        metadata: Dict
+    ) -> List[Chunk]:
+        """
+        Chunk a document by sections, packing sentences up to the token budget.
+        
+        Args:
+            sections: List of sections with title and content
+            metadata: Document metadata to attach to chunks
+            
+        Returns:
+            List of chunks with token counts and sentence offsets
+        """
+        return self._chunk_sections(sections, metadata, with_context=False)
+    
+    def chunk_with_context(
+        self,
+        sections: List[Dict[str, str]],
+        metadata: Dict
+    ) -> List[Chunk]:
+        """
+        Chunk document with section context prepended.
+        The section title prefix is counted against the token budget.
+        """
+        return self._chunk_sections(sections, metadata, with_context=True)
+    
+    def count_tokens(self, text: str) -> int:
+        """Count tokens in text, excluding special tokens."""
+        return len(self.tokenizer(text, add_special_tokens=False)["input_ids"])
+    
+    def _chunk_sections(
+        self,
+        sections: List[Dict[str, str]],
+        metadata: Dict,
+        with_context: bool
+    ) -> List[Chunk]:
+        """Chunk all sections, optionally prepending the section title."""
+        chunks = []
+        chunk_counter = 0
+        
+        for section in sections:
+            section_title = section["title"]
+            section_content = section["content"]
+            
+            # Skip empty sections
+            if not section_content.strip():
+                continue
+            
+            prefix = ""
+            if with_context and section_title and section_title != "Document":
+                prefix = f"[{section_title}]\n"
+            prefix_tokens = self.count_tokens(prefix) if prefix else 0
+            
+            # Always leave room for at least a few content tokens
+            budget = max(16, self.max_tokens - self.SPECIAL_TOKENS - prefix_tokens)
+            
+            units = self._sentence_units(section_content, budget)
+            for group in self._pack_units(units, budget):
+                start = group[0][0]
+                end = group[-1][1]
+                shift = len(prefix) - start
+                
+                chunk = Chunk(
+                    text=prefix + section_content[start:end],
+                    chunk_id=f"{metadata.get('filename', 'doc')}_{chunk_counter}",
+                    section_title=section_title,
+                    start_char=start,
+                    end_char=end,
+                    metadata=metadata,
+                    token_count=prefix_tokens + sum(unit[2] for unit in group),
+                    sentence_offsets=[
+                        (s + shift, e + shift, n) for s, e, n in group
+                    ]
+                )
+                chunks.append(chunk)
+                chunk_counter += 1
+        
+        return chunks
+    
+    def _split_sentences(self, text: str) -> List[Tuple[int, int]]:
+        """Split text into (start, end) character spans of sentences."""
+        spans = []
+        start = 0
+        
+        for match in self.SENTENCE_BOUNDARY.finditer(text):
+            if text[start:match.start()].strip():
+                spans.append((start, match.start()))
+            start = match.end()
+        
+        if text[start:].strip():
+            spans.append((start, len(text)))
+        
+        return spans
+    
+    def _sentence_units(
+        self,
+        text: str,
+        budget: int
+    ) -> List[Tuple[int, int, int]]:
+        """
+        Measure every sentence in tokens with a single tokenizer call.
+        Sentences longer than the budget are cut at token boundaries.
+        
+        Returns:
+            List of (start_char, end_char, token_count) units
+        """
+        offsets = self.tokenizer(
+            text,
+            add_special_tokens=False,
+            return_offsets_mapping=True
+        )["offset_mapping"]
+        token_starts = [start for start, _ in offsets]
+        
+        units = []
+        for sent_start, sent_end in self._split_sentences(text):
+            first = bisect_left(token_starts, sent_start)
+            last = bisect_left(token_starts, sent_end)
+            n_tokens = last - first
+            
+            if n_tokens <= budget:
+                units.append((sent_start, sent_end, n_tokens))
+                continue
+            
+            # Oversized sentence: split into budget-sized token windows
+            for window_start in range(first, last, budget):
+                window_end = min(window_start + budget, last)
+                units.append((
+                    offsets[window_start][0],
+                    offsets[window_end - 1][1],
+                    window_end - window_start
+                ))
+        
+        return units
+    
+    def _pack_units(
+        self,
+        units: List[Tuple[int, int, int]],
+        budget: int
+    ) -> List[List[Tuple[int, int, int]]]:
+        """Greedily pack units up to the budget with token-based overlap."""
+        groups = []
+        i = 0
+        
+        while i < len(units):
+            j = i
+            total = 0
+            while j < len(units) and total + units[j][2] <= budget:
+                total += units[j][2]
+                j += 1
+            
+            groups.append(units[i:j])
+            if j >= len(units):
+                break
+            
+            # Carry trailing sentences into the next chunk as overlap,
+            # while always making forward progress
+            k = j
+            carried = 0
+            while k - 1 > i and carried + units[k - 1][2] <= self.overlap:
+                k -= 1
+                carried += units[k][2]
+            i = k
+        
+        return groups
+
+
+# Global chunker instance
+_chunker = None
+_chunker_lock = threading.Lock()
+
+
+def get_chunker() -> SemanticChunker:
+    """Get or create the global chunker for the configured strategy."""
+    global _chunker
+    if _chunker is None:
+        with _chunker_lock:
+            if _chunker is None:
+                if settings.CHUNKING_STRATEGY == "tokens":
+                    from ingestion.embeddings import get_embedding_generator
+                    
+                    embedding_gen = get_embedding_generator()
+                    _chunker = TokenAwareChunker(
+                        tokenizer=embedding_gen.tokenizer,
+                        max_tokens=settings.CHUNK_MAX_TOKENS or embedding_gen.max_seq_length,
+                        overlap=settings.CHUNK_TOKEN_OVERLAP
+                    )
+                else:
+                    _chunker = SemanticChunker(
+                        chunk_size=settings.CHUNK_SIZE,
+                        overlap=settings.CHUNK_OVERLAP
+                    )
+    return _chunker
@@ -0,0 +1,131 @@
+"""
+Near-duplicate detection for chunks.
+MinHash signatures over word shingles, indexed with LSH banding so each
+new chunk is compared only against likely duplicates.
+"""
+from typing import Dict, List, Optional, Tuple
+from collections import defaultdict
+import hashlib
+import re
+import zlib
+import numpy as np
+
+
+def file_hash(file_path) -> str:
+    """SHA-256 of a file's bytes, read in blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class MinHasher:
+    """Computes MinHash signatures of text."""
+    
+    # Prime just above 2**32 so (a * x + b) stays within uint64 for 32-bit x
+    PRIME = np.uint64(4294967311)
+    MAX_HASH = np.uint64(0xFFFFFFFF)
+    
+    WORD_PATTERN = re.compile(r'\w+')
+    
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        """
+        Initialize hasher.
+        
+        Args:
+            num_perm: Number of hash permutations (signature length)
+            shingle_size: Number of words per shingle
+            seed: Seed for the permutation parameters (fixed so stored
+                signatures stay comparable across processes)
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+    
+    def shingles(self, text: str) -> set:
+        """Word n-gram shingles of normalized text."""
+        words = self.WORD_PATTERN.findall(text.lower())
+        if len(words) < self.shingle_size:
+            return {" ".join(words)} if words else set()
+        
+        return {
+            " ".join(words[i:i + self.shingle_size])
+            for i in range(len(words) - self.shingle_size + 1)
+        }
+    
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature (uint32 vector of length num_perm)."""
+        shingles = self.shingles(text)
+        if not shingles:
+            return np.full(self.num_perm, self.MAX_HASH, dtype=np.uint32)
+        
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        
+        # One row per permutation, one column per shingle
+        permuted = (np.outer(self.a, hashes) + self.b[:, None]) % self.PRIME
+        return (permuted.min(axis=1) & self.MAX_HASH).astype(np.uint32)
+
+
+class NearDuplicateIndex:
+    """LSH index over MinHash signatures."""
+    
+    def __init__(self, num_perm: int = 128, bands: int = 16, threshold: float = 0.9):
+        """
+        Initialize index.
+        
+        Args:
+            num_perm: Signature length; must be divisible by bands
+            bands: Number of LSH bands (more bands find less similar candidates)
+            threshold: Minimum estimated Jaccard similarity to count as a duplicate
+        """
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.buckets: Dict[Tuple[int, bytes], List[int]] = defaultdict(list)
+        self.signatures: Dict[int, np.ndarray] = {}
+    
+    def add(self, key: int, signature: np.ndarray):
+        """Index a signature under a key (e.g. a vector store position)."""
+        self.signatures[key] = signature
+        for band in range(self.bands):
+            self.buckets[self._band_key(signature, band)].append(key)
+    
+    def query(self, signature: np.ndarray) -> Optional[int]:
+        """
+        Find the most similar indexed signature above the threshold.
+        
+        Returns:
+            Key of the best near-duplicate, or None
+        """
+        candidates = set()
+        for band in range(self.bands):
+            candidates.update(self.buckets.get(self._band_key(signature, band), ()))
+        
+        best_key = None
+        best_similarity = self.threshold
+        for key in candidates:
+            similarity = float(np.mean(self.signatures[key] == signature))
+            if similarity >= best_similarity:
+                best_key = key
+                best_similarity = similarity
+        
+        return best_key
+    
+    def clear(self):
+        """Remove all signatures."""
+        self.buckets.clear()
+        self.signatures.clear()
+    
+    def __len__(self) -> int:
+        return len(self.signatures)
+    
+    def _band_key(self, signature: np.ndarray, band: int) -> Tuple[int, bytes]:
+        """Bucket key for one band of a signature."""
+        return band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
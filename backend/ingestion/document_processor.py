@@ -9,16 +9,19 @@ import re
 import PyPDF2
 import docx
 from pydantic import BaseModel
+from ingestion.keyword_matcher import KeywordMatcher
 
 
 class DocumentMetadata(BaseModel):
     """Metadata for processed documents."""
     filename: str
     doc_type: str  # risk, bias, explainability, validation, assumptions
+    title: Optional[str] = None  # First section heading
     model_name: Optional[str] = None
     version: Optional[str] = None
     date: Optional[str] = None
     file_size: int
+    file_hash: Optional[str] = None  # SHA-256 of the uploaded file
     processed_at: str
 
 
@@ -41,11 +44,37 @@ class DocumentProcessor:
         "assumptions": ["assumption", "limitation", "constraint", "dependency", "prerequisite"]
     }
     
+    # Built once; counts every classification keyword in a single pass
+    KEYWORD_MATCHER = KeywordMatcher(CLASSIFICATION_KEYWORDS)
+    
+    # Metadata patterns, compiled once and tried in priority order
+    MODEL_NAME_PATTERNS = [
+        re.compile(r'Model\s*Name\s*[:：]\s*([^\n]+)', re.IGNORECASE),
+        re.compile(r'Model\s*[:：]\s*([^\n]+)', re.IGNORECASE),
+        re.compile(r'Algorithm\s*[:：]\s*([^\n]+)', re.IGNORECASE)
+    ]
+    VERSION_PATTERNS = [
+        re.compile(r'Version\s*[:：]\s*([^\n]+)', re.IGNORECASE),
+        re.compile(r'v(\d+\.\d+\.?\d*)', re.IGNORECASE),
+        re.compile(r'Version\s+(\d+\.\d+\.?\d*)', re.IGNORECASE)
+    ]
+    DATE_PATTERNS = [
+        re.compile(r'Date\s*[:：]\s*(\d{4}-\d{2}-\d{2})', re.IGNORECASE),
+        re.compile(r'(\d{4}-\d{2}-\d{2})', re.IGNORECASE),
+        re.compile(r'Date\s*[:：]\s*([^\n]+)', re.IGNORECASE)
+    ]
+    
     def __init__(self):
         pass
     
-    def process_file(self, file_path: Path) -> ProcessedDocument:
-        """Process a document file and extract content with metadata."""
+    def process_file(self, file_path: Path, filename: Optional[str] = None) -> ProcessedDocument:
+        """
+        Process a document file and extract content with metadata.
+        
+        Args:
+            file_path: Path to the document on disk
+            filename: Original filename, if the stored file was renamed on upload
+        """
         suffix = file_path.suffix.lower()
         
         if suffix == ".pdf":
@@ -69,8 +98,9 @@ class DocumentProcessor:
         date = self._extract_date(content)
         
         metadata = DocumentMetadata(
-            filename=file_path.name,
+            filename=filename or file_path.name,
             doc_type=doc_type,
+            title=sections[0]["title"] if sections[0]["title"] != "Document" else None,
             model_name=model_name,
             version=version,
             date=date,
@@ -148,12 +178,7 @@ class DocumentProcessor:
     
     def _classify_document(self, content: str) -> str:
         """Classify document type based on keyword frequency."""
-        content_lower = content.lower()
-        scores = {}
-        
-        for doc_type, keywords in self.CLASSIFICATION_KEYWORDS.items():
-            score = sum(content_lower.count(keyword) for keyword in keywords)
-            scores[doc_type] = score
+        scores = self.KEYWORD_MATCHER.group_counts(content)
         
         # Return type with highest score, default to 'risk'
         if max(scores.values()) > 0:
@@ -163,45 +188,21 @@ class DocumentProcessor:
     def _extract_model_name(self, content: str) -> Optional[str]:
         """Extract model name from content."""
         # Look for patterns like "Model: XYZ" or "Model Name: XYZ"
-        patterns = [
-            r'Model\s*Name\s*[:：]\s*([^\n]+)',
-            r'Model\s*[:：]\s*([^\n]+)',
-            r'Algorithm\s*[:：]\s*([^\n]+)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
-        
-        return None
+        return self._first_match(self.MODEL_NAME_PATTERNS, content)
     
     def _extract_version(self, content: str) -> Optional[str]:
         """Extract version from content."""
-        patterns = [
-            r'Version\s*[:：]\s*([^\n]+)',
-            r'v(\d+\.\d+\.?\d*)',
-            r'Version\s+(\d+\.\d+\.?\d*)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
-        
-        return None
+        return self._first_match(self.VERSION_PATTERNS, content)
     
     def _extract_date(self, content: str) -> Optional[str]:
         """Extract date from content."""
         # Look for ISO dates or common date formats
-        patterns = [
-            r'Date\s*[:：]\s*(\d{4}-\d{2}-\d{2})',
-            r'(\d{4}-\d{2}-\d{2})',
-            r'Date\s*[:：]\s*([^\n]+)'
-        ]
-        
+        return self._first_match(self.DATE_PATTERNS, content)
+    
+    def _first_match(self, patterns: List[re.Pattern], content: str) -> Optional[str]:
+        """Return the first group of the first pattern that matches."""
         for pattern in patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
+            match = pattern.search(content)
             if match:
                 return match.group(1).strip()
         
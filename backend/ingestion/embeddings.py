@@ -3,6 +3,7 @@ Embedding generation using Sentence Transformers.
 Optimized for technical and governance text.
 """
 from typing import List
+import threading
 import torch
 from sentence_transformers import SentenceTransformer
 from config import settings
@@ -77,15 +78,28 @@ class EmbeddingGenerator:
     def dimension(self) -> int:
         """Get the dimension of the embedding vectors."""
         return self.model.get_sentence_embedding_dimension()
+    
+    @property
+    def tokenizer(self):
+        """Get the (fast) tokenizer used by the embedding model."""
+        return self.model.tokenizer
+    
+    @property
+    def max_seq_length(self) -> int:
+        """Get the maximum number of tokens the model encodes before truncating."""
+        return self.model.max_seq_length
 
 
 # Global embedding generator instance
 _embedding_generator = None
+_embedding_generator_lock = threading.Lock()
 
 
 def get_embedding_generator() -> EmbeddingGenerator:
     """Get or create the global embedding generator instance."""
     global _embedding_generator
     if _embedding_generator is None:
-        _embedding_generator = EmbeddingGenerator()
+        with _embedding_generator_lock:
+            if _embedding_generator is None:
+                _embedding_generator = EmbeddingGenerator()
     return _embedding_generator
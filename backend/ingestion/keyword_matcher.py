@@ -0,0 +1,99 @@
+"""
+Single-pass multi-keyword matching.
+Compiles a keyword table into one trie-shaped pattern (Aho-Corasick style)
+so every keyword occurrence is found in one scan over the text.
+"""
+from typing import Dict, Hashable, List
+from collections import Counter
+import re
+
+
+class KeywordMatcher:
+    """Counts occurrences of many keywords in a single pass over the text."""
+    
+    def __init__(self, keyword_table: Dict[Hashable, List[str]]):
+        """
+        Build the matcher once from a keyword table.
+        
+        Args:
+            keyword_table: Mapping of group label (e.g. a category) to keywords
+        """
+        self.groups = {
+            group: [keyword.lower() for keyword in keywords]
+            for group, keywords in keyword_table.items()
+        }
+        self.keywords = sorted({kw for keywords in self.groups.values() for kw in keywords})
+        
+        # Every keyword found at a position is a prefix of the longest keyword
+        # found there, so crediting the longest match's keyword prefixes
+        # reports overlapping matches (e.g. "feature" in "feature importance")
+        self._prefixes = {
+            keyword: [other for other in self.keywords if keyword.startswith(other)]
+            for keyword in self.keywords
+        }
+        
+        # Zero-width lookahead so the scan advances one character at a time
+        # and matches may overlap, like the outputs of an Aho-Corasick automaton
+        self._pattern = re.compile(f"(?=({self._build_trie_pattern(self.keywords)}))")
+    
+    def count(self, text: str) -> Dict[str, int]:
+        """
+        Count occurrences of every keyword.
+        
+        Args:
+            text: Text to scan (matched case-insensitively)
+        
+        Returns:
+            Mapping of keyword to number of occurrences
+        """
+        counts = dict.fromkeys(self.keywords, 0)
+        if not self.keywords:
+            return counts
+        
+        for longest, occurrences in Counter(self._pattern.findall(text.lower())).items():
+            for keyword in self._prefixes[longest]:
+                counts[keyword] += occurrences
+        
+        return counts
+    
+    def group_counts(self, text: str) -> Dict[Hashable, int]:
+        """Total keyword occurrences per group."""
+        counts = self.count(text)
+        return {
+            group: sum(counts[keyword] for keyword in keywords)
+            for group, keywords in self.groups.items()
+        }
+    
+    def group_matches(self, text: str) -> Dict[Hashable, int]:
+        """Number of distinct keywords present per group."""
+        counts = self.count(text)
+        return {
+            group: sum(1 for keyword in keywords if counts[keyword] > 0)
+            for group, keywords in self.groups.items()
+        }
+    
+    def _build_trie_pattern(self, keywords: List[str]) -> str:
+        """Compile keywords into a prefix-shared alternation (longest match first)."""
+        trie = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        
+        def build(node: Dict) -> str:
+            branches = [
+                re.escape(char) + build(child)
+                for char, child in sorted(node.items())
+                if char
+            ]
+            if not branches:
+                return ""
+            
+            body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+            if "" in node:
+                # A keyword ends here; longer keywords are tried first
+                body = f"(?:{body})?"
+            return body
+        
+        return build(trie)
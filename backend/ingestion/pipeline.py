@@ -0,0 +1,457 @@
+"""
+End-to-end ingestion pipeline.
+Processes, chunks, embeds and indexes documents, re-embedding only the
+chunks that changed when a new version of a known document is uploaded,
+and indexing exact and near-duplicate content only once.
+"""
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import threading
+import numpy as np
+from pydantic import BaseModel
+from config import settings
+from ingestion.document_processor import DocumentProcessor
+from ingestion.chunking import Chunk, get_chunker
+from ingestion.embeddings import get_embedding_generator
+from ingestion.deduplication import MinHasher, NearDuplicateIndex, file_hash
+from ingestion.term_features import term_fields
+from retrieval.vector_store import get_vector_store
+
+
+class IngestionResult(BaseModel):
+    """Outcome of ingesting one document."""
+    filename: str
+    metadata: Dict
+    chunks_created: int
+    chunks_embedded: int
+    chunks_reused: int = 0
+    chunks_retired: int = 0
+    chunks_suppressed: int = 0  # Near-duplicates of already indexed chunks
+    sections_changed: int = 0
+    replaced_document: bool = False
+    duplicate_of: Optional[str] = None  # Set when the exact file was already indexed
+
+
+def content_hash(text: str) -> str:
+    """Stable hash of a piece of text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class PreparedDocument(BaseModel):
+    """A processed and chunked document, ready to be embedded and indexed."""
+    metadata: Dict
+    chunks: List[Chunk]
+    chunk_data: List[Dict]  # Chunk records as stored in the vector store
+    section_hashes: Dict[str, str]  # Non-empty section title -> content hash
+
+
+def prepare_document(
+    processor: DocumentProcessor,
+    chunker,
+    file_path: Path,
+    filename: Optional[str] = None,
+    digest: Optional[str] = None
+) -> PreparedDocument:
+    """
+    Extract, classify and chunk a document.
+    Needs no embedding model or vector store, so it can run in worker processes.
+    
+    Args:
+        processor: Document processor
+        chunker: Chunker to split sections with
+        file_path: Path to the document on disk
+        filename: Original filename (defaults to the file's name)
+        digest: Precomputed file hash
+        
+    Returns:
+        Prepared document
+    """
+    processed_doc = processor.process_file(file_path, filename=filename)
+    processed_doc.metadata.file_hash = digest or file_hash(file_path)
+    metadata = processed_doc.metadata.model_dump()
+    
+    # Chunk document
+    chunks = chunker.chunk_with_context(processed_doc.sections, metadata)
+    
+    section_hashes = {
+        section["title"]: content_hash(section["content"])
+        for section in processed_doc.sections
+        if section["content"].strip()
+    }
+    chunk_data = [
+        {
+            "chunk_id": chunk.chunk_id,
+            "text": chunk.text,
+            "section_title": chunk.section_title,
+            "token_count": chunk.token_count,
+            "sentence_offsets": chunk.sentence_offsets,
+            **term_fields(chunk.text),
+            "content_hash": content_hash(chunk.text),
+            "section_hash": section_hashes.get(chunk.section_title)
+        }
+        for chunk in chunks
+    ]
+    
+    return PreparedDocument(
+        metadata=metadata,
+        chunks=chunks,
+        chunk_data=chunk_data,
+        section_hashes=section_hashes
+    )
+
+
+class IngestionPipeline:
+    """Runs documents through processing, chunking, embedding and indexing."""
+    
+    def __init__(
+        self,
+        processor: DocumentProcessor = None,
+        chunker=None,
+        embedding_gen=None,
+        vector_store=None
+    ):
+        """
+        Initialize pipeline. Components default to the global instances.
+        """
+        self.processor = processor or DocumentProcessor()
+        self.chunker = chunker or get_chunker()
+        self.embedding_gen = embedding_gen or get_embedding_generator()
+        self.vector_store = vector_store or get_vector_store()
+        
+        self.minhasher = MinHasher(num_perm=settings.MINHASH_PERMUTATIONS)
+        self._dedup_index = None
+        self._dedup_version = None
+        self._signatures = {}  # MinHash signatures of indexed chunks by content hash
+    
+    def ingest_file(
+        self,
+        file_path: Path,
+        filename: Optional[str] = None,
+        save: bool = True
+    ) -> IngestionResult:
+        """
+        Ingest a document file into the vector store.
+        
+        Files whose exact content is already indexed are skipped before any
+        processing. If a previous version of the document is indexed (same
+        filename, or same model name and title), vectors of unchanged chunks
+        are reused, only new or edited chunks are embedded, and chunks that
+        no longer exist are retired. Chunks that nearly duplicate an indexed
+        chunk are not indexed again; they are recorded as extra sources of
+        the existing chunk.
+        
+        Args:
+            file_path: Path to the document on disk
+            filename: Original filename (defaults to the file's name)
+            save: Persist the vector store after indexing
+        
+        Returns:
+            Ingestion statistics
+        """
+        digest = file_hash(file_path)
+        duplicate = self._duplicate_result(digest, filename or file_path.name)
+        if duplicate is not None:
+            return duplicate
+        
+        prepared = prepare_document(
+            self.processor,
+            self.chunker,
+            file_path,
+            filename=filename,
+            digest=digest
+        )
+        return self.index_prepared(prepared, save=save)
+    
+    def index_prepared(
+        self,
+        prepared: PreparedDocument,
+        save: bool = True
+    ) -> IngestionResult:
+        """
+        Embed and index a document prepared by prepare_document.
+        
+        Args:
+            prepared: Processed and chunked document
+            save: Persist the vector store after indexing
+            
+        Returns:
+            Ingestion statistics
+        """
+        # Workers sharing one index publish changes one at a time
+        with self.vector_store.writing():
+            return self._index_prepared(prepared, save)
+    
+    def _index_prepared(self, prepared: PreparedDocument, save: bool) -> IngestionResult:
+        """Index a prepared document (see index_prepared)."""
+        metadata = prepared.metadata
+        duplicate = self._duplicate_result(metadata["file_hash"], metadata["filename"])
+        if duplicate is not None:
+            return duplicate
+        
+        chunks = prepared.chunks
+        chunk_data = prepared.chunk_data
+        section_hashes = prepared.section_hashes
+        
+        # Find the previous version of this document, if any
+        old_positions = []
+        if settings.INCREMENTAL_INGESTION:
+            old_positions = self.vector_store.find_document(
+                metadata["filename"],
+                model_name=metadata.get("model_name"),
+                title=metadata.get("title")
+            )
+        
+        reusable = self._reusable_vectors(old_positions)
+        
+        # Count sections whose content differs from the indexed version
+        old_section_hashes = {
+            self.vector_store.chunks[i].get("section_hash")
+            for i in old_positions
+        }
+        sections_changed = sum(
+            1 for digest in section_hashes.values()
+            if digest not in old_section_hashes
+        )
+        
+        # Embed what the previous version cannot supply before the store is
+        # changed, so a failed embedding leaves the previous version in place
+        fresh = {}
+        texts = {}
+        for chunk in chunk_data:
+            if chunk["content_hash"] not in reusable:
+                texts.setdefault(chunk["content_hash"], chunk["text"])
+        if texts:
+            new_vectors = self.embedding_gen.generate_embeddings(list(texts.values()))
+            fresh = dict(zip(texts, np.array(new_vectors, dtype=np.float32)))
+        
+        # Retire the previous version before looking for duplicates,
+        # so new chunks are not matched against their own old version
+        new_hashes = {chunk["content_hash"] for chunk in chunk_data}
+        chunks_retired = sum(
+            1 for i in old_positions
+            if self._stored_hash(i) not in new_hashes
+        )
+        self._retire(old_positions, metadata["filename"])
+        
+        # Keep one canonical copy of near-duplicate chunks
+        kept = list(range(len(chunk_data)))
+        added = list(chunk_data)
+        duplicated = []
+        deduplicated = settings.NEAR_DUPLICATE_DETECTION
+        if deduplicated:
+            kept, added, duplicated, signatures = self._suppress_near_duplicates(chunk_data, metadata)
+        
+        embeddings = np.zeros((len(kept), self.vector_store.dimension), dtype=np.float32)
+        chunks_embedded = 0
+        for row, i in enumerate(kept):
+            digest = chunk_data[i]["content_hash"]
+            if digest in reusable:
+                embeddings[row] = reusable[digest]
+            else:
+                embeddings[row] = fresh[digest]
+                chunks_embedded += 1
+        
+        first_position = self.vector_store.index.ntotal
+        self.vector_store.add_documents(
+            embeddings.tolist(),
+            added,
+            [chunks[i].metadata for i in kept]
+        )
+        if deduplicated:
+            # Recorded only once the document is indexed, so a failed
+            # ingestion leaves no sources or LSH entries behind
+            self.vector_store.add_duplicate_sources(duplicated)
+            self._index_near_duplicates(first_position, added, signatures)
+        if save:
+            self.vector_store.save()
+        
+        return IngestionResult(
+            filename=metadata["filename"],
+            metadata=metadata,
+            chunks_created=len(chunk_data),
+            chunks_embedded=chunks_embedded,
+            chunks_reused=len(kept) - chunks_embedded,
+            chunks_retired=chunks_retired,
+            chunks_suppressed=len(chunk_data) - len(kept),
+            sections_changed=sections_changed,
+            replaced_document=bool(old_positions)
+        )
+    
+    def _duplicate_result(self, digest: str, filename: str) -> Optional[IngestionResult]:
+        """Result for a file whose exact content is already indexed, if any."""
+        if not settings.DEDUPLICATE_UPLOADS:
+            return None
+        
+        existing = self.vector_store.find_file(digest)
+        if existing is None:
+            return None
+        
+        return IngestionResult(
+            filename=filename,
+            metadata={},
+            chunks_created=0,
+            chunks_embedded=0,
+            duplicate_of=existing
+        )
+    
+    def _reusable_vectors(self, positions: List[int]) -> Dict[str, np.ndarray]:
+        """Map content hashes of indexed chunks to their stored vectors."""
+        if not positions:
+            return {}
+        
+        vectors = self.vector_store.get_embeddings(positions)
+        reusable = {}
+        for position, vector in zip(positions, vectors):
+            reusable.setdefault(self._stored_hash(position), vector)
+        
+        return reusable
+    
+    def _stored_hash(self, position: int) -> str:
+        """Content hash of an indexed chunk."""
+        chunk = self.vector_store.chunks[position]
+        # Stores written before hashing was added only have the text
+        return chunk.get("content_hash") or content_hash(chunk["text"])
+    
+    def _retire(self, positions: List[int], filename: str):
+        """
+        Remove the chunks of a previous document version.
+        Chunks that other documents still cite as duplicates are handed over
+        to the first of those documents instead of being removed.
+        """
+        self.vector_store.remove_duplicate_sources(filename)
+        
+        removed = []
+        for position in positions:
+            chunk = self.vector_store.chunks[position]
+            sources = chunk.get("duplicate_sources", [])
+            if not sources:
+                removed.append(position)
+                continue
+            
+            promoted = sources[0]
+            self.vector_store.update_chunk(
+                position,
+                {
+                    **chunk,
+                    "chunk_id": promoted["chunk_id"],
+                    "section_title": promoted["section_title"],
+                    "duplicate_sources": sources[1:]
+                },
+                promoted["metadata"]
+            )
+        
+        self.vector_store.remove_positions(removed)
+    
+    def _suppress_near_duplicates(
+        self,
+        chunk_data: List[Dict],
+        metadata: Dict
+    ) -> Tuple[List[int], List[Dict], List[Tuple[int, Dict]], List[np.ndarray]]:
+        """
+        Drop chunks that nearly duplicate an indexed chunk or an earlier
+        chunk of the same document. Duplicates of earlier chunks become their
+        extra sources; duplicates of indexed chunks are returned, to record
+        once the document is indexed. Neither the store, its LSH index nor
+        chunk_data are changed here.
+        
+        Returns:
+            Indices of the chunks to index, the chunk data to index for them,
+            (position, source) pairs of indexed chunks to record extra sources
+            for, and the signatures of the chunks to index
+        """
+        index = self._near_duplicate_index()
+        pending = self._new_near_duplicate_index()  # Kept chunks of this document
+        kept = []
+        signatures = []
+        sources = {}  # Extra sources of kept chunks, by index in kept
+        duplicated = []
+        
+        for i, chunk in enumerate(chunk_data):
+            signature = self.minhasher.signature(chunk["text"])
+            match = index.query(signature)
+            earlier = pending.query(signature) if match is None else None
+            
+            if match is None and earlier is None:
+                pending.add(len(kept), signature)
+                kept.append(i)
+                signatures.append(signature)
+                continue
+            
+            source = {
+                "chunk_id": chunk["chunk_id"],
+                "section_title": chunk["section_title"],
+                "metadata": metadata
+            }
+            if match is not None:
+                duplicated.append((match, source))
+            else:
+                sources.setdefault(earlier, []).append(source)
+        
+        added = []
+        for row, i in enumerate(kept):
+            chunk = chunk_data[i]
+            if row in sources:
+                chunk = {**chunk, "duplicate_sources": chunk.get("duplicate_sources", []) + sources[row]}
+            added.append(chunk)
+        
+        return kept, added, duplicated, signatures
+    
+    def _index_near_duplicates(
+        self,
+        first_position: int,
+        added: List[Dict],
+        signatures: List[np.ndarray]
+    ):
+        """
+        Add the signatures of chunks just added to the store to its LSH index
+        (which _suppress_near_duplicates brought up to date before the add).
+        """
+        for offset, (chunk, signature) in enumerate(zip(added, signatures)):
+            self._dedup_index.add(first_position + offset, signature)
+            self._signatures[chunk["content_hash"]] = signature
+        self._dedup_version = self.vector_store.version
+    
+    def _near_duplicate_index(self) -> NearDuplicateIndex:
+        """LSH index over the vector store, rebuilt when positions changed."""
+        if self._dedup_index is not None and self._dedup_version == self.vector_store.version:
+            return self._dedup_index
+        
+        # Signatures are kept here rather than in the stored chunks, which
+        # are shared with searches and the saved store
+        index = self._new_near_duplicate_index()
+        signatures = {}
+        for position, chunk in enumerate(self.vector_store.chunks):
+            digest = self._stored_hash(position)
+            signature = signatures.get(digest, self._signatures.get(digest))
+            if signature is None:
+                signature = self.minhasher.signature(chunk["text"])
+            signatures[digest] = signature
+            index.add(position, signature)
+        
+        self._signatures = signatures
+        self._dedup_index = index
+        self._dedup_version = self.vector_store.version
+        return index
+    
+    def _new_near_duplicate_index(self) -> NearDuplicateIndex:
+        return NearDuplicateIndex(
+            num_perm=settings.MINHASH_PERMUTATIONS,
+            bands=settings.LSH_BANDS,
+            threshold=settings.NEAR_DUPLICATE_THRESHOLD
+        )
+
+
+# Global pipeline instance
+_ingestion_pipeline = None
+_ingestion_pipeline_lock = threading.Lock()
+
+
+def get_ingestion_pipeline() -> IngestionPipeline:
+    """Get or create the global ingestion pipeline instance."""
+    global _ingestion_pipeline
+    if _ingestion_pipeline is None:
+        with _ingestion_pipeline_lock:
+            if _ingestion_pipeline is None:
+                _ingestion_pipeline = IngestionPipeline()
+    return _ingestion_pipeline
@@ -0,0 +1,71 @@
+"""
+Lexical term features of chunks.
+Each chunk's set of lowercased, whitespace-separated terms is computed once
+at ingestion and stored with the chunk, so query-time term matching
+(reranking, confidence calibration) intersects sets instead of lowercasing
+and scanning every retrieved text again.
+"""
+from typing import Dict, FrozenSet, Optional, Set, Tuple
+
+
+def extract_terms(text: str) -> FrozenSet[str]:
+    """Distinct lowercased terms of a text, as split on whitespace."""
+    return frozenset(text.lower().split())
+
+
+def term_fields(text: str) -> Dict:
+    """
+    Term features stored with a chunk: its distinct terms, and the same
+    terms joined by spaces for substring lookups.
+    """
+    terms = extract_terms(text)
+    return {"terms": terms, "terms_text": " ".join(terms)}
+
+
+def result_terms(result, cache: Optional[dict] = None) -> Tuple[FrozenSet[str], str]:
+    """
+    Stored term features of a retrieved chunk.
+    Chunks indexed before terms were stored are tokenised on demand.
+    
+    Args:
+        result: Retrieval or reranked result
+        cache: Optional mapping of chunk_id to features, shared across queries
+    
+    Returns:
+        (terms, terms_text)
+    """
+    terms = getattr(result, "terms", None)
+    if terms is not None:
+        return terms, result.terms_text
+    
+    if cache is None:
+        fields = term_fields(result.text)
+    else:
+        fields = cache.get(result.chunk_id)
+        if fields is None:
+            fields = cache[result.chunk_id] = term_fields(result.text)
+    return fields["terms"], fields["terms_text"]
+
+
+def contained_terms(terms: Set[str], text_terms: FrozenSet[str], terms_text: str) -> Set[str]:
+    """
+    Terms that occur in a text (as substrings, like `term in text`), given
+    the text's term features.
+    
+    A term without whitespace can only occur inside a single term of the
+    text, so whole-term matches come from a set intersection and only the
+    remaining terms are looked up in the (shorter) joined distinct terms.
+    
+    Args:
+        terms: Whitespace-free terms to look up (e.g. a split query)
+        text_terms: Distinct terms of the text
+        terms_text: The same terms joined by spaces
+    
+    Returns:
+        The subset of terms found
+    """
+    found = terms & text_terms
+    rest = terms - found
+    if rest:
+        found.update(term for term in rest if term in terms_text)
+    return found
@@ -4,11 +4,13 @@ Enterprise Model Risk & Explainability Intelligence Platform
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
 from config import settings
 from api import documents_router, questions_router, analytics_router
 from analytics import get_analytics_tracker, get_analytics_storage
+from rag import get_warmup
 
 
 @asynccontextmanager
@@ -23,6 +25,10 @@ async def lifespan(app: FastAPI):
     storage.load(tracker)
     print("Analytics data loaded")
     
+    # Load models in the background; /ready reports when they are warm
+    if settings.EAGER_WARMUP:
+        get_warmup().start()
+    
     yield
     
     # Shutdown
@@ -82,6 +88,25 @@ async def health_check():
     }
 
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness probe: 200 once models are loaded and warm, 503 until then.
+    Unlike /health, load balancers should only route traffic to ready pods.
+    """
+    if not settings.EAGER_WARMUP:
+        return {"status": "ready", "warmup": None}
+    
+    warmup = get_warmup()
+    if warmup.ready:
+        return {"status": "ready", "warmup": warmup.get_status()}
+    
+    return JSONResponse(
+        status_code=503,
+        content={"status": "not_ready", "warmup": warmup.get_status()}
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
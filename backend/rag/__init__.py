@@ -4,10 +4,30 @@ from .response_schemas import (
     RAGResponse,
     Citation,
     RiskCategory,
+    AnswerMode,
     QuestionRequest,
+    BatchQuestionRequest,
     QuestionResponse
 )
-from .qa_engine import QAEngine, get_qa_engine
+from .answer_cache import AnswerCache, get_answer_cache
+from .context_packer import ContextPacker
+from .deadline import Deadline
+from .embedding_context import EmbeddingContext
+from .extractive import ExtractiveAnswerer
+from .generation_backends import (
+    GenerationBackend,
+    HFPipelineBackend,
+    QuantizedTorchBackend,
+    ONNXRuntimeBackend,
+    create_generation_backend,
+    get_generation_backend
+)
+from .generation_scheduler import GenerationScheduler
+from .single_flight import SingleFlight
+from .stage_graph import StageGraph, get_stage_executor
+from .qa_engine import QAEngine, get_existing_qa_engine, get_qa_engine
+from .qa_executor import QAExecutor, QueueFullError, get_qa_executor
+from .warmup import Warmup, get_warmup, preload_models
 
 __all__ = [
     "SYSTEM_PROMPT",
@@ -16,8 +36,33 @@ __all__ = [
     "RAGResponse",
     "Citation",
     "RiskCategory",
+    "AnswerMode",
     "QuestionRequest",
+    "BatchQuestionRequest",
     "QuestionResponse",
+    "AnswerCache",
+    "get_answer_cache",
+    "ContextPacker",
+    "Deadline",
+    "EmbeddingContext",
+    "ExtractiveAnswerer",
+    "GenerationBackend",
+    "HFPipelineBackend",
+    "QuantizedTorchBackend",
+    "ONNXRuntimeBackend",
+    "create_generation_backend",
+    "get_generation_backend",
+    "GenerationScheduler",
+    "SingleFlight",
+    "StageGraph",
+    "get_stage_executor",
     "QAEngine",
-    "get_qa_engine"
+    "get_qa_engine",
+    "get_existing_qa_engine",
+    "QAExecutor",
+    "QueueFullError",
+    "get_qa_executor",
+    "Warmup",
+    "get_warmup",
+    "preload_models"
 ]
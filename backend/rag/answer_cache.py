@@ -0,0 +1,224 @@
+"""
+Answer cache for the QA engine.
+Serves repeated questions from an exact-match tier and paraphrases from a
+semantic tier, invalidating everything when the vector store changes.
+"""
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+import json
+import re
+import threading
+import time
+import numpy as np
+from config import settings
+
+
+class CacheEntry:
+    """A cached response with the query embedding it was produced for."""
+    
+    __slots__ = ("response", "embedding", "partition", "created_at")
+    
+    def __init__(self, response, embedding: Optional[np.ndarray], partition: Tuple, created_at: float):
+        self.response = response
+        self.embedding = embedding
+        self.partition = partition
+        self.created_at = created_at
+
+
+class AnswerCache:
+    """Two-tier (exact + semantic) LRU answer cache with TTL."""
+    
+    def __init__(
+        self,
+        max_size: int = None,
+        ttl_seconds: float = None,
+        similarity_threshold: float = None
+    ):
+        """
+        Initialize answer cache.
+        
+        Args:
+            max_size: Maximum number of cached answers (least recently used are evicted)
+            ttl_seconds: Age after which an answer is no longer served
+            similarity_threshold: Minimum cosine similarity for a paraphrase hit
+                (None disables the semantic tier)
+        """
+        self.max_size = settings.ANSWER_CACHE_MAX_SIZE if max_size is None else max_size
+        self.ttl_seconds = settings.ANSWER_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        if similarity_threshold is None and settings.ANSWER_CACHE_SEMANTIC:
+            self.similarity_threshold = settings.ANSWER_CACHE_SIMILARITY_THRESHOLD
+        
+        self._entries: "OrderedDict[Tuple, CacheEntry]" = OrderedDict()
+        self._index_version = None
+        self._lock = threading.Lock()
+        
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def get_exact(
+        self,
+        question: str,
+        filters: Optional[dict],
+        top_k: int,
+        index_version: int
+    ):
+        """
+        Look up an answer for the same normalised question, filters and top_k.
+        
+        Returns:
+            Cached response, or None
+        """
+        key = self._key(question, filters, top_k)
+        with self._lock:
+            self._check_version(index_version)
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry):
+                return None
+            
+            self._entries.move_to_end(key)
+            self.exact_hits += 1
+            return entry.response
+    
+    def get_semantic(
+        self,
+        embedding: List[float],
+        filters: Optional[dict],
+        top_k: int,
+        index_version: int
+    ):
+        """
+        Look up an answer for a paraphrase of the question.
+        Only answers with the same filters and top_k are considered.
+        
+        Returns:
+            Cached response, or None (counted as a miss)
+        """
+        with self._lock:
+            self._check_version(index_version)
+            
+            if self.similarity_threshold is None:
+                self.misses += 1
+                return None
+            
+            partition = self._partition(filters, top_k)
+            candidates = [
+                (key, entry) for key, entry in self._entries.items()
+                if entry.partition == partition
+                and entry.embedding is not None
+                and not self._expired(entry)
+            ]
+            if not candidates:
+                self.misses += 1
+                return None
+            
+            query = self._normalize(embedding)
+            matrix = np.stack([entry.embedding for _, entry in candidates])
+            similarities = matrix @ query
+            best = int(np.argmax(similarities))
+            
+            if similarities[best] < self.similarity_threshold:
+                self.misses += 1
+                return None
+            
+            key, entry = candidates[best]
+            self._entries.move_to_end(key)
+            self.semantic_hits += 1
+            return entry.response
+    
+    def put(
+        self,
+        question: str,
+        filters: Optional[dict],
+        top_k: int,
+        embedding: Optional[List[float]],
+        response,
+        index_version: int
+    ):
+        """Cache a response computed against the given index version."""
+        key = self._key(question, filters, top_k)
+        entry = CacheEntry(
+            response=response,
+            embedding=self._normalize(embedding) if embedding is not None else None,
+            partition=key[1:],
+            created_at=time.time()
+        )
+        
+        with self._lock:
+            # Answer was computed against an index that has since changed
+            if index_version != self._index_version:
+                return
+            
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """Drop all cached answers."""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict:
+        """Hit-rate metrics."""
+        with self._lock:
+            lookups = self.exact_hits + self.semantic_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": (self.exact_hits + self.semantic_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "index_version": self._index_version
+            }
+    
+    def _check_version(self, index_version: int):
+        """Invalidate everything when the vector store has changed."""
+        if index_version != self._index_version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._index_version = index_version
+    
+    def _expired(self, entry: CacheEntry) -> bool:
+        return time.time() - entry.created_at > self.ttl_seconds
+    
+    def _key(self, question: str, filters: Optional[dict], top_k: int) -> Tuple:
+        return (normalize_question(question),) + self._partition(filters, top_k)
+    
+    def _partition(self, filters: Optional[dict], top_k: int) -> Tuple:
+        return json.dumps(filters or {}, sort_keys=True), top_k
+    
+    def _normalize(self, embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+
+def normalize_question(question: str) -> str:
+    """Case-, whitespace- and trailing-punctuation-insensitive form of a question."""
+    normalized = re.sub(r"\s+", " ", question.lower()).strip()
+    return normalized.rstrip("?.! ")
+
+
+# Global answer cache instance
+_answer_cache = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    """Get or create the global answer cache instance."""
+    global _answer_cache
+    if _answer_cache is None:
+        with _answer_cache_lock:
+            if _answer_cache is None:
+                _answer_cache = AnswerCache()
+    return _answer_cache
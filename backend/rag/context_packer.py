@@ -0,0 +1,138 @@
+"""
+Token-budget prompt packing.
+Fills the LLM's input budget with the highest-ranked evidence, trimming
+chunks at sentence boundaries, while the instructions and the question are
+always kept intact.
+"""
+from typing import List, Optional, Tuple
+from collections import OrderedDict
+import threading
+from config import settings
+from ingestion.chunking import TokenAwareChunker
+from rag.prompts import format_qa_prompt, format_source
+
+
+class ContextPacker:
+    """Builds QA prompts that fit the LLM's input token budget."""
+    
+    SENTENCE_BOUNDARY = TokenAwareChunker.SENTENCE_BOUNDARY
+    
+    # End-of-sequence token appended by the tokenizer
+    SPECIAL_TOKENS = 1
+    
+    def __init__(self, tokenizer, max_input_tokens: int = None, cache_size: int = 4096):
+        """
+        Initialize packer.
+        
+        Args:
+            tokenizer: Tokenizer of the generation model
+            max_input_tokens: Token budget of the whole prompt
+            cache_size: Number of chunks whose sentence token counts are cached
+        """
+        self.tokenizer = tokenizer
+        self.max_input_tokens = max_input_tokens or settings.LLM_MAX_INPUT_TOKENS
+        self.cache_size = cache_size
+        self._units: "OrderedDict[str, List[Tuple[int, int]]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def pack(self, question: str, results: List) -> str:
+        """
+        Build the QA prompt for a question from ranked retrieval results.
+        
+        Args:
+            question: Question to answer (never truncated)
+            results: Retrieval results, best first
+        
+        Returns:
+            Prompt within the token budget (unless the question alone exceeds it)
+        """
+        fixed_tokens = self.count_tokens(format_qa_prompt(question, "")) + self.SPECIAL_TOKENS
+        budget = self.max_input_tokens - fixed_tokens
+        
+        # Piecewise counts can differ slightly from the count of the joined
+        # prompt, so check the result and repack with a tighter budget
+        while True:
+            prompt = format_qa_prompt(question, self._pack_context(results, budget))
+            overflow = self.count_tokens(prompt) + self.SPECIAL_TOKENS - self.max_input_tokens
+            if overflow <= 0 or budget <= 0:
+                return prompt
+            budget -= overflow
+    
+    def count_tokens(self, text: str) -> int:
+        """Count tokens in text, excluding special tokens."""
+        return len(self.tokenizer(text, add_special_tokens=False)["input_ids"])
+    
+    def _pack_context(self, results: List, budget: int) -> str:
+        """Greedily add each result's longest sentence prefix that fits the budget."""
+        parts = []
+        used = 0
+        
+        for result in results:
+            chunk = {
+                "text": "",
+                "section_title": result.section_title,
+                "metadata": result.metadata
+            }
+            # Sources are joined with a newline
+            header_tokens = self.count_tokens(format_source(len(parts) + 1, chunk)) + 1
+            if used + header_tokens >= budget:
+                continue
+            
+            end = 0
+            cost = header_tokens
+            for unit_end, unit_tokens in self._sentence_units(result):
+                if used + cost + unit_tokens > budget:
+                    break
+                end = unit_end
+                cost += unit_tokens
+            
+            if end == 0:
+                continue
+            
+            chunk["text"] = result.text[:end].rstrip()
+            parts.append(format_source(len(parts) + 1, chunk))
+            used += cost
+        
+        return "\n".join(parts)
+    
+    def _sentence_units(self, result) -> List[Tuple[int, int]]:
+        """
+        (end_char, token_count) of each sentence of a chunk, cached by text.
+        Sentence boundaries recorded at ingestion are used when available.
+        """
+        text = result.text
+        with self._lock:
+            units = self._units.get(text)
+            if units is not None:
+                self._units.move_to_end(text)
+                return units
+        
+        ends = self._sentence_ends(text, getattr(result, "sentence_offsets", None))
+        starts = [0] + ends[:-1]
+        pieces = [text[start:end] for start, end in zip(starts, ends)]
+        counts = [
+            len(ids) for ids in
+            self.tokenizer(pieces, add_special_tokens=False)["input_ids"]
+        ] if pieces else []
+        units = list(zip(ends, counts))
+        
+        with self._lock:
+            self._units[text] = units
+            while len(self._units) > self.cache_size:
+                self._units.popitem(last=False)
+        
+        return units
+    
+    def _sentence_ends(self, text: str, sentence_offsets: Optional[List]) -> List[int]:
+        """Character positions where each sentence ends; the last is the text's end."""
+        if sentence_offsets:
+            ends = [end for _, end, _ in sentence_offsets if 0 < end < len(text)]
+        else:
+            ends = [
+                match.start() for match in self.SENTENCE_BOUNDARY.finditer(text)
+                if match.start() > 0
+            ]
+        
+        ends = sorted(set(ends))
+        ends.append(len(text))
+        return ends
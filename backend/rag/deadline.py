@@ -0,0 +1,54 @@
+"""
+Per-request latency deadlines.
+Pipeline stages check the remaining budget and degrade gracefully (smaller
+rerank pool, heuristic instead of cross-encoder reranking, shorter or extractive answers, skipped optional steps),
+recording each degradation so the response can report it.
+"""
+from typing import List, Optional
+import time
+
+
+# Degradations reported in responses
+REDUCED_RERANK_POOL = "reduced_rerank_pool"
+HEURISTIC_RERANK = "heuristic_rerank"
+CAPPED_NEW_TOKENS = "capped_new_tokens"
+EXTRACTIVE_FALLBACK = "extractive_fallback"
+RULES_ONLY_CLASSIFICATION = "rules_only_classification"
+SKIPPED_LIMITATIONS = "skipped_limitations"
+
+
+class Deadline:
+    """Latency budget of one request."""
+    
+    def __init__(self, budget_ms: Optional[float] = None, start_time: float = None):
+        """
+        Start the deadline clock.
+        
+        Args:
+            budget_ms: Latency budget in milliseconds (None for no deadline)
+            start_time: When the budget started (defaults to now)
+        """
+        self.budget_ms = budget_ms
+        self.start_time = start_time or time.time()
+        self.degradations: List[str] = []
+    
+    @property
+    def enabled(self) -> bool:
+        return self.budget_ms is not None
+    
+    def remaining_ms(self) -> float:
+        """Milliseconds left (infinite without a deadline)."""
+        if self.budget_ms is None:
+            return float("inf")
+        return self.budget_ms - (time.time() - self.start_time) * 1000
+    
+    def allows(self, expected_ms: Optional[float]) -> bool:
+        """Whether work expected to take expected_ms fits in the remaining budget."""
+        if self.budget_ms is None:
+            return True
+        return (expected_ms or 0.0) <= self.remaining_ms()
+    
+    def degrade(self, degradation: str):
+        """Record a degradation (once)."""
+        if degradation not in self.degradations:
+            self.degradations.append(degradation)
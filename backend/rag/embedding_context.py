@@ -0,0 +1,60 @@
+"""
+Per-request embedding context.
+Carries the vectors a request already has (the question's, and the stored
+vectors of its retrieved chunks) through the pipeline stages, so later
+stages only encode genuinely new text: the answer, once.
+"""
+from typing import Dict, List, Optional
+import threading
+import numpy as np
+
+
+class EmbeddingContext:
+    """Embeddings of one request, shared by its pipeline stages."""
+    
+    def __init__(self, query_embedding: List[float], chunks: List = ()):
+        """
+        Initialize context.
+        
+        Args:
+            query_embedding: Embedding of the question (used for retrieval)
+            chunks: Retrieved results carrying their stored vectors (embedding)
+        """
+        self.query = _unit(np.asarray(query_embedding, dtype=np.float32))
+        
+        # Unit chunk vectors, when every chunk came with its stored vector
+        self.chunks: Optional[np.ndarray] = None
+        vectors = [getattr(chunk, "embedding", None) for chunk in chunks]
+        if vectors and all(vector is not None for vector in vectors):
+            self.chunks = np.stack([_unit(np.asarray(v, dtype=np.float32)) for v in vectors])
+        
+        self._answers: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+    
+    def answer(self, text: str) -> Optional[np.ndarray]:
+        """Unit vector of an answer, if a stage already encoded it."""
+        with self._lock:
+            return self._answers.get(text)
+    
+    def add_answer(self, text: str, embedding: List[float]) -> np.ndarray:
+        """Record the encoded answer for later stages."""
+        vector = _unit(np.asarray(embedding, dtype=np.float32))
+        with self._lock:
+            self._answers[text] = vector
+        return vector
+    
+    def answer_support(self, text: str) -> Optional[float]:
+        """
+        Cosine similarity between an (already encoded) answer and its closest
+        retrieved chunk, or None if either vector is unavailable.
+        """
+        vector = self.answer(text)
+        if vector is None or self.chunks is None:
+            return None
+        return float(np.max(self.chunks @ vector))
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    """Scale a vector to unit L2 norm (a zero vector stays zero)."""
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
@@ -0,0 +1,137 @@
+"""
+Extractive question answering.
+Answers by selecting the evidence sentences most similar to the question,
+which takes milliseconds instead of a full LLM generation.
+"""
+from typing import List, Tuple
+from collections import OrderedDict
+import re
+import threading
+import numpy as np
+from config import settings
+from ingestion.chunking import TokenAwareChunker
+
+
+class ExtractiveAnswerer:
+    """Builds cited answers from the best-matching sentences of retrieved chunks."""
+    
+    SENTENCE_BOUNDARY = TokenAwareChunker.SENTENCE_BOUNDARY
+    
+    # Markdown decoration stripped from the start of sentences
+    LEADING_MARKUP = re.compile(r'^(?:[#>*\-+]+|\d+\.)\s*')
+    
+    MIN_WORDS = 5
+    
+    # Sentences this similar to an already selected one are skipped
+    REDUNDANCY_THRESHOLD = 0.9
+    
+    def __init__(self, embedding_gen, max_sentences: int = None, cache_size: int = 4096):
+        """
+        Initialize answerer.
+        
+        Args:
+            embedding_gen: Embedding generator used for the query
+            max_sentences: Maximum number of sentences in an answer
+            cache_size: Number of sentence embeddings kept in memory
+        """
+        self.embedding_gen = embedding_gen
+        self.max_sentences = max_sentences or settings.EXTRACTIVE_MAX_SENTENCES
+        self.cache_size = cache_size
+        self._embeddings: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def answer(self, query_embedding: List[float], results: List) -> str:
+        """
+        Assemble an answer from the sentences closest to the query.
+        
+        Args:
+            query_embedding: Embedding of the question
+            results: Reranked retrieval results, best first
+        
+        Returns:
+            Answer with one cited sentence per line
+        """
+        candidates = [
+            (sentence, rank)
+            for rank, result in enumerate(results)
+            for sentence in self._sentences(result)
+        ]
+        if not candidates:
+            return "No answerable sentences found in the retrieved evidence."
+        
+        vectors = self._embed([sentence for sentence, _ in candidates])
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query /= max(np.linalg.norm(query), 1e-12)
+        
+        # Cosine similarity to the question, with a small bonus for
+        # sentences from higher-ranked chunks
+        ranks = np.array([rank for _, rank in candidates], dtype=np.float32)
+        scores = vectors @ query + 0.05 / (1.0 + ranks)
+        
+        selected = []
+        for index in np.argsort(-scores):
+            if selected and np.max(vectors[selected] @ vectors[index]) > self.REDUNDANCY_THRESHOLD:
+                continue
+            selected.append(int(index))
+            if len(selected) >= self.max_sentences:
+                break
+        
+        lines = []
+        for index in selected:
+            sentence, rank = candidates[index]
+            result = results[rank]
+            filename = result.metadata.get("filename", "Unknown")
+            lines.append(f"- {sentence} [{filename} - {result.section_title}]")
+        
+        return "\n".join(lines)
+    
+    def _sentences(self, result) -> List[str]:
+        """Candidate answer sentences of a chunk, without headings and markup."""
+        sentences = []
+        for start, end in self._spans(result):
+            sentence = self.LEADING_MARKUP.sub("", result.text[start:end].strip())
+            sentence = sentence.replace("**", "").strip()
+            
+            # Skip headings, section prefixes and fragments
+            if sentence.startswith("[") and sentence.endswith("]"):
+                continue
+            if len(sentence.split()) < self.MIN_WORDS:
+                continue
+            sentences.append(sentence)
+        return sentences
+    
+    def _spans(self, result) -> List[Tuple[int, int]]:
+        """Sentence spans, from ingestion when recorded, else split here."""
+        sentence_offsets = getattr(result, "sentence_offsets", None)
+        if sentence_offsets:
+            return [(start, end) for start, end, _ in sentence_offsets]
+        
+        spans = []
+        start = 0
+        for match in self.SENTENCE_BOUNDARY.finditer(result.text):
+            spans.append((start, match.start()))
+            start = match.end()
+        spans.append((start, len(result.text)))
+        return spans
+    
+    def _embed(self, sentences: List[str]) -> np.ndarray:
+        """Normalized sentence embeddings, computing only uncached ones in one batch."""
+        with self._lock:
+            known = {}
+            for sentence in dict.fromkeys(sentences):
+                if sentence in self._embeddings:
+                    known[sentence] = self._embeddings[sentence]
+                    self._embeddings.move_to_end(sentence)
+        
+        missing = [sentence for sentence in dict.fromkeys(sentences) if sentence not in known]
+        if missing:
+            vectors = np.array(self.embedding_gen.generate_embeddings(missing), dtype=np.float32)
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            known.update(zip(missing, vectors))
+            
+            with self._lock:
+                self._embeddings.update(zip(missing, vectors))
+                while len(self._embeddings) > self.cache_size:
+                    self._embeddings.popitem(last=False)
+        
+        return np.stack([known[sentence] for sentence in sentences])
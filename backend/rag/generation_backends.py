@@ -0,0 +1,259 @@
+"""
+Pluggable text generation backends for the QA engine.
+All backends run the same seq2seq model (settings.LLM_MODEL) and differ in
+how it is executed on CPU: eager fp32, dynamically int8-quantised, or
+exported to ONNX Runtime.
+"""
+from typing import Dict, Iterator, List, Optional, Type
+from pathlib import Path
+from queue import Empty
+from threading import Event, Lock, Thread
+import torch
+from transformers import (
+    pipeline,
+    AutoTokenizer,
+    AutoModelForSeq2SeqLM,
+    StoppingCriteria,
+    StoppingCriteriaList,
+    TextIteratorStreamer
+)
+from config import settings
+
+
+class GenerationBackend:
+    """Interface of generation backends."""
+    
+    name = None
+    tokenizer = None
+    
+    def generate(self, prompts: List[str], max_new_tokens: Optional[int] = None) -> List[str]:
+        """
+        Generate one answer per prompt.
+        
+        Args:
+            prompts: Prompts to generate for
+            max_new_tokens: Cap on generated tokens (defaults to settings.MAX_TOKENS)
+        
+        Returns:
+            Generated texts, in prompt order
+        """
+        raise NotImplementedError
+    
+    def stream(self, prompt: str, max_new_tokens: Optional[int] = None) -> Iterator[str]:
+        """Generate an answer, yielding text as it is produced."""
+        yield self.generate([prompt], max_new_tokens)[0]
+
+
+class _StopWhenSet(StoppingCriteria):
+    """Stops generate() once an event is set (e.g. the stream was abandoned)."""
+    
+    def __init__(self, event: Event):
+        self.event = event
+    
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        return torch.full((input_ids.shape[0],), self.event.is_set(), dtype=torch.bool, device=input_ids.device)
+
+
+class HFPipelineBackend(GenerationBackend):
+    """Hugging Face text2text-generation pipeline (eager fp32)."""
+    
+    name = "pipeline"
+    
+    def __init__(self, model_name: str = None):
+        """
+        Initialize backend and load the model.
+        
+        Args:
+            model_name: Name of the seq2seq model
+        """
+        self.model_name = model_name or settings.LLM_MODEL
+        self.tokenizer = None
+        self.model = None
+        self.llm = None
+        self._load()
+    
+    def _load(self):
+        """Load tokenizer and model and wrap them in a generation pipeline."""
+        print(f"Loading LLM: {self.model_name} ({self.name} backend)")
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        self.model = self._load_model()
+        
+        self.llm = pipeline(
+            "text2text-generation",
+            model=self.model,
+            tokenizer=self.tokenizer,
+            max_length=settings.MAX_TOKENS,
+            temperature=settings.TEMPERATURE,
+            do_sample=False
+        )
+        print("LLM loaded successfully")
+    
+    def _load_model(self):
+        """Load the seq2seq model to generate with."""
+        return AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
+    
+    def generate(self, prompts: List[str], max_new_tokens: Optional[int] = None) -> List[str]:
+        """Generate one answer per prompt in a single padded batch."""
+        # For seq2seq models max_length bounds the decoder output
+        results = self.llm(
+            prompts,
+            max_length=max_new_tokens or settings.MAX_TOKENS,
+            batch_size=len(prompts)
+        )
+        
+        answers = []
+        for result in results:
+            # The pipeline nests single outputs in a list for some versions
+            if isinstance(result, list):
+                result = result[0]
+            answers.append(result["generated_text"].strip())
+        
+        return answers
+    
+    def stream(self, prompt: str, max_new_tokens: Optional[int] = None) -> Iterator[str]:
+        """
+        Generate an answer, yielding text as tokens are decoded.
+        
+        Raises:
+            TimeoutError: If no text arrives within settings.GENERATION_STREAM_TIMEOUT_SECONDS
+            Exception: Any error raised by generate()
+        """
+        inputs = self.tokenizer(prompt, return_tensors="pt", truncation=True)
+        timeout = settings.GENERATION_STREAM_TIMEOUT_SECONDS
+        streamer = TextIteratorStreamer(
+            self.tokenizer,
+            skip_prompt=True,
+            skip_special_tokens=True,
+            timeout=timeout
+        )
+        stop = Event()
+        errors = []
+        
+        def run():
+            try:
+                self.model.generate(
+                    **inputs,
+                    streamer=streamer,
+                    max_length=max_new_tokens or settings.MAX_TOKENS,
+                    do_sample=False,
+                    stopping_criteria=StoppingCriteriaList([_StopWhenSet(stop)])
+                )
+            except Exception as e:
+                # Hand the error to the consumer instead of leaving it waiting
+                errors.append(e)
+                streamer.end()
+        
+        # generate() pushes decoded text into the streamer from a worker thread
+        generation = Thread(target=run, daemon=True)
+        generation.start()
+        
+        try:
+            for text in streamer:
+                if text:
+                    yield text
+        except Empty:
+            raise TimeoutError(f"No generated text within {timeout} s") from None
+        finally:
+            # Stops generation at the next token if the stream was closed early or timed out
+            stop.set()
+        
+        generation.join()
+        if errors:
+            raise errors[0]
+
+
+class QuantizedTorchBackend(HFPipelineBackend):
+    """PyTorch model with Linear layers dynamically quantised to int8."""
+    
+    name = "int8"
+    
+    def _load_model(self):
+        model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
+        model.eval()
+        
+        # Weights are stored as int8; activations are quantised on the fly
+        return torch.ao.quantization.quantize_dynamic(
+            model,
+            {torch.nn.Linear},
+            dtype=torch.qint8
+        )
+
+
+class ONNXRuntimeBackend(HFPipelineBackend):
+    """
+    ONNX Runtime seq2seq model (via optimum).
+    Exports encoder, decoder and decoder-with-past graphs so decoding reuses
+    the key/value cache instead of re-running attention over the prefix.
+    """
+    
+    name = "onnx"
+    
+    def _load_model(self):
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        except ImportError as e:
+            raise ImportError(
+                "The onnx generation backend requires optimum[onnxruntime]. "
+                "Install it with: pip install optimum[onnxruntime]"
+            ) from e
+        
+        export_dir = self._export_dir()
+        if (export_dir / "config.json").exists():
+            return ORTModelForSeq2SeqLM.from_pretrained(export_dir, use_cache=True)
+        
+        # First run: export the model once and reuse the graphs afterwards
+        print(f"Exporting {self.model_name} to ONNX in {export_dir}")
+        model = ORTModelForSeq2SeqLM.from_pretrained(
+            self.model_name,
+            export=True,
+            use_cache=True
+        )
+        model.save_pretrained(export_dir)
+        return model
+    
+    def _export_dir(self) -> Path:
+        return settings.ONNX_MODEL_DIR / self.model_name.replace("/", "--")
+
+
+GENERATION_BACKENDS: Dict[str, Type[GenerationBackend]] = {
+    HFPipelineBackend.name: HFPipelineBackend,
+    QuantizedTorchBackend.name: QuantizedTorchBackend,
+    ONNXRuntimeBackend.name: ONNXRuntimeBackend
+}
+
+
+def create_generation_backend(name: str = None, model_name: str = None) -> GenerationBackend:
+    """
+    Create a generation backend.
+    
+    Args:
+        name: Backend name ("pipeline", "int8" or "onnx"); defaults to
+            settings.GENERATION_BACKEND
+        model_name: Name of the seq2seq model
+    
+    Returns:
+        Loaded backend
+    """
+    name = name or settings.GENERATION_BACKEND
+    if name not in GENERATION_BACKENDS:
+        raise ValueError(
+            f"Unknown generation backend: {name}. "
+            f"Choose from: {', '.join(GENERATION_BACKENDS)}"
+        )
+    
+    return GENERATION_BACKENDS[name](model_name=model_name)
+
+
+# Global generation backend instance
+_generation_backend = None
+_generation_backend_lock = Lock()
+
+
+def get_generation_backend() -> GenerationBackend:
+    """Get or create the global backend of settings.GENERATION_BACKEND."""
+    global _generation_backend
+    if _generation_backend is None:
+        with _generation_backend_lock:
+            if _generation_backend is None:
+                _generation_backend = create_generation_backend()
+    return _generation_backend
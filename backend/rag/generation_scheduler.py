@@ -0,0 +1,199 @@
+"""
+Cross-request generation batching.
+Queues prompts from concurrent requests and runs them through the LLM in
+batches of similar length, which gives much higher throughput per core
+than generating one prompt at a time.
+"""
+from typing import Callable, Dict, List, Optional
+from collections import Counter, deque
+from concurrent.futures import Future
+import threading
+import time
+import numpy as np
+from config import settings
+
+
+class _PendingPrompt:
+    """A queued prompt and the future its output is delivered to."""
+    
+    __slots__ = ("prompt", "length", "max_new_tokens", "future", "enqueued_at")
+    
+    def __init__(self, prompt: str, max_new_tokens: Optional[int] = None):
+        self.prompt = prompt
+        self.length = max(len(prompt), 1)
+        self.max_new_tokens = max_new_tokens
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class GenerationScheduler:
+    """Batches generation requests by time window, batch size and prompt length."""
+    
+    def __init__(
+        self,
+        generate_batch: Callable[[List[str], Optional[int]], List[str]],
+        max_batch_size: int = None,
+        max_wait_ms: float = None,
+        length_tolerance: float = None
+    ):
+        """
+        Initialize scheduler and start its worker thread.
+        
+        Args:
+            generate_batch: Function generating one output per prompt, given
+                the prompts and their generated token cap
+            max_batch_size: Maximum prompts per generate call
+            max_wait_ms: How long the oldest queued prompt waits for others
+            length_tolerance: Maximum relative length difference between a
+                batch's prompts and its oldest prompt (limits padding waste)
+        """
+        self.generate_batch = generate_batch
+        self.max_batch_size = max_batch_size or settings.GENERATION_MAX_BATCH_SIZE
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else settings.GENERATION_BATCH_WAIT_MS) / 1000
+        self.length_tolerance = (
+            length_tolerance if length_tolerance is not None else settings.GENERATION_LENGTH_TOLERANCE
+        )
+        
+        self._pending: List[_PendingPrompt] = []
+        self._condition = threading.Condition()
+        self._closed = False
+        
+        self.batches = 0
+        self.prompts = 0
+        self.failures = 0
+        self.batch_sizes = Counter()
+        self._queue_waits = deque(maxlen=1000)
+        self._batch_times = deque(maxlen=1000)
+        
+        self._worker = threading.Thread(target=self._run, name="generation-scheduler", daemon=True)
+        self._worker.start()
+    
+    def submit(self, prompt: str, max_new_tokens: Optional[int] = None) -> Future:
+        """Queue a prompt; the returned future resolves to its output."""
+        pending = _PendingPrompt(prompt, max_new_tokens)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Generation scheduler is shut down")
+            self._pending.append(pending)
+            self._condition.notify()
+        return pending.future
+    
+    @property
+    def queued(self) -> int:
+        """Number of prompts waiting for a batch."""
+        with self._condition:
+            return len(self._pending)
+    
+    def generate(self, prompt: str, max_new_tokens: Optional[int] = None) -> str:
+        """Generate output for one prompt, batched with concurrent requests."""
+        return self.submit(prompt, max_new_tokens).result()
+    
+    def shutdown(self):
+        """Stop the worker after the queued prompts are generated."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._worker.join()
+    
+    def get_stats(self) -> Dict:
+        """Batch size and queue wait metrics."""
+        with self._condition:
+            waits = np.array(self._queue_waits) * 1000
+            batch_times = np.array(self._batch_times) * 1000
+            return {
+                "enabled": True,
+                "queued": len(self._pending),
+                "batches": self.batches,
+                "prompts": self.prompts,
+                "failures": self.failures,
+                "mean_batch_size": self.prompts / self.batches if self.batches else 0.0,
+                "batch_size_distribution": dict(sorted(self.batch_sizes.items())),
+                "queue_wait_ms": _summary(waits),
+                "batch_time_ms": _summary(batch_times),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000
+            }
+    
+    def _run(self):
+        """Worker loop: collect a batch, generate, deliver outputs."""
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                
+                # Give concurrent requests until the oldest prompt's deadline to join
+                deadline = self._pending[0].enqueued_at + self.max_wait
+                while len(self._pending) < self.max_batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                
+                batch = self._select_batch()
+            
+            self._run_batch(batch)
+    
+    def _select_batch(self) -> List[_PendingPrompt]:
+        """
+        Take the oldest prompt plus queued prompts of similar length and the
+        same generated token cap. Prompts left behind are batched next, with
+        their own peers.
+        """
+        anchor = self._pending[0]
+        low = anchor.length / (1 + self.length_tolerance)
+        high = anchor.length * (1 + self.length_tolerance)
+        
+        batch = []
+        remaining = []
+        for pending in self._pending:
+            if (
+                len(batch) < self.max_batch_size
+                and low <= pending.length <= high
+                and pending.max_new_tokens == anchor.max_new_tokens
+            ):
+                batch.append(pending)
+            else:
+                remaining.append(pending)
+        
+        self._pending = remaining
+        return batch
+    
+    def _run_batch(self, batch: List[_PendingPrompt]):
+        """Generate a batch and route each output to its request."""
+        started = time.monotonic()
+        try:
+            outputs = self.generate_batch(
+                [pending.prompt for pending in batch],
+                batch[0].max_new_tokens
+            )
+        except Exception as e:
+            with self._condition:
+                self.failures += len(batch)
+            for pending in batch:
+                pending.future.set_exception(e)
+            return
+        
+        finished = time.monotonic()
+        with self._condition:
+            self.batches += 1
+            self.prompts += len(batch)
+            self.batch_sizes[len(batch)] += 1
+            self._batch_times.append(finished - started)
+            self._queue_waits.extend(started - pending.enqueued_at for pending in batch)
+        
+        for pending, output in zip(batch, outputs):
+            pending.future.set_result(output)
+
+
+def _summary(values_ms: np.ndarray) -> Dict[str, float]:
+    """Mean, p95 and max of a series of millisecond timings."""
+    if len(values_ms) == 0:
+        return {"mean": 0.0, "p95": 0.0, "max": 0.0}
+    
+    return {
+        "mean": float(values_ms.mean()),
+        "p95": float(np.percentile(values_ms, 95)),
+        "max": float(values_ms.max())
+    }
@@ -65,15 +65,20 @@ def format_context(retrieved_chunks: list) -> str:
     context_parts = []
     
     for i, chunk in enumerate(retrieved_chunks, 1):
-        section = chunk.get("section_title", "Document")
-        text = chunk.get("text", "")
-        filename = chunk.get("metadata", {}).get("filename", "Unknown")
-        
-        context_parts.append(f"[Source {i}: {filename} - {section}]\n{text}\n")
+        context_parts.append(format_source(i, chunk))
     
     return "\n".join(context_parts)
 
 
+def format_source(index: int, chunk: dict) -> str:
+    """Format one retrieved chunk as a numbered source."""
+    section = chunk.get("section_title", "Document")
+    text = chunk.get("text", "")
+    filename = chunk.get("metadata", {}).get("filename", "Unknown")
+    
+    return f"[Source {index}: {filename} - {section}]\n{text}\n"
+
+
 def format_qa_prompt(question: str, context: str) -> str:
     """Format the QA prompt with question and context."""
     return QA_PROMPT_TEMPLATE.format(
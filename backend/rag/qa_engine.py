@@ -2,14 +2,15 @@
 RAG Question Answering Engine.
 Implements evidence-grounded QA with confidence scoring and citations.
 """
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import json
 import re
+import threading
 import time
-from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
 from config import settings
 from ingestion.embeddings import get_embedding_generator
 from retrieval.vector_store import get_vector_store
-from retrieval.reranker import get_reranker
+from retrieval.reranker import RerankedResult, get_reranker
 from rag.prompts import (
     SYSTEM_PROMPT,
     format_context,
@@ -20,9 +21,28 @@ from rag.response_schemas import (
     RAGResponse,
     Citation,
     RiskCategory,
+    AnswerMode,
     QuestionRequest,
     QuestionResponse
 )
+from rag.answer_cache import get_answer_cache, normalize_question
+from rag.context_packer import ContextPacker
+from rag.deadline import (
+    Deadline,
+    REDUCED_RERANK_POOL,
+    HEURISTIC_RERANK,
+    CAPPED_NEW_TOKENS,
+    EXTRACTIVE_FALLBACK,
+    RULES_ONLY_CLASSIFICATION,
+    SKIPPED_LIMITATIONS
+)
+from rag.embedding_context import EmbeddingContext
+from rag.extractive import ExtractiveAnswerer
+from rag.generation_backends import GenerationBackend, get_generation_backend
+from rag.generation_scheduler import GenerationScheduler
+from rag.single_flight import SingleFlight
+from rag.stage_graph import StageGraph
+from analytics.tracing import Trace
 from risk.classifier import get_risk_classifier
 from risk.confidence import get_confidence_calibrator
 
@@ -30,16 +50,52 @@ from risk.confidence import get_confidence_calibrator
 class QAEngine:
     """Question answering engine with RAG."""
     
-    def __init__(self):
-        """Initialize QA engine."""
+    # Stages run after the answer, and everything run after the embedding
+    POST_GENERATION_STAGES = ("classification", "calibration", "limitations")
+    RETRIEVAL_STAGES = ("vector_search", "rerank", "context_packing", "generation") + POST_GENERATION_STAGES
+    
+    # Stages whose latency is not representative when a degradation applied
+    DEGRADED_STAGES = {
+        REDUCED_RERANK_POOL: "rerank",
+        HEURISTIC_RERANK: "rerank",
+        CAPPED_NEW_TOKENS: "generation",
+        RULES_ONLY_CLASSIFICATION: "classification"
+    }
+    
+    def __init__(self, generator: GenerationBackend = None):
+        """
+        Initialize QA engine.
+        
+        Args:
+            generator: Generation backend (defaults to settings.GENERATION_BACKEND)
+        """
         self.embedding_gen = get_embedding_generator()
         self.vector_store = get_vector_store()
         self.reranker = get_reranker()
         self.risk_classifier = get_risk_classifier()
         self.confidence_calibrator = get_confidence_calibrator()
-        self.llm = None
+        self.answer_cache = get_answer_cache() if settings.ANSWER_CACHE_ENABLED else None
+        
+        # Identical concurrent questions share one pipeline run
+        self.single_flight = SingleFlight() if settings.SINGLE_FLIGHT_ENABLED else None
+        self.generator = generator
         self.tokenizer = None
         self._load_llm()
+        
+        # Fit evidence into the LLM's token budget without cutting the question
+        self.context_packer = None
+        if self.tokenizer is not None:
+            self.context_packer = ContextPacker(self.tokenizer)
+        
+        # Batch prompts of concurrent requests into one generate call
+        self.generation_scheduler = None
+        if settings.GENERATION_BATCHING:
+            self.generation_scheduler = GenerationScheduler(self._generate_batch)
+        
+        # Answers without the LLM, and recent per-stage latencies (ms) that
+        # decide between the two in auto mode and plan work within deadlines
+        self.extractive = ExtractiveAnswerer(self.embedding_gen)
+        self._stage_latency: Dict[str, float] = {}
     
     def _load_llm(self):
         """Load language model for generation."""
@@ -48,25 +104,18 @@ class QAEngine:
             print("OpenAI integration not implemented in this version")
             print("Falling back to local model")
         
-        print(f"Loading LLM: {settings.LLM_MODEL}")
-        self.tokenizer = AutoTokenizer.from_pretrained(settings.LLM_MODEL)
-        model = AutoModelForSeq2SeqLM.from_pretrained(settings.LLM_MODEL)
-        
-        self.llm = pipeline(
-            "text2text-generation",
-            model=model,
-            tokenizer=self.tokenizer,
-            max_length=settings.MAX_TOKENS,
-            temperature=settings.TEMPERATURE,
-            do_sample=False
-        )
-        print("LLM loaded successfully")
+        if self.generator is None:
+            self.generator = get_generation_backend()
+        self.tokenizer = self.generator.tokenizer
     
     def answer_question(
         self,
         question: str,
         filters: Optional[dict] = None,
-        top_k: int = 5
+        top_k: int = 5,
+        answer_mode: AnswerMode = AnswerMode.GENERATIVE,
+        deadline_ms: Optional[float] = None,
+        received_at: Optional[float] = None
     ) -> QuestionResponse:
         """
         Answer a question using RAG.
@@ -75,65 +124,749 @@ class QAEngine:
             question: Question to answer
             filters: Optional metadata filters for retrieval
             top_k: Number of chunks to retrieve
+            answer_mode: Generative, extractive or auto
+            deadline_ms: Latency budget (defaults to settings.QA_DEFAULT_DEADLINE_MS)
+            received_at: When the request arrived, so queueing counts against the deadline
             
         Returns:
-            Structured response with answer and metadata
+            Structured response with answer, metadata, per-stage timings and
+            the degradations applied to meet the deadline
         """
         start_time = time.time()
+        deadline = self._deadline(deadline_ms, received_at or start_time)
+        trace = Trace("answer_question", top_k=top_k, answer_mode=answer_mode.value)
+        
+        if self.single_flight is None:
+            response = self._answer(question, filters, top_k, answer_mode, start_time, trace, deadline)
+        else:
+            key = (
+                normalize_question(question),
+                json.dumps(filters or {}, sort_keys=True),
+                top_k,
+                answer_mode.value
+            )
+            (response, degradations), coalesced = self.single_flight.run(
+                key,
+                lambda: (
+                    self._answer(question, filters, top_k, answer_mode, start_time, trace, deadline),
+                    deadline.degradations
+                ),
+                timeout=self._coalescing_timeout(deadline)
+            )
+            if coalesced:
+                # The leader's answer, with the leader's degradations
+                response = self._cached_response(response, question, "coalesced", start_time)
+                for degradation in degradations:
+                    deadline.degrade(degradation)
+        
+        trace.finish()
+        return self._finish_response(response, trace, deadline)
+    
+    def _coalescing_timeout(self, deadline: Deadline) -> Optional[float]:
+        """
+        How long (seconds) to wait for an identical in-flight request: as long
+        as this request could still answer on its own within its deadline.
+        """
+        if not deadline.enabled:
+            return None
+        return max(0.0, deadline.remaining_ms() - self._expected_ms(*self.RETRIEVAL_STAGES)) / 1000
+    
+    def _answer(
+        self,
+        question: str,
+        filters: Optional[dict],
+        top_k: int,
+        answer_mode: AnswerMode,
+        start_time: float,
+        trace: Trace,
+        deadline: Deadline
+    ) -> QuestionResponse:
+        """Serve a question from the answer cache or the full pipeline."""
+        index_version = self.vector_store.version
+        
+        # Repeated question: serve the cached answer
+        if self.answer_cache is not None:
+            with trace.span("cache_lookup"):
+                cached = self.answer_cache.get_exact(question, filters, top_k, index_version)
+            if cached is not None:
+                return self._cached_response(cached, question, "exact", start_time)
         
         # Step 1: Generate query embedding
-        query_embedding = self.embedding_gen.generate_embedding(question)
+        with trace.span("embedding"):
+            query_embedding = self.embedding_gen.generate_embedding(question)
         
-        # Step 2: Retrieve relevant chunks
-        retrieval_results = self.vector_store.search(
+        # Paraphrase of a cached question: serve its answer
+        if self.answer_cache is not None:
+            with trace.span("cache_lookup"):
+                cached = self.answer_cache.get_semantic(query_embedding, filters, top_k, index_version)
+            if cached is not None:
+                return self._cached_response(cached, question, "semantic", start_time)
+        
+        response = self._answer_uncached(
+            question,
             query_embedding,
-            top_k=top_k * 2,  # Get more for reranking
-            filters=filters
+            filters,
+            top_k,
+            answer_mode,
+            start_time,
+            trace,
+            deadline
         )
         
-        # Step 3: Rerank results
-        reranked_results = self.reranker.rerank(
+        if self._cacheable(response, deadline):
+            self.answer_cache.put(
+                question,
+                filters,
+                top_k,
+                query_embedding,
+                response,
+                index_version
+            )
+        
+        return response
+    
+    def _answer_uncached(
+        self,
+        question: str,
+        query_embedding: List[float],
+        filters: Optional[dict],
+        top_k: int,
+        answer_mode: AnswerMode,
+        start_time: float,
+        trace: Trace,
+        deadline: Deadline
+    ) -> QuestionResponse:
+        """Run the full retrieval and generation pipeline."""
+        # Steps 2-3: Retrieve and rerank relevant chunks
+        reranked_results = self._retrieve(
             question,
-            retrieval_results,
-            top_k=top_k
+            query_embedding,
+            filters,
+            top_k,
+            trace,
+            candidates=self._candidate_pool(top_k, deadline),
+            deadline=deadline
         )
         
         # Step 4: Check if we have sufficient evidence
-        if not reranked_results or len(reranked_results) < settings.MIN_EVIDENCE_CHUNKS:
+        if not self._has_sufficient_evidence(reranked_results):
             # Insufficient evidence - return refusal
             return self._create_refusal_response(question, reranked_results)
         
-        # Step 5: Format context from retrieved chunks
-        context = self._format_retrieved_context(reranked_results)
+        # Vectors already computed for this request, shared by later stages
+        context = EmbeddingContext(query_embedding, reranked_results)
         
-        # Step 6: Generate answer
-        prompt = format_qa_prompt(question, context)
-        answer = self._generate_answer(prompt)
+        mode = self._resolve_answer_mode(answer_mode, start_time)
+        mode, max_new_tokens = self._plan_generation(mode, deadline)
         
-        # Step 7: Classify risk category
-        risk_category = self.risk_classifier.classify(question, answer, reranked_results)
+        # Steps 5-11 as a dependency graph: citations and evidence coverage
+        # only need the evidence, so they run while the answer is produced
+        graph = StageGraph(trace=trace)
+        if mode == AnswerMode.EXTRACTIVE:
+            # Steps 5-6: Select the best evidence sentences
+            answer_stage = "extraction"
+            graph.add(
+                "extraction",
+                lambda results: self.extractive.answer(query_embedding, reranked_results)
+            )
+        else:
+            # Step 5: Pack retrieved chunks into the prompt; Step 6: Generate answer
+            answer_stage = "generation"
+            graph.add(
+                "context_packing",
+                lambda results: self._build_prompt(question, reranked_results)
+            )
+            graph.add(
+                "generation",
+                lambda results: self._generate_answer(results["context_packing"], max_new_tokens),
+                after=["context_packing"]
+            )
         
-        # Step 8: Calculate confidence score
-        confidence = self.confidence_calibrator.calculate_confidence(
-            question=question,
-            answer=answer,
-            retrieved_chunks=reranked_results,
-            risk_category=risk_category
+        graph.add(
+            "citations",
+            lambda results: self._extract_citations(reranked_results)
+        )
+        graph.add(
+            "evidence_coverage",
+            lambda results: self._calculate_evidence_coverage(question, reranked_results)
+        )
+        graph.add(
+            "classification",
+            lambda results: self._classify(question, results[answer_stage], reranked_results, deadline, context),
+            after=[answer_stage]
+        )
+        graph.add(
+            "calibration",
+            lambda results: self.confidence_calibrator.calculate_confidence(
+                question=question,
+                answer=results[answer_stage],
+                retrieved_chunks=reranked_results,
+                risk_category=results["classification"],
+                context=context
+            ),
+            after=[answer_stage, "classification"]
+        )
+        graph.add(
+            "limitations",
+            lambda results: self._limitations(results[answer_stage], deadline),
+            after=[answer_stage]
+        )
+        results = graph.run()
+        
+        response = self._assemble_response(
+            question,
+            results[answer_stage],
+            reranked_results,
+            results["classification"],
+            results["calibration"],
+            results["citations"],
+            results["limitations"],
+            results["evidence_coverage"],
+            start_time
+        )
+        response.answer_mode = mode.value
+        return response
+    
+    def stream_answer(
+        self,
+        question: str,
+        filters: Optional[dict] = None,
+        top_k: int = 5,
+        answer_mode: AnswerMode = AnswerMode.GENERATIVE,
+        deadline_ms: Optional[float] = None,
+        received_at: Optional[float] = None
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Answer a question, yielding results as soon as each part is ready.
+        Deadlines are handled as in answer_question.
+        
+        Yields:
+            ("retrieval", dict) with citations and retrieval metadata once
+            reranking is done, ("token", str) for each generated text piece
+            (an extractive answer is a single piece), and finally
+            ("final", QuestionResponse) with the complete response
+        """
+        start_time = time.time()
+        deadline = self._deadline(deadline_ms, received_at or start_time)
+        trace = Trace("stream_answer", top_k=top_k, answer_mode=answer_mode.value)
+        index_version = self.vector_store.version
+        
+        cached = None
+        if self.answer_cache is not None:
+            with trace.span("cache_lookup"):
+                cached = self.answer_cache.get_exact(question, filters, top_k, index_version)
+            cache_hit = "exact"
+        
+        query_embedding = None
+        if cached is None:
+            with trace.span("embedding"):
+                query_embedding = self.embedding_gen.generate_embedding(question)
+            if self.answer_cache is not None:
+                with trace.span("cache_lookup"):
+                    cached = self.answer_cache.get_semantic(query_embedding, filters, top_k, index_version)
+                cache_hit = "semantic"
+        
+        if cached is not None:
+            response = self._cached_response(cached, question, cache_hit, start_time)
+            trace.finish()
+            response.timings = trace.timings()
+            yield "retrieval", self._retrieval_event(
+                response.response.citations,
+                response.retrieved_chunks,
+                response.response.evidence_coverage,
+                start_time
+            )
+            yield "token", response.response.answer
+            yield "final", response
+            return
+        
+        reranked_results = self._retrieve(
+            question,
+            query_embedding,
+            filters,
+            top_k,
+            trace,
+            candidates=self._candidate_pool(top_k, deadline),
+            deadline=deadline
+        )
+        
+        if not self._has_sufficient_evidence(reranked_results):
+            response = self._create_refusal_response(question, reranked_results)
+            yield "retrieval", self._retrieval_event([], len(reranked_results), 0.0, start_time)
+            yield "token", response.response.answer
+        else:
+            citations = self._extract_citations(reranked_results)
+            yield "retrieval", self._retrieval_event(
+                citations,
+                len(reranked_results),
+                self._calculate_evidence_coverage(question, reranked_results),
+                start_time
+            )
+            
+            mode = self._resolve_answer_mode(answer_mode, start_time)
+            mode, max_new_tokens = self._plan_generation(mode, deadline)
+            if mode == AnswerMode.EXTRACTIVE:
+                with trace.span("extraction"):
+                    answer = self.extractive.answer(query_embedding, reranked_results)
+                yield "token", answer
+            else:
+                with trace.span("context_packing"):
+                    prompt = self._build_prompt(question, reranked_results)
+                
+                pieces = []
+                with trace.span("generation"):
+                    tokens = self._generate_answer_stream(prompt, max_new_tokens)
+                    try:
+                        for piece in tokens:
+                            pieces.append(piece)
+                            yield "token", piece
+                    finally:
+                        # Closing this stream early stops generation too
+                        if hasattr(tokens, "close"):
+                            tokens.close()
+                answer = "".join(pieces).strip()
+            
+            response = self._build_response(
+                question,
+                answer,
+                reranked_results,
+                start_time,
+                trace,
+                deadline,
+                context=EmbeddingContext(query_embedding, reranked_results)
+            )
+            response.answer_mode = mode.value
+        
+        if self._cacheable(response, deadline):
+            self.answer_cache.put(
+                question,
+                filters,
+                top_k,
+                query_embedding,
+                response,
+                index_version
+            )
+        
+        trace.finish()
+        yield "final", self._finish_response(response, trace, deadline)
+    
+    def answer_batch(
+        self,
+        questions: List[str],
+        filters: Optional[dict] = None,
+        top_k: int = 5,
+        answer_mode: AnswerMode = AnswerMode.GENERATIVE
+    ) -> Iterator[Tuple[int, QuestionResponse]]:
+        """
+        Answer many questions, sharing each stage's model and index calls.
+        
+        Questions are embedded in one call, searched with one FAISS call and
+        reranked together; answers are generated in batches of similar-length
+        prompts and classified in bulk.
+        
+        Args:
+            questions: Questions to answer
+            filters: Optional metadata filters applied to every question
+            top_k: Number of chunks to retrieve per question
+            answer_mode: Generative, extractive or auto
+        
+        Yields:
+            (index, response) as each answer completes, not in question order
+        """
+        start_time = time.time()
+        trace = Trace("answer_batch", questions=len(questions), top_k=top_k, answer_mode=answer_mode.value)
+        index_version = self.vector_store.version
+        pending = list(range(len(questions)))
+        
+        def respond(indices: List[int], answers: List[str], mode: AnswerMode):
+            """Classify a group of answers in bulk and build their responses."""
+            contexts = [EmbeddingContext(embeddings[i], reranked[i]) for i in indices]
+            with trace.span("classification"):
+                risk_scores = self.risk_classifier.classify_batch(
+                    [(questions[i], answer) for i, answer in zip(indices, answers)],
+                    contexts=contexts
+                )
+            
+            for i, answer, scores, context in zip(indices, answers, risk_scores, contexts):
+                response = self._build_response(
+                    questions[i],
+                    answer,
+                    reranked[i],
+                    start_time,
+                    trace,
+                    risk_category=scores.category,
+                    context=context
+                )
+                response.answer_mode = mode.value
+                
+                if self.answer_cache is not None and mode != AnswerMode.EXTRACTIVE:
+                    self.answer_cache.put(
+                        questions[i],
+                        filters,
+                        top_k,
+                        embeddings[i],
+                        response,
+                        index_version
+                    )
+                yield i, response
+        
+        # Repeated questions: serve cached answers
+        if self.answer_cache is not None:
+            with trace.span("cache_lookup"):
+                hits = {
+                    i: self.answer_cache.get_exact(questions[i], filters, top_k, index_version)
+                    for i in pending
+                }
+            for i, cached in hits.items():
+                if cached is not None:
+                    yield i, self._cached_response(cached, questions[i], "exact", start_time)
+            pending = [i for i in pending if hits[i] is None]
+        
+        if not pending:
+            trace.finish()
+            return
+        
+        # Step 1: Embed every question in one call
+        with trace.span("embedding"):
+            embeddings = dict(zip(
+                pending,
+                self.embedding_gen.generate_embeddings([questions[i] for i in pending])
+            ))
+        
+        # Paraphrases of cached questions: serve their answers
+        if self.answer_cache is not None:
+            with trace.span("cache_lookup"):
+                hits = {
+                    i: self.answer_cache.get_semantic(embeddings[i], filters, top_k, index_version)
+                    for i in pending
+                }
+            for i, cached in hits.items():
+                if cached is not None:
+                    yield i, self._cached_response(cached, questions[i], "semantic", start_time)
+            pending = [i for i in pending if hits[i] is None]
+        
+        # Steps 2-3: One batched search, then rerank every question's candidates
+        with trace.span("vector_search"):
+            retrieved = self.vector_store.search_batch(
+                [embeddings[i] for i in pending],
+                top_k=self.reranker.candidate_pool(top_k),  # Get more for reranking
+                filters=filters,
+                with_vectors=True
+            )
+        with trace.span("rerank"):
+            reranked = dict(zip(
+                pending,
+                self.reranker.rerank_batch([questions[i] for i in pending], retrieved, top_k=top_k)
+            ))
+        
+        # Step 4: Refuse questions without sufficient evidence
+        extractive = []
+        generative = []
+        for i in pending:
+            if not self._has_sufficient_evidence(reranked[i]):
+                yield i, self._create_refusal_response(questions[i], reranked[i])
+            elif self._resolve_answer_mode(answer_mode, time.time()) == AnswerMode.EXTRACTIVE:
+                extractive.append(i)
+            else:
+                generative.append(i)
+        
+        # Steps 5-6: Extract the cheap answers first
+        if extractive:
+            with trace.span("extraction"):
+                answers = [self.extractive.answer(embeddings[i], reranked[i]) for i in extractive]
+            yield from respond(extractive, answers, AnswerMode.EXTRACTIVE)
+        
+        # Steps 5-6: Generate in batches of similar-length prompts
+        with trace.span("context_packing"):
+            prompts = {i: self._build_prompt(questions[i], reranked[i]) for i in generative}
+        generative.sort(key=lambda i: len(prompts[i]))
+        
+        batch_size = settings.GENERATION_MAX_BATCH_SIZE
+        for offset in range(0, len(generative), batch_size):
+            batch = generative[offset:offset + batch_size]
+            with trace.span("generation"):
+                answers = self._generate_many([prompts[i] for i in batch])
+            yield from respond(batch, answers, AnswerMode.GENERATIVE)
+        
+        trace.finish()
+    
+    def _retrieve(
+        self,
+        question: str,
+        query_embedding: List[float],
+        filters: Optional[dict],
+        top_k: int,
+        trace: Optional[Trace] = None,
+        candidates: Optional[int] = None,
+        deadline: Optional[Deadline] = None
+    ) -> List[RerankedResult]:
+        """Retrieve candidate chunks and rerank them."""
+        trace = trace or Trace("retrieve")
+        deadline = deadline or Deadline()
+        
+        # Step 2: Retrieve relevant chunks
+        with trace.span("vector_search"):
+            retrieval_results = self.vector_store.search(
+                query_embedding,
+                top_k=candidates or self.reranker.candidate_pool(top_k),  # Get more for reranking
+                filters=filters,
+                with_vectors=True
+            )
+        
+        # Step 3: Rerank results
+        with trace.span("rerank"):
+            return self.reranker.rerank(
+                question,
+                retrieval_results,
+                top_k=top_k,
+                use_cross_encoder=self._plan_reranking(question, retrieval_results, top_k, deadline)
+            )
+    
+    def _resolve_answer_mode(self, answer_mode: AnswerMode, start_time: float) -> AnswerMode:
+        """Pick the mode for auto requests from generation load and expected latency."""
+        if answer_mode != AnswerMode.AUTO:
+            return answer_mode
+        
+        if (
+            self.generation_scheduler is not None
+            and self.generation_scheduler.queued >= settings.AUTO_MAX_GENERATION_QUEUE
+        ):
+            return AnswerMode.EXTRACTIVE
+        
+        generation_ms = self._stage_latency.get("generation")
+        if generation_ms is not None:
+            expected_ms = (time.time() - start_time) * 1000 + generation_ms
+            if expected_ms > settings.AUTO_LATENCY_BUDGET_MS:
+                return AnswerMode.EXTRACTIVE
+        
+        return AnswerMode.GENERATIVE
+    
+    def _deadline(self, deadline_ms: Optional[float], start_time: float) -> Deadline:
+        """Deadline of a request, falling back to the configured default."""
+        if deadline_ms is None:
+            deadline_ms = settings.QA_DEFAULT_DEADLINE_MS
+        return Deadline(deadline_ms, start_time)
+    
+    def _expected_ms(self, *stages: str) -> float:
+        """Expected time of the given stages from recent requests (unknown stages count 0)."""
+        return sum(self._stage_latency.get(stage, 0.0) for stage in stages)
+    
+    def _candidate_pool(self, top_k: int, deadline: Deadline) -> int:
+        """Number of chunks to rerank: the reranker's pool, or just top_k when the deadline is tight."""
+        if deadline.allows(self._expected_ms(*self.RETRIEVAL_STAGES)):
+            return self.reranker.candidate_pool(top_k)
+        
+        deadline.degrade(REDUCED_RERANK_POOL)
+        return top_k
+    
+    def _plan_reranking(
+        self,
+        question: str,
+        results: List,
+        top_k: int,
+        deadline: Deadline
+    ) -> bool:
+        """
+        Whether to rerank with the cross-encoder: only if scoring is expected
+        to leave time for the rest of the pipeline; otherwise the keyword
+        heuristic reranks instead.
+        """
+        if self.reranker.cross_encoder is None:
+            return False
+        
+        budget_ms = None
+        if deadline.enabled:
+            budget_ms = deadline.remaining_ms() - self._expected_ms(
+                "context_packing",
+                "generation",
+                *self.POST_GENERATION_STAGES
+            )
+        
+        if self.reranker.plan_cross_encoding([question], [results], top_k, budget_ms):
+            return True
+        
+        deadline.degrade(HEURISTIC_RERANK)
+        return False
+    
+    def _plan_generation(self, mode: AnswerMode, deadline: Deadline) -> Tuple[AnswerMode, Optional[int]]:
+        """
+        Fit generation into the remaining budget.
+        
+        Returns:
+            The mode to answer with, and a cap on generated tokens (None for
+            the default). Generation time grows with the number of generated
+            tokens, so the cap is scaled to the time available; when even a
+            short answer would not fit, the answer is extracted instead.
+        """
+        if mode != AnswerMode.GENERATIVE or not deadline.enabled:
+            return mode, None
+        
+        available_ms = deadline.remaining_ms() - self._expected_ms(
+            "context_packing",
+            *self.POST_GENERATION_STAGES
+        )
+        generation_ms = self._stage_latency.get("generation")
+        
+        if available_ms > 0 and (generation_ms is None or available_ms >= generation_ms):
+            return mode, None
+        
+        max_new_tokens = 0
+        if available_ms > 0:
+            max_new_tokens = int(settings.MAX_TOKENS * available_ms / generation_ms)
+        
+        if max_new_tokens < settings.DEADLINE_MIN_NEW_TOKENS:
+            deadline.degrade(EXTRACTIVE_FALLBACK)
+            return AnswerMode.EXTRACTIVE, None
+        
+        deadline.degrade(CAPPED_NEW_TOKENS)
+        return mode, max_new_tokens
+    
+    def reset_stage_latencies(self):
+        """Forget the recent stage latencies (e.g. cold timings of a warm-up run)."""
+        self._stage_latency = {}
+    
+    def _record_stage_latencies(self, timings: Dict[str, float], deadline: Deadline):
+        """Update the moving averages of stage latency from a finished request."""
+        skipped = {self.DEGRADED_STAGES.get(degradation) for degradation in deadline.degradations}
+        
+        for stage, duration_ms in timings.items():
+            if stage == "total" or stage in skipped:
+                continue
+            previous = self._stage_latency.get(stage)
+            if previous is None:
+                self._stage_latency[stage] = duration_ms
+            else:
+                self._stage_latency[stage] = 0.8 * previous + 0.2 * duration_ms
+    
+    def _finish_response(
+        self,
+        response: QuestionResponse,
+        trace: Trace,
+        deadline: Deadline
+    ) -> QuestionResponse:
+        """Attach the finished trace's timings and the degradations applied."""
+        timings = trace.timings()
+        self._record_stage_latencies(timings, deadline)
+        return response.model_copy(update={
+            "timings": timings,
+            "degradations": list(deadline.degradations) or None
+        })
+    
+    def _cacheable(self, response: QuestionResponse, deadline: Deadline) -> bool:
+        """
+        Whether to cache a response. Extractive answers are cheap to recompute,
+        degraded answers should not outlive their deadline, and cached
+        generative answers are served to any mode.
+        """
+        return (
+            self.answer_cache is not None
+            and response.answer_mode != AnswerMode.EXTRACTIVE.value
+            and not deadline.degradations
         )
+    
+    def _has_sufficient_evidence(self, results: List) -> bool:
+        """Check whether enough evidence was retrieved to attempt an answer."""
+        return bool(results) and len(results) >= settings.MIN_EVIDENCE_CHUNKS
+    
+    def _build_response(
+        self,
+        question: str,
+        answer: str,
+        reranked_results: List,
+        start_time: float,
+        trace: Optional[Trace] = None,
+        deadline: Optional[Deadline] = None,
+        risk_category: Optional[RiskCategory] = None,
+        context: Optional[EmbeddingContext] = None
+    ) -> QuestionResponse:
+        """Classify (unless already classified), score and cite a generated answer."""
+        trace = trace or Trace("build_response")
+        deadline = deadline or Deadline()
+        
+        if risk_category is None:
+            # Step 7: Classify risk category
+            with trace.span("classification"):
+                risk_category = self._classify(question, answer, reranked_results, deadline, context)
+        
+        # Step 8: Calculate confidence score
+        with trace.span("calibration"):
+            confidence = self.confidence_calibrator.calculate_confidence(
+                question=question,
+                answer=answer,
+                retrieved_chunks=reranked_results,
+                risk_category=risk_category,
+                context=context
+            )
         
         # Step 9: Extract citations
-        citations = self._extract_citations(reranked_results)
+        with trace.span("citations"):
+            citations = self._extract_citations(reranked_results)
         
         # Step 10: Extract limitations
-        limitations = self._extract_limitations(answer)
+        with trace.span("limitations"):
+            limitations = self._limitations(answer, deadline)
         
         # Step 11: Calculate evidence coverage
-        evidence_coverage = self._calculate_evidence_coverage(
+        with trace.span("evidence_coverage"):
+            evidence_coverage = self._calculate_evidence_coverage(
+                question,
+                reranked_results
+            )
+        
+        return self._assemble_response(
             question,
-            reranked_results
+            answer,
+            reranked_results,
+            risk_category,
+            confidence,
+            citations,
+            limitations,
+            evidence_coverage,
+            start_time
         )
+    
+    def _classify(
+        self,
+        question: str,
+        answer: str,
+        reranked_results: List,
+        deadline: Deadline,
+        context: Optional[EmbeddingContext] = None
+    ) -> RiskCategory:
+        """Classify the risk category, by keywords only when short of time."""
+        use_embeddings = deadline.allows(self._expected_ms(*self.POST_GENERATION_STAGES))
+        if not use_embeddings:
+            deadline.degrade(RULES_ONLY_CLASSIFICATION)
         
-        # Create response
+        return self.risk_classifier.classify(
+            question,
+            answer,
+            reranked_results,
+            use_embeddings=use_embeddings,
+            context=context
+        )
+    
+    def _limitations(self, answer: str, deadline: Deadline) -> Optional[str]:
+        """Extract limitations (optional; skipped past the deadline)."""
+        if deadline.remaining_ms() <= 0:
+            deadline.degrade(SKIPPED_LIMITATIONS)
+            return None
+        
+        return self._extract_limitations(answer)
+    
+    def _assemble_response(
+        self,
+        question: str,
+        answer: str,
+        reranked_results: List,
+        risk_category: RiskCategory,
+        confidence: float,
+        citations: List[Citation],
+        limitations: Optional[str],
+        evidence_coverage: Optional[float],
+        start_time: float
+    ) -> QuestionResponse:
+        """Create the response from the outputs of every step."""
         rag_response = RAGResponse(
             answer=answer,
             risk_category=risk_category,
@@ -152,6 +885,35 @@ class QAEngine:
             processing_time=processing_time
         )
     
+    def _retrieval_event(
+        self,
+        citations: List[Citation],
+        retrieved_chunks: int,
+        evidence_coverage: Optional[float],
+        start_time: float
+    ) -> dict:
+        """Payload sent to streaming clients once retrieval is done."""
+        return {
+            "citations": [c.model_dump() for c in citations],
+            "retrieved_chunks": retrieved_chunks,
+            "evidence_coverage": evidence_coverage,
+            "retrieval_time": time.time() - start_time
+        }
+    
+    def _cached_response(
+        self,
+        cached: QuestionResponse,
+        question: str,
+        cache_hit: str,
+        start_time: float
+    ) -> QuestionResponse:
+        """Copy of a cached response for the question as asked."""
+        return cached.model_copy(update={
+            "question": question,
+            "processing_time": time.time() - start_time,
+            "cache_hit": cache_hit
+        })
+    
     def _format_retrieved_context(self, results: List) -> str:
         """Format retrieved chunks into context string."""
         chunks = []
@@ -164,18 +926,39 @@ class QAEngine:
             chunks.append(chunk)
         return format_context(chunks)
     
-    def _generate_answer(self, prompt: str) -> str:
+    def _build_prompt(self, question: str, results: List) -> str:
+        """Build the QA prompt from the question and ranked evidence."""
+        if self.context_packer is not None:
+            return self.context_packer.pack(question, results)
+        
+        # Without a tokenizer, fall back to a character budget
+        prompt = format_qa_prompt(question, self._format_retrieved_context(results))
+        return prompt[:settings.MAX_CONTEXT_LENGTH]
+    
+    def _generate_answer(self, prompt: str, max_new_tokens: Optional[int] = None) -> str:
         """Generate answer using LLM."""
-        # Truncate prompt if too long
-        max_input_length = settings.MAX_CONTEXT_LENGTH
-        if len(prompt) > max_input_length:
-            prompt = prompt[:max_input_length]
+        if self.generation_scheduler is not None:
+            return self.generation_scheduler.generate(prompt, max_new_tokens)
         
-        # Generate
-        result = self.llm(prompt, max_length=settings.MAX_TOKENS)[0]
-        answer = result["generated_text"].strip()
+        return self.generator.generate([prompt], max_new_tokens)[0]
+    
+    def _generate_many(self, prompts: List[str]) -> List[str]:
+        """Generate answers for prompts submitted together."""
+        if self.generation_scheduler is not None:
+            # Queued together, the prompts share batches; concurrent
+            # interactive prompts can still join between batches
+            futures = [self.generation_scheduler.submit(prompt) for prompt in prompts]
+            return [future.result() for future in futures]
         
-        return answer
+        return self._generate_batch(prompts)
+    
+    def _generate_batch(self, prompts: List[str], max_new_tokens: Optional[int] = None) -> List[str]:
+        """Generate answers for a batch of prompts in one padded generate call."""
+        return self.generator.generate(prompts, max_new_tokens)
+    
+    def _generate_answer_stream(self, prompt: str, max_new_tokens: Optional[int] = None) -> Iterator[str]:
+        """Generate answer using LLM, yielding text as tokens are decoded."""
+        return self.generator.stream(prompt, max_new_tokens)
     
     def _extract_citations(self, results: List) -> List[Citation]:
         """Extract citations from retrieval results."""
@@ -189,11 +972,18 @@ class QAEngine:
             
             # Avoid duplicate citations
             if key not in seen:
+                # Near-duplicate chunks are indexed once; cite every source
+                also_found_in = [
+                    f"{source['metadata'].get('filename', 'Unknown')} - {source['section_title']}"
+                    for source in result.duplicate_sources
+                ]
+                
                 citation = Citation(
                     document=filename,
                     section=section,
                     chunk_id=result.chunk_id,
-                    relevance_score=result.reranked_score
+                    relevance_score=result.reranked_score,
+                    also_found_in=also_found_in or None
                 )
                 citations.append(citation)
                 seen.add(key)
@@ -264,11 +1054,19 @@ class QAEngine:
 
 # Global QA engine instance
 _qa_engine = None
+_qa_engine_lock = threading.Lock()
 
 
 def get_qa_engine() -> QAEngine:
     """Get or create the global QA engine instance."""
     global _qa_engine
     if _qa_engine is None:
-        _qa_engine = QAEngine()
+        with _qa_engine_lock:
+            if _qa_engine is None:
+                _qa_engine = QAEngine()
+    return _qa_engine
+
+
+def get_existing_qa_engine() -> Optional[QAEngine]:
+    """Get the global QA engine instance without creating it (None until first use)."""
     return _qa_engine
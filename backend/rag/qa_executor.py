@@ -0,0 +1,158 @@
+"""
+Bounded execution of question answering off the event loop.
+A fixed pool of worker threads serves a priority queue with separate
+interactive and batch lanes; requests beyond a lane's queue limit are
+rejected immediately so callers can back off.
+"""
+from typing import Callable, Dict
+from concurrent.futures import Future
+import asyncio
+import itertools
+import math
+import queue
+import threading
+import time
+from config import settings
+
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+# Lower values are served first
+LANE_PRIORITY = {INTERACTIVE: 0, BATCH: 1}
+
+
+class QueueFullError(Exception):
+    """Raised when a lane's waiting queue is full."""
+    
+    def __init__(self, lane: str, retry_after: int):
+        super().__init__(f"QA {lane} queue is full, retry after {retry_after}s")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class QAExecutor:
+    """Size-bounded worker pool with priority lanes and admission control."""
+    
+    def __init__(
+        self,
+        max_workers: int = None,
+        max_queue: int = None,
+        batch_max_queue: int = None
+    ):
+        """
+        Initialize executor and start its workers.
+        
+        Args:
+            max_workers: Number of questions answered concurrently
+            max_queue: Waiting interactive requests before rejecting new ones
+            batch_max_queue: Waiting batch requests before rejecting new ones
+        """
+        self.max_workers = max_workers or settings.QA_MAX_CONCURRENCY
+        self.queue_limits = {
+            INTERACTIVE: max_queue if max_queue is not None else settings.QA_MAX_QUEUE,
+            BATCH: batch_max_queue if batch_max_queue is not None else settings.QA_BATCH_MAX_QUEUE
+        }
+        
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        
+        self.waiting = {lane: 0 for lane in LANE_PRIORITY}
+        self.running = 0
+        self.completed = {lane: 0 for lane in LANE_PRIORITY}
+        self.rejected = {lane: 0 for lane in LANE_PRIORITY}
+        self._mean_service_time = 1.0  # Seconds; exponential moving average
+        
+        self._workers = [
+            threading.Thread(target=self._work, name=f"qa-worker-{i}", daemon=True)
+            for i in range(self.max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+    
+    def submit(self, fn: Callable, *args, lane: str = INTERACTIVE, **kwargs) -> Future:
+        """
+        Queue a call on the given lane.
+        
+        Returns:
+            Future of the call's result
+        
+        Raises:
+            QueueFullError: If the lane's queue is full
+        """
+        if lane not in LANE_PRIORITY:
+            raise ValueError(f"Unknown QA lane: {lane}")
+        
+        future = Future()
+        with self._lock:
+            if self.waiting[lane] >= self.queue_limits[lane]:
+                self.rejected[lane] += 1
+                raise QueueFullError(lane, self._retry_after())
+            self.waiting[lane] += 1
+        
+        self._queue.put((LANE_PRIORITY[lane], next(self._sequence), lane, future, fn, args, kwargs))
+        return future
+    
+    async def run(self, fn: Callable, *args, lane: str = INTERACTIVE, **kwargs):
+        """Run a call on the pool and await its result without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args, lane=lane, **kwargs))
+    
+    def get_stats(self) -> Dict:
+        """Queue depth, utilisation and rejection counts."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "running": self.running,
+                "waiting": dict(self.waiting),
+                "queue_limits": dict(self.queue_limits),
+                "completed": dict(self.completed),
+                "rejected": dict(self.rejected),
+                "mean_service_time": self._mean_service_time
+            }
+    
+    def _retry_after(self) -> int:
+        """Seconds until the queued work is expected to drain (lock held)."""
+        backlog = sum(self.waiting.values()) + self.running
+        return max(1, math.ceil(backlog * self._mean_service_time / self.max_workers))
+    
+    def _work(self):
+        """Worker loop: run queued calls, highest-priority lane first."""
+        while True:
+            _, _, lane, future, fn, args, kwargs = self._queue.get()
+            with self._lock:
+                self.waiting[lane] -= 1
+            
+            # Skip calls whose caller has gone away (e.g. client disconnected)
+            if not future.set_running_or_notify_cancel():
+                continue
+            
+            with self._lock:
+                self.running += 1
+            
+            started = time.monotonic()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                elapsed = time.monotonic() - started
+                with self._lock:
+                    self.running -= 1
+                    self.completed[lane] += 1
+                    self._mean_service_time = 0.9 * self._mean_service_time + 0.1 * elapsed
+
+
+# Global QA executor instance
+_qa_executor = None
+_qa_executor_lock = threading.Lock()
+
+
+def get_qa_executor() -> QAExecutor:
+    """Get or create the global QA executor instance."""
+    global _qa_executor
+    if _qa_executor is None:
+        with _qa_executor_lock:
+            if _qa_executor is None:
+                _qa_executor = QAExecutor()
+    return _qa_executor
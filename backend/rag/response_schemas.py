@@ -1,9 +1,10 @@
 """
 Pydantic schemas for structured RAG responses.
 """
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 from pydantic import BaseModel, Field
 from enum import Enum
+from config import settings
 
 
 class RiskCategory(str, Enum):
@@ -16,12 +17,23 @@ class RiskCategory(str, Enum):
     UNKNOWN = "unknown"
 
 
+class AnswerMode(str, Enum):
+    """How answers are produced."""
+    GENERATIVE = "generative"  # LLM generation over the retrieved evidence
+    EXTRACTIVE = "extractive"  # Best-matching evidence sentences, no LLM
+    AUTO = "auto"  # Generative, or extractive under load or a tight latency budget
+
+
 class Citation(BaseModel):
     """Citation for evidence source."""
     document: str = Field(description="Source document filename")
     section: str = Field(description="Section title within document")
     chunk_id: Optional[str] = Field(default=None, description="Chunk identifier")
     relevance_score: Optional[float] = Field(default=None, description="Relevance score")
+    also_found_in: Optional[List[str]] = Field(
+        default=None,
+        description="Other documents containing the same evidence"
+    )
 
 
 class RAGResponse(BaseModel):
@@ -57,6 +69,44 @@ class QuestionRequest(BaseModel):
         default=5,
         description="Number of chunks to retrieve"
     )
+    priority: Literal["interactive", "batch"] = Field(
+        default="interactive",
+        description="Scheduling lane; interactive requests are served before batch requests"
+    )
+    answer_mode: AnswerMode = Field(
+        default=AnswerMode.GENERATIVE,
+        description="generative, extractive (no LLM, milliseconds) or auto"
+    )
+    debug: bool = Field(
+        default=False,
+        description="Include per-stage timings in the response"
+    )
+    deadline_ms: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Latency budget; stages degrade to answer within it (defaults to settings.QA_DEFAULT_DEADLINE_MS)"
+    )
+
+
+class BatchQuestionRequest(BaseModel):
+    """Request schema for answering many questions at once."""
+    questions: List[str] = Field(
+        min_length=1,
+        max_length=settings.BATCH_MAX_QUESTIONS,
+        description="Questions about ML governance"
+    )
+    filters: Optional[dict] = Field(
+        default=None,
+        description="Optional metadata filters for retrieval, applied to every question"
+    )
+    top_k: Optional[int] = Field(
+        default=5,
+        description="Number of chunks to retrieve per question"
+    )
+    answer_mode: AnswerMode = Field(
+        default=AnswerMode.GENERATIVE,
+        description="generative, extractive (no LLM, milliseconds) or auto"
+    )
 
 
 class QuestionResponse(BaseModel):
@@ -65,3 +115,7 @@ class QuestionResponse(BaseModel):
     response: RAGResponse
     retrieved_chunks: int
     processing_time: Optional[float] = None
+    cache_hit: Optional[str] = None  # "exact" or "semantic" from the answer cache, "coalesced" from an identical in-flight request
+    answer_mode: Optional[str] = None  # Mode that produced the answer
+    timings: Optional[Dict[str, float]] = None  # Milliseconds per pipeline stage, plus "total"
+    degradations: Optional[List[str]] = None  # Steps degraded to meet the request's deadline
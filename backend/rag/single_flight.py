@@ -0,0 +1,103 @@
+"""
+Single-flight coalescing of identical in-flight work.
+The first caller for a key (the leader) runs the work; callers arriving
+while it runs (followers) wait for the leader's result instead of
+repeating it, for as long as they can afford to.
+"""
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import threading
+import time
+
+
+class _Flight:
+    """An in-flight call and the number of callers waiting on it."""
+    
+    __slots__ = ("future", "followers")
+    
+    def __init__(self):
+        self.future = Future()
+        self.followers = 0
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time and shares its result."""
+    
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        
+        self.leaders = 0
+        self.coalesced = 0
+        self.abandoned = 0
+        self.failures = 0
+        self.saved_seconds = 0.0
+    
+    def run(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """
+        Run fn, or wait for the identical call already running.
+        
+        Args:
+            key: Identity of the work
+            fn: Work to run when no identical call is in flight
+            timeout: Longest a follower waits (seconds) before running fn
+                itself (None waits for the leader however long it takes)
+        
+        Returns:
+            The result, and whether it was shared from another caller's call
+        
+        Raises:
+            Whatever fn raised, for the leader and its followers alike
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.leaders += 1
+            else:
+                flight.followers += 1
+                self.coalesced += 1
+        
+        if not leader:
+            try:
+                return flight.future.result(timeout=timeout), True
+            except FutureTimeoutError:
+                with self._lock:
+                    flight.followers -= 1
+                    self.abandoned += 1
+            # The leader is too slow for this caller's budget: run independently
+            return fn(), False
+        
+        started = time.monotonic()
+        try:
+            result = fn()
+        except BaseException as e:
+            flight.future.set_exception(e)
+            raise
+        else:
+            flight.future.set_result(result)
+            return result, False
+        finally:
+            elapsed = time.monotonic() - started
+            with self._lock:
+                del self._flights[key]
+                # Every follower was spared running the work itself
+                self.saved_seconds += elapsed * flight.followers
+                if flight.future.exception() is not None:
+                    self.failures += 1
+    
+    def get_stats(self) -> Dict:
+        """In-flight calls and work saved by coalescing."""
+        with self._lock:
+            calls = self.leaders + self.coalesced
+            return {
+                "enabled": True,
+                "in_flight": len(self._flights),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "coalesced_rate": self.coalesced / calls if calls else 0.0,
+                "abandoned": self.abandoned,
+                "failures": self.failures,
+                "saved_seconds": self.saved_seconds
+            }
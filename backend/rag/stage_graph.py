@@ -0,0 +1,116 @@
+"""
+Dependency-graph execution of pipeline stages.
+Stages declare the stages they need; independent stages run in parallel on
+a shared thread pool, and each stage starts as soon as its inputs exist.
+"""
+from typing import Any, Callable, Dict, Optional, Sequence
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import threading
+from config import settings
+from analytics.tracing import Trace
+
+
+class _Stage:
+    """A named step and the stages whose results it needs."""
+    
+    __slots__ = ("name", "fn", "after")
+    
+    def __init__(self, name: str, fn: Callable[[Dict[str, Any]], Any], after: Sequence[str]):
+        self.name = name
+        self.fn = fn
+        self.after = tuple(after)
+
+
+class StageGraph:
+    """A small DAG of stages run once, in dependency order."""
+    
+    def __init__(self, executor: ThreadPoolExecutor = None, trace: Optional[Trace] = None):
+        """
+        Initialize graph.
+        
+        Args:
+            executor: Pool running stages in parallel (defaults to the shared stage pool)
+            trace: Trace to record a span per stage in
+        """
+        self.executor = executor or get_stage_executor()
+        self.trace = trace
+        self._stages: Dict[str, _Stage] = {}
+    
+    def add(self, name: str, fn: Callable[[Dict[str, Any]], Any], after: Sequence[str] = ()):
+        """
+        Add a stage.
+        
+        Args:
+            name: Stage name (its result is stored under it)
+            fn: Called with the results of finished stages; returns this stage's result
+            after: Stages that must finish first
+        """
+        self._stages[name] = _Stage(name, fn, after)
+        return self
+    
+    def run(self) -> Dict[str, Any]:
+        """
+        Run every stage.
+        When several stages are ready, the first added runs on the calling
+        thread and the rest on the pool, so add the critical path first.
+        
+        Returns:
+            Result of each stage by name
+        
+        Raises:
+            The first exception raised by a stage
+            ValueError: If dependencies are missing or cyclic
+        """
+        results: Dict[str, Any] = {}
+        pending = dict(self._stages)
+        running = {}
+        
+        while pending or running:
+            ready = [
+                stage for stage in pending.values()
+                if all(dependency in results for dependency in stage.after)
+            ]
+            if not ready and not running:
+                raise ValueError(f"Unsatisfiable stage dependencies: {sorted(pending)}")
+            
+            for stage in ready:
+                del pending[stage.name]
+            for stage in ready[1:]:
+                running[self.executor.submit(self._call, stage, dict(results))] = stage.name
+            
+            if ready:
+                results[ready[0].name] = self._call(ready[0], results)
+                done = [future for future in running if future.done()]
+            else:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                results[running.pop(future)] = future.result()
+        
+        return results
+    
+    def _call(self, stage: _Stage, results: Dict[str, Any]):
+        """Run one stage, timed as a span of the trace."""
+        if self.trace is None:
+            return stage.fn(results)
+        
+        with self.trace.span(stage.name):
+            return stage.fn(results)
+
+
+# Global stage executor instance
+_stage_executor = None
+_stage_executor_lock = threading.Lock()
+
+
+def get_stage_executor() -> ThreadPoolExecutor:
+    """Get or create the thread pool shared by all stage graphs."""
+    global _stage_executor
+    if _stage_executor is None:
+        with _stage_executor_lock:
+            if _stage_executor is None:
+                _stage_executor = ThreadPoolExecutor(
+                    max_workers=settings.QA_STAGE_WORKERS,
+                    thread_name_prefix="qa-stage"
+                )
+    return _stage_executor
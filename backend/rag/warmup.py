@@ -0,0 +1,131 @@
+"""
+Eager warm-up of the QA stack.
+Loads every model and index at startup and answers a dummy question, so the
+first real request does not pay for downloads, loading or first-call
+initialisation; readiness is reported until the warm-up has finished.
+"""
+from typing import Dict, Optional
+import threading
+import time
+from config import settings
+from ingestion.embeddings import get_embedding_generator
+from retrieval.vector_store import get_vector_store
+from retrieval.cross_encoder import get_cross_encoder
+from retrieval.reranker import get_reranker
+from rag.generation_backends import get_generation_backend
+from rag.qa_engine import get_qa_engine
+
+
+PENDING = "pending"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+
+class Warmup:
+    """Runs the warm-up in the background and tracks its state."""
+    
+    def __init__(self, question: str = None):
+        """
+        Initialize warm-up.
+        
+        Args:
+            question: Dummy question answered end to end
+        """
+        self.question = question or settings.WARMUP_QUESTION
+        self.state = PENDING
+        self.error: Optional[str] = None
+        self.duration: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+    
+    def start(self) -> bool:
+        """
+        Start warming up on a background thread.
+        
+        Returns:
+            False if a warm-up was already started
+        """
+        with self._lock:
+            if self.state != PENDING:
+                return False
+            self.state = WARMING
+        
+        threading.Thread(target=self._run, name="warmup", daemon=True).start()
+        return True
+    
+    def _run(self):
+        """Load models and the index, then answer the dummy question."""
+        started = time.time()
+        try:
+            print("Warming up models...")
+            get_embedding_generator()
+            get_vector_store()
+            engine = get_qa_engine()
+            
+            # Cross-encoder budgets need its cost before the first request
+            cross_encoder = get_reranker().cross_encoder
+            if cross_encoder is not None:
+                cross_encoder.calibrate()
+            
+            # First calls initialise kernels and caches; generate directly
+            # too, in case the index has no evidence for the question
+            engine.answer_question(self.question)
+            if engine.generator is not None:
+                engine.generator.generate([self.question], max_new_tokens=8)
+            
+            # Cold first-call timings would skew auto mode and deadline planning
+            engine.reset_stage_latencies()
+            
+            with self._lock:
+                self.state = READY
+            print(f"Warm-up finished in {time.time() - started:.1f}s")
+        except Exception as e:
+            with self._lock:
+                self.state = FAILED
+                self.error = str(e)
+            print(f"Warm-up failed: {e}")
+        finally:
+            self.duration = time.time() - started
+    
+    def get_status(self) -> Dict:
+        """Warm-up state for readiness probes."""
+        return {
+            "state": self.state,
+            "error": self.error,
+            "duration": self.duration
+        }
+
+
+# Global warm-up instance
+_warmup = None
+_warmup_lock = threading.Lock()
+
+
+def get_warmup() -> Warmup:
+    """Get or create the global warm-up instance."""
+    global _warmup
+    if _warmup is None:
+        with _warmup_lock:
+            if _warmup is None:
+                _warmup = Warmup()
+    return _warmup
+
+
+def preload_models():
+    """
+    Load model weights without running them.
+    Called in the master of a pre-forking server (gunicorn --preload), so
+    workers share the weight pages copy-on-write instead of each loading a
+    copy. Nothing may run inference or start threads here: thread pools do
+    not survive fork.
+    """
+    started = time.time()
+    get_embedding_generator()
+    get_generation_backend()
+    if settings.CROSS_ENCODER_ENABLED:
+        get_cross_encoder()
+    print(f"Preloaded models for worker processes in {time.time() - started:.1f}s")
@@ -1,11 +1,14 @@
 """Init file for retrieval module."""
 from .vector_store import VectorStore, RetrievalResult, get_vector_store
+from .cross_encoder import CrossEncoderScorer, get_cross_encoder
 from .reranker import Reranker, RerankedResult, get_reranker
 
 __all__ = [
     "VectorStore",
     "RetrievalResult",
     "get_vector_store",
+    "CrossEncoderScorer",
+    "get_cross_encoder",
     "Reranker",
     "RerankedResult",
     "get_reranker"
@@ -0,0 +1,201 @@
+"""
+Cross-encoder relevance scoring for reranking.
+Scores (query, chunk) pairs jointly in one batched forward pass, optionally
+with Linear layers dynamically quantised to int8, and caches the scores of
+repeated pairs. Tracks the cost per pair so callers can tell whether a
+candidate set fits their latency budget before scoring it.
+"""
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+import threading
+import time
+import torch
+from sentence_transformers import CrossEncoder
+from config import settings
+
+
+class CrossEncoderScorer:
+    """Batched, cached cross-encoder scores of (query, chunk) pairs."""
+    
+    def __init__(
+        self,
+        model_name: str = None,
+        quantize: Optional[bool] = None,
+        cache_size: int = None
+    ):
+        """
+        Initialize scorer and load the model.
+        
+        Args:
+            model_name: Name of the cross-encoder model
+            quantize: Quantise Linear layers to int8 (defaults to settings.CROSS_ENCODER_INT8)
+            cache_size: Maximum number of cached pair scores (least recently used are evicted)
+        """
+        self.model_name = model_name or settings.CROSS_ENCODER_MODEL
+        self.quantize = settings.CROSS_ENCODER_INT8 if quantize is None else quantize
+        self.cache_size = cache_size or settings.CROSS_ENCODER_CACHE_SIZE
+        self.model = None
+        
+        self._cache: "OrderedDict[Tuple, float]" = OrderedDict()
+        self._pair_ms: Optional[float] = None
+        self._calibrating = False
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.batches = 0
+        
+        self._load_model()
+    
+    def _load_model(self):
+        """Load the cross-encoder, quantised if configured."""
+        print(f"Loading cross-encoder: {self.model_name}{' (int8)' if self.quantize else ''}")
+        self.model = CrossEncoder(self.model_name, max_length=settings.CROSS_ENCODER_MAX_LENGTH)
+        
+        if self.quantize:
+            # Weights are stored as int8; activations are quantised on the fly
+            self.model.model.eval()
+            self.model.model = torch.ao.quantization.quantize_dynamic(
+                self.model.model,
+                {torch.nn.Linear},
+                dtype=torch.qint8
+            )
+    
+    def calibrate(self, batch_size: int = None):
+        """
+        Measure the cost per pair on a dummy batch, so latency budgets hold
+        from the first request. The first call also initialises the model.
+        
+        Args:
+            batch_size: Pairs to time (defaults to settings.CROSS_ENCODER_MAX_CANDIDATES)
+        """
+        batch_size = batch_size or settings.CROSS_ENCODER_MAX_CANDIDATES
+        pairs = [(settings.WARMUP_QUESTION, settings.WARMUP_QUESTION)] * batch_size
+        
+        self.model.predict(pairs[:1], show_progress_bar=False)
+        started = time.time()
+        self.model.predict(pairs, batch_size=batch_size, show_progress_bar=False)
+        elapsed_ms = (time.time() - started) * 1000
+        
+        with self._lock:
+            if self._pair_ms is None:
+                self._pair_ms = elapsed_ms / batch_size
+        print(f"Cross-encoder cost: {elapsed_ms / batch_size:.1f} ms per pair")
+    
+    def expected_ms(self, pairs: List[Tuple[str, object]]) -> float:
+        """
+        Expected time to score the pairs: cached pairs are free, the rest
+        cost the recent average per pair. Before the cost was measured it is
+        unknown (infinite), and a calibration starts in the background.
+        
+        Args:
+            pairs: (query, result) pairs
+        """
+        if self._pair_ms is None:
+            self._calibrate_in_background()
+            return float("inf")
+        
+        with self._lock:
+            uncached = {key for key in map(self._key, pairs) if key not in self._cache}
+        return len(uncached) * self._pair_ms
+    
+    def score(self, pairs: List[Tuple[str, object]]) -> List[float]:
+        """
+        Relevance of each (query, result) pair, between 0 and 1.
+        Pairs missing from the cache are scored in one batch.
+        
+        Args:
+            pairs: (query, result) pairs; results need chunk_id and text
+        
+        Returns:
+            Scores, in pair order
+        """
+        keys = [self._key(pair) for pair in pairs]
+        
+        scores: Dict[Tuple, float] = {}
+        with self._lock:
+            for key in keys:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    scores[key] = self._cache[key]
+            self.hits += sum(1 for key in keys if key in scores)
+        
+        missing = {}
+        for key, (query, result) in zip(keys, pairs):
+            if key not in scores:
+                missing.setdefault(key, (query, result.text))
+        
+        if missing:
+            started = time.time()
+            predicted = self.model.predict(
+                list(missing.values()),
+                batch_size=len(missing),
+                show_progress_bar=False
+            )
+            elapsed_ms = (time.time() - started) * 1000
+            
+            with self._lock:
+                per_pair = elapsed_ms / len(missing)
+                self._pair_ms = per_pair if self._pair_ms is None else 0.8 * self._pair_ms + 0.2 * per_pair
+                self.misses += len(missing)
+                self.batches += 1
+                
+                for key, value in zip(missing, predicted):
+                    scores[key] = self._cache[key] = float(value)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        
+        return [scores[key] for key in keys]
+    
+    def _calibrate_in_background(self):
+        """Start one calibration thread (e.g. when no warm-up measured the cost)."""
+        with self._lock:
+            if self._calibrating:
+                return
+            self._calibrating = True
+        
+        def run():
+            try:
+                self.calibrate()
+            except Exception as e:
+                print(f"Cross-encoder calibration failed: {e}")
+            finally:
+                with self._lock:
+                    self._calibrating = False
+        
+        threading.Thread(target=run, name="cross-encoder-calibration", daemon=True).start()
+    
+    def get_stats(self) -> Dict:
+        """Cache and latency metrics."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "model": self.model_name,
+                "int8": self.quantize,
+                "cache_size": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "batches": self.batches,
+                "ms_per_pair": self._pair_ms
+            }
+    
+    def _key(self, pair: Tuple[str, object]) -> Tuple:
+        # The text hash keeps scores of a revised chunk from being reused
+        query, result = pair
+        return query, result.chunk_id, hash(result.text)
+
+
+# Global cross-encoder instance
+_cross_encoder = None
+_cross_encoder_lock = threading.Lock()
+
+
+def get_cross_encoder() -> CrossEncoderScorer:
+    """Get or create the global cross-encoder instance."""
+    global _cross_encoder
+    if _cross_encoder is None:
+        with _cross_encoder_lock:
+            if _cross_encoder is None:
+                _cross_encoder = CrossEncoderScorer()
+    return _cross_encoder
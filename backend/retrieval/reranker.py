@@ -1,10 +1,15 @@
 """
 Reranking module for improving retrieval relevance.
-Uses semantic similarity and diversity-aware scoring.
+Uses semantic similarity and diversity-aware scoring, optionally replaced
+by a cross-encoder's relevance scores when they fit the latency budget.
 """
-from typing import List
-from pydantic import BaseModel
+from typing import Dict, FrozenSet, List, Optional, Tuple
+import threading
+from pydantic import BaseModel, Field, SkipValidation
+from config import settings
 from retrieval.vector_store import RetrievalResult
+from retrieval.cross_encoder import CrossEncoderScorer, get_cross_encoder
+from ingestion.term_features import contained_terms, result_terms
 
 
 class RerankedResult(BaseModel):
@@ -16,19 +21,38 @@ class RerankedResult(BaseModel):
     metadata: dict
     section_title: str
     rank_explanation: str
+    duplicate_sources: List[dict] = []
+    sentence_offsets: Optional[List[Tuple[int, int, int]]] = None
+    embedding: Optional[List[float]] = Field(default=None, exclude=True, repr=False)
+    terms: SkipValidation[Optional[FrozenSet[str]]] = Field(default=None, exclude=True, repr=False)
+    terms_text: Optional[str] = Field(default=None, exclude=True, repr=False)
 
 
 class Reranker:
     """Reranks retrieval results for improved relevance."""
     
-    def __init__(self):
-        pass
+    def __init__(
+        self,
+        cross_encoder: Optional[CrossEncoderScorer] = None,
+        max_candidates: int = None
+    ):
+        """
+        Initialize reranker.
+        
+        Args:
+            cross_encoder: Scorer of (query, chunk) pairs (None reranks by
+                the keyword heuristic only)
+            max_candidates: Vector hits scored by the cross-encoder per query
+        """
+        self.cross_encoder = cross_encoder
+        self.max_candidates = max_candidates or settings.CROSS_ENCODER_MAX_CANDIDATES
     
     def rerank(
         self,
         query: str,
         results: List[RetrievalResult],
-        top_k: int = 5
+        top_k: int = 5,
+        use_cross_encoder: Optional[bool] = None
     ) -> List[RerankedResult]:
         """
         Rerank retrieval results.
@@ -37,24 +61,134 @@ class Reranker:
             query: Original query text
             results: Initial retrieval results
             top_k: Number of results to return
+            use_cross_encoder: Score with the cross-encoder (defaults to
+                whether it fits settings.CROSS_ENCODER_BUDGET_MS)
             
         Returns:
             Reranked results with explanations
         """
+        return self.rerank_batch([query], [results], top_k, use_cross_encoder)[0]
+    
+    def rerank_batch(
+        self,
+        queries: List[str],
+        results_per_query: List[List[RetrievalResult]],
+        top_k: int = 5,
+        use_cross_encoder: Optional[bool] = None
+    ) -> List[List[RerankedResult]]:
+        """
+        Rerank the results of several queries.
+        The cross-encoder scores every query's candidates in one batch;
+        chunks without stored terms are tokenised once, however many
+        queries retrieved them.
+        
+        Args:
+            queries: Original query texts
+            results_per_query: Initial retrieval results of each query
+            top_k: Number of results to return per query
+            use_cross_encoder: Score with the cross-encoder (defaults to
+                whether it fits settings.CROSS_ENCODER_BUDGET_MS)
+            
+        Returns:
+            Reranked results of each query, in order
+        """
+        if use_cross_encoder is None:
+            use_cross_encoder = self.plan_cross_encoding(queries, results_per_query, top_k)
+        
+        cross_scores = [None] * len(queries)
+        if use_cross_encoder and self.cross_encoder is not None:
+            candidates = [self._candidates(results, top_k) for results in results_per_query]
+            scores = self.cross_encoder.score([
+                (query, result)
+                for query, results in zip(queries, candidates)
+                for result in results
+            ])
+            
+            offset = 0
+            for i, results in enumerate(candidates):
+                cross_scores[i] = scores[offset:offset + len(results)]
+                offset += len(results)
+        
+        terms_cache = {}
+        return [
+            self._rerank(query, results, top_k, terms_cache, scores)
+            for query, results, scores in zip(queries, results_per_query, cross_scores)
+        ]
+    
+    def plan_cross_encoding(
+        self,
+        queries: List[str],
+        results_per_query: List[List[RetrievalResult]],
+        top_k: int,
+        budget_ms: Optional[float] = None
+    ) -> bool:
+        """
+        Whether the cross-encoder can score these candidates in time.
+        Only pairs missing from its score cache count towards the expected time.
+        
+        Args:
+            queries: Original query texts
+            results_per_query: Initial retrieval results of each query
+            top_k: Number of results to return per query
+            budget_ms: Time left for reranking (None for no request deadline);
+                settings.CROSS_ENCODER_BUDGET_MS applies as well
+            
+        Returns:
+            False without a cross-encoder, or if scoring would not fit
+        """
+        if self.cross_encoder is None:
+            return False
+        
+        budgets = [budget for budget in (budget_ms, settings.CROSS_ENCODER_BUDGET_MS) if budget is not None]
+        if not budgets:
+            return True
+        
+        expected_ms = self.cross_encoder.expected_ms([
+            (query, result)
+            for query, results in zip(queries, results_per_query)
+            for result in self._candidates(results, top_k)
+        ])
+        return all(expected_ms <= budget for budget in budgets)
+    
+    def candidate_pool(self, top_k: int) -> int:
+        """Vector hits to fetch for reranking: the cross-encoder's candidate limit, or twice top_k."""
+        if self.cross_encoder is not None:
+            return max(top_k, self.max_candidates)
+        return top_k * 2
+    
+    def _candidates(self, results: List[RetrievalResult], top_k: int) -> List[RetrievalResult]:
+        """The best vector hits, up to the candidate limit (but at least top_k)."""
+        return results[:max(top_k, self.max_candidates)]
+    
+    def _rerank(
+        self,
+        query: str,
+        results: List[RetrievalResult],
+        top_k: int,
+        terms_cache: Dict[str, Dict],
+        cross_scores: Optional[List[float]] = None
+    ) -> List[RerankedResult]:
+        """
+        Rerank one query's results against their stored chunk terms, or by
+        cross-encoder scores of its candidates when given.
+        """
         if not results:
             return []
         
+        if cross_scores is not None:
+            results = results[:len(cross_scores)]
+        
         reranked = []
         query_lower = query.lower()
+        query_terms = set(query_lower.split())
         
-        for result in results:
+        for position, result in enumerate(results):
             # Calculate reranking score based on multiple factors
             score = result.score
             
             # Boost score if query terms appear in text
-            query_terms = set(query_lower.split())
-            text_lower = result.text.lower()
-            matching_terms = sum(1 for term in query_terms if term in text_lower)
+            chunk_terms, terms_text = result_terms(result, terms_cache)
+            matching_terms = len(contained_terms(query_terms, chunk_terms, terms_text))
             term_boost = matching_terms / len(query_terms) if query_terms else 0
             
             # Boost score based on section relevance
@@ -66,11 +200,17 @@ class Reranker:
             # Calculate final reranked score
             reranked_score = score * (1.0 + term_boost * 0.2 + section_boost)
             
+            # The cross-encoder's relevance replaces the heuristic score
+            cross_score = None
+            if cross_scores is not None:
+                cross_score = reranked_score = cross_scores[position]
+            
             # Generate explanation
             explanation = self._generate_explanation(
                 result,
                 term_boost,
-                section_boost
+                section_boost,
+                cross_score
             )
             
             reranked_result = RerankedResult(
@@ -80,7 +220,12 @@ class Reranker:
                 reranked_score=reranked_score,
                 metadata=result.metadata,
                 section_title=result.section_title,
-                rank_explanation=explanation
+                rank_explanation=explanation,
+                duplicate_sources=result.duplicate_sources,
+                sentence_offsets=result.sentence_offsets,
+                embedding=result.embedding,
+                terms=chunk_terms,
+                terms_text=terms_text
             )
             reranked.append(reranked_result)
         
@@ -96,11 +241,20 @@ class Reranker:
         self,
         result: RetrievalResult,
         term_boost: float,
-        section_boost: float
+        section_boost: float,
+        cross_score: Optional[float] = None
     ) -> str:
         """Generate explanation for ranking decision."""
         reasons = []
         
+        if cross_score is not None:
+            if cross_score > 0.8:
+                reasons.append("high cross-encoder relevance")
+            elif cross_score > 0.5:
+                reasons.append("moderate cross-encoder relevance")
+            else:
+                reasons.append("low cross-encoder relevance")
+        
         if result.score > 0.8:
             reasons.append("high semantic similarity")
         elif result.score > 0.6:
@@ -146,11 +300,15 @@ class Reranker:
 
 # Global reranker instance
 _reranker = None
+_reranker_lock = threading.Lock()
 
 
 def get_reranker() -> Reranker:
     """Get or create the global reranker instance."""
     global _reranker
     if _reranker is None:
-        _reranker = Reranker()
+        with _reranker_lock:
+            if _reranker is None:
+                cross_encoder = get_cross_encoder() if settings.CROSS_ENCODER_ENABLED else None
+                _reranker = Reranker(cross_encoder=cross_encoder)
     return _reranker
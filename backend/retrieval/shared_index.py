@@ -0,0 +1,225 @@
+"""
+Shared, memory-mapped vector store snapshots for multi-worker serving.
+A writer publishes the index and chunk store as immutable files plus a
+versioned manifest; every worker process maps them read-only, so the OS
+page cache holds one copy for all workers, and remaps when the manifest
+version changes.
+"""
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+from contextlib import contextmanager
+from pathlib import Path
+import json
+import mmap
+import os
+import pickle
+import threading
+import time
+import numpy as np
+import faiss
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialised within a process
+    fcntl = None
+
+
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = ".write.lock"
+
+
+class MappedFlatIndex:
+    """Read-only stand-in for faiss.IndexFlatL2 over a memory-mapped vector matrix."""
+    
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+        self.d = vectors.shape[1]
+    
+    @property
+    def ntotal(self) -> int:
+        return self.vectors.shape[0]
+    
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact L2 search (same results as IndexFlatL2) without copying the vectors."""
+        return faiss.knn(np.ascontiguousarray(queries, dtype=np.float32), self.vectors, k)
+    
+    def reconstruct_batch(self, ids: np.ndarray) -> np.ndarray:
+        return np.array(self.vectors[ids], dtype=np.float32)
+    
+    def to_writable(self) -> faiss.IndexFlatL2:
+        """Private, mutable copy of the index."""
+        index = faiss.IndexFlatL2(self.d)
+        if self.ntotal:
+            index.add(np.ascontiguousarray(self.vectors, dtype=np.float32))
+        return index
+
+
+class MappedRecords(Sequence):
+    """Read-only sequence of pickled records in a memory-mapped file, decoded on access."""
+    
+    def __init__(self, path: Path):
+        """
+        Map a record file written by MappedRecords.write.
+        
+        Args:
+            path: Record data file (offsets are read from its .idx.npy sibling)
+        """
+        self._offsets = np.load(_offsets_path(path), mmap_mode="r")
+        self._data = b""
+        if path.stat().st_size:
+            with open(path, 'rb') as f:
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+    
+    def __getitem__(self, position: int):
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+        start, end = self._offsets[position], self._offsets[position + 1]
+        return pickle.loads(self._data[start:end])
+    
+    @staticmethod
+    def write(path: Path, records: Iterable):
+        """Write records and their byte offsets."""
+        offsets = [0]
+        with open(path, 'wb') as f:
+            for record in records:
+                data = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+                f.write(data)
+                offsets.append(offsets[-1] + len(data))
+        np.save(_offsets_path(path), np.array(offsets, dtype=np.int64))
+
+
+def _offsets_path(path: Path) -> Path:
+    return path.with_name(path.name + ".idx.npy")
+
+
+def read_manifest(directory: Path) -> Optional[Dict]:
+    """The current snapshot manifest, or None if nothing was published yet."""
+    try:
+        with open(directory / MANIFEST_NAME) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_manifest(directory: Path, manifest: Dict):
+    """Atomically replace the manifest."""
+    tmp_path = directory / (MANIFEST_NAME + ".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, directory / MANIFEST_NAME)
+
+
+def manifest_mtime(directory: Path) -> Optional[int]:
+    """Modification time of the manifest (cheap change check), or None."""
+    try:
+        return os.stat(directory / MANIFEST_NAME).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def publish_snapshot(
+    directory: Path,
+    index,
+    chunks: Sequence,
+    metadata: Sequence,
+    dimension: int,
+    store_version: Optional[int] = None
+) -> Dict:
+    """
+    Write a new immutable snapshot and point the manifest at it.
+    Callers must hold the shared write lock.
+    
+    Args:
+        store_version: Version of the saved store the snapshot was taken from
+    
+    Returns:
+        The new manifest
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    previous = read_manifest(directory)
+    version = (previous["version"] if previous else 0) + 1
+    
+    count = index.ntotal
+    vectors = np.empty((0, dimension), dtype=np.float32)
+    if count:
+        vectors = index.reconstruct_batch(np.arange(count, dtype=np.int64))
+    
+    files = {
+        "vectors": f"vectors-{version:06d}.npy",
+        "chunks": f"chunks-{version:06d}.bin",
+        "metadata": f"metadata-{version:06d}.bin"
+    }
+    np.save(directory / files["vectors"], np.ascontiguousarray(vectors, dtype=np.float32))
+    MappedRecords.write(directory / files["chunks"], chunks)
+    MappedRecords.write(directory / files["metadata"], metadata)
+    
+    manifest = {
+        "version": version,
+        "count": count,
+        "dimension": dimension,
+        "files": files,
+        "store_version": store_version,
+        "published_at": time.time()
+    }
+    
+    # Readers switch when the manifest is atomically replaced
+    write_manifest(directory, manifest)
+    
+    _remove_stale(directory, keep={version, version - 1})
+    return manifest
+
+
+def load_snapshot(directory: Path, manifest: Dict) -> Tuple[MappedFlatIndex, MappedRecords, MappedRecords]:
+    """Map the snapshot a manifest points at."""
+    files = manifest["files"]
+    vectors = np.load(directory / files["vectors"], mmap_mode="r")
+    if vectors.ndim != 2:
+        vectors = vectors.reshape(-1, manifest["dimension"])
+    
+    return (
+        MappedFlatIndex(vectors),
+        MappedRecords(directory / files["chunks"]),
+        MappedRecords(directory / files["metadata"])
+    )
+
+
+def _remove_stale(directory: Path, keep: set):
+    """
+    Delete snapshots older than the previous one. Workers still mapping a
+    deleted file keep their mapping until they switch.
+    """
+    for path in directory.glob("*-*.*"):
+        try:
+            version = int(path.name.split("-", 1)[1].split(".", 1)[0])
+        except ValueError:
+            continue
+        if version not in keep:
+            try:
+                path.unlink()
+            except OSError:
+                pass  # Still open (e.g. on Windows); removed by a later publish
+
+
+# Serialises writers within this process; the lock file serialises processes
+_process_write_lock = threading.Lock()
+
+
+@contextmanager
+def shared_write_lock(directory: Path):
+    """Exclusive lock held by the one process publishing a snapshot."""
+    directory.mkdir(parents=True, exist_ok=True)
+    with _process_write_lock:
+        if fcntl is None:
+            yield
+            return
+        
+        with open(directory / LOCK_NAME, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,284 @@
+"""
+Versioned, checksummed snapshot bundles for read replicas.
+The writer node publishes every saved store version as a bundle (index,
+chunk store and a manifest of SHA-256 checksums) to a directory shared with
+the replicas; each replica pulls the newest bundle to local disk, verifies
+it and hot-swaps it into its read-only vector store.
+"""
+from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from config import settings
+
+
+BUNDLE_FILES = ("faiss.index", "vector_store.pkl")
+BUNDLE_MANIFEST = "bundle.json"
+BUNDLE_PREFIX = "bundle-"
+
+
+class BundleError(Exception):
+    """A bundle is incomplete or fails checksum verification."""
+    pass
+
+
+def _sha256(path: Path) -> str:
+    """SHA-256 of a file's bytes, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def bundle_name(version: int) -> str:
+    return f"{BUNDLE_PREFIX}{version:06d}"
+
+
+def list_bundles(directory: Path) -> List[Tuple[int, Path]]:
+    """Complete bundles in a directory as (version, path), oldest first."""
+    if not directory.exists():
+        return []
+    
+    bundles = []
+    for path in directory.glob(f"{BUNDLE_PREFIX}*"):
+        try:
+            bundles.append((int(path.name[len(BUNDLE_PREFIX):]), path))
+        except ValueError:
+            continue
+    return sorted(bundles)
+
+
+def publish_bundle(
+    store_dir: Path,
+    bundle_dir: Path,
+    version: int,
+    keep: int = None
+) -> Optional[Path]:
+    """
+    Publish a saved store as a bundle.
+    Files are copied into a hidden directory that is renamed into place once
+    complete, so replicas never see a partial bundle.
+    
+    Args:
+        store_dir: Directory of the saved store (faiss.index, vector_store.pkl)
+        bundle_dir: Directory shared with the replicas
+        version: Store version (from the store's manifest)
+        keep: Number of bundles to keep (defaults to settings.SNAPSHOT_BUNDLES_KEPT)
+    
+    Returns:
+        Path of the bundle, or None if that version was already published
+    """
+    keep = settings.SNAPSHOT_BUNDLES_KEPT if keep is None else keep
+    target = bundle_dir / bundle_name(version)
+    if target.exists():
+        return None
+    
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+    staging = bundle_dir / f".{target.name}.{os.getpid()}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir()
+    
+    files = {}
+    for name in BUNDLE_FILES:
+        shutil.copyfile(store_dir / name, staging / name)
+        files[name] = {
+            "sha256": _sha256(staging / name),
+            "size": (staging / name).stat().st_size
+        }
+    
+    with open(staging / BUNDLE_MANIFEST, 'w') as f:
+        json.dump({"version": version, "files": files, "created_at": time.time()}, f, indent=2)
+    
+    os.rename(staging, target)
+    
+    # Replicas still copying a removed bundle retry with a newer one;
+    # the bundle just published is always kept
+    for _, old in list_bundles(bundle_dir)[:-max(keep, 1)]:
+        shutil.rmtree(old, ignore_errors=True)
+    
+    print(f"Published snapshot bundle v{version} to {bundle_dir}")
+    return target
+
+
+def verify_bundle(path: Path) -> Dict:
+    """
+    Check every file of a bundle against its manifest.
+    
+    Returns:
+        The bundle manifest
+    
+    Raises:
+        BundleError: If a file is missing or its size or checksum differs
+    """
+    try:
+        with open(path / BUNDLE_MANIFEST) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise BundleError(f"{path.name}: unreadable manifest ({e})")
+    
+    for name in BUNDLE_FILES:
+        expected = manifest["files"].get(name)
+        file_path = path / name
+        if expected is None or not file_path.exists():
+            raise BundleError(f"{path.name}: missing {name}")
+        if file_path.stat().st_size != expected["size"] or _sha256(file_path) != expected["sha256"]:
+            raise BundleError(f"{path.name}: checksum mismatch in {name}")
+    
+    return manifest
+
+
+class SnapshotReplica:
+    """Keeps a read-only vector store on the newest published bundle."""
+    
+    def __init__(self, vector_store, source_dir: Path = None, local_dir: Path = None):
+        """
+        Initialize replica.
+        
+        Args:
+            vector_store: Store to hot-swap pulled bundles into
+            source_dir: Directory the writer publishes to (defaults to settings.SNAPSHOT_BUNDLE_DIR)
+            local_dir: Where pulled bundles are kept (defaults to VECTOR_STORE_DIR/replica)
+        """
+        self.vector_store = vector_store
+        self.source_dir = Path(source_dir or settings.SNAPSHOT_BUNDLE_DIR)
+        self.local_dir = Path(local_dir or settings.VECTOR_STORE_DIR / "replica")
+        self.version: Optional[int] = None
+        self.pulls = 0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+        self._rejected_versions = set()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+    
+    def pull(self) -> bool:
+        """
+        Pull, verify and swap in the newest bundle if it is newer than ours.
+        
+        Returns:
+            True if a new version was swapped in
+        """
+        bundles = list_bundles(self.source_dir)
+        if not bundles or (self.version is not None and bundles[-1][0] <= self.version):
+            return False
+        
+        version, source = bundles[-1]
+        self.local_dir.mkdir(parents=True, exist_ok=True)
+        staging = self.local_dir / f".{source.name}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        
+        try:
+            shutil.copytree(source, staging)
+            manifest = verify_bundle(staging)
+            index, data = self._read_bundle(staging, version, manifest)
+        except (OSError, BundleError) as e:
+            # Corrupt, or removed by the writer mid-copy: keep serving the current version
+            shutil.rmtree(staging, ignore_errors=True)
+            self.rejected += 1
+            self.last_error = str(e)
+            if version not in self._rejected_versions:
+                self._rejected_versions.add(version)
+                print(f"Rejected snapshot bundle v{version}: {e}")
+            return False
+        
+        target = self.local_dir / source.name
+        shutil.rmtree(target, ignore_errors=True)
+        os.rename(staging, target)
+        
+        self._install(version, index, data)
+        self.pulls += 1
+        self.last_error = None
+        return True
+    
+    def _read_bundle(self, path: Path, version: int, manifest: Dict):
+        """
+        Read the store in a verified bundle.
+        
+        Raises:
+            BundleError: If the store inside is not the version the bundle is published as
+        """
+        index, data = self.vector_store.read_saved(path / "vector_store.pkl")
+        stored = data.get("store_version")
+        if manifest.get("version") != version or stored != version:
+            raise BundleError(
+                f"{path.name}: holds store v{stored}, published as v{manifest.get('version')}"
+            )
+        return index, data
+    
+    def _install(self, version: int, index, data: Dict):
+        """Swap a verified bundle's store into the vector store and drop older bundles."""
+        self.vector_store.swap(index, data)
+        self.version = version
+        
+        for old_version, old in list_bundles(self.local_dir):
+            if old_version < version:
+                shutil.rmtree(old, ignore_errors=True)
+        
+        print(f"Replica serving snapshot bundle v{version} ({index.ntotal} chunks)")
+    
+    def start(self, interval: float = None):
+        """
+        Pull once now, then every interval seconds on a background thread.
+        If the writer's directory has nothing yet, serve the newest bundle
+        pulled before a restart.
+        """
+        interval = settings.REPLICA_PULL_SECONDS if interval is None else interval
+        if not self._safe_pull() and self.version is None:
+            self._install_local()
+        
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="snapshot-replica", daemon=True)
+        self._thread.start()
+    
+    def _install_local(self) -> bool:
+        """
+        Serve the newest previously pulled bundle that still verifies.
+        
+        Returns:
+            True if one was swapped in
+        """
+        for version, path in reversed(list_bundles(self.local_dir)):
+            try:
+                manifest = verify_bundle(path)
+                index, data = self._read_bundle(path, version, manifest)
+            except (OSError, BundleError) as e:
+                print(f"Skipped local snapshot bundle v{version}: {e}")
+                continue
+            
+            self._install(version, index, data)
+            return True
+        
+        return False
+    
+    def stop(self):
+        """Stop pulling."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def _run(self, interval: float):
+        while not self._stop.wait(interval):
+            self._safe_pull()
+    
+    def _safe_pull(self) -> bool:
+        try:
+            return self.pull()
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"Snapshot pull failed: {e}")
+            return False
+    
+    def get_status(self) -> Dict:
+        """Replication state for stats endpoints."""
+        return {
+            "source": str(self.source_dir),
+            "version": self.version,
+            "pulls": self.pulls,
+            "rejected": self.rejected,
+            "last_error": self.last_error
+        }
@@ -1,15 +1,31 @@
 """
 FAISS vector store for document retrieval.
-Supports metadata filtering and persistence.
+Supports metadata filtering and persistence, hot reload of a store saved
+by another process, serving from a snapshot memory-mapped by every worker
+process (multi-worker mode), and read replicas fed by snapshot bundles.
 """
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, FrozenSet, Optional, Tuple
+from contextlib import contextmanager
 import json
+import os
 import pickle
+import threading
+import time
 from pathlib import Path
 import numpy as np
 import faiss
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, SkipValidation
 from config import settings
+from retrieval.shared_index import (
+    MappedFlatIndex,
+    load_snapshot,
+    manifest_mtime,
+    publish_snapshot,
+    read_manifest,
+    shared_write_lock,
+    write_manifest
+)
+from retrieval.snapshot_bundles import SnapshotReplica, publish_bundle
 
 
 class RetrievalResult(BaseModel):
@@ -19,6 +35,11 @@ class RetrievalResult(BaseModel):
     score: float
     metadata: Dict
     section_title: str
+    duplicate_sources: List[Dict] = []  # Other documents containing this text
+    sentence_offsets: Optional[List[Tuple[int, int, int]]] = None  # Recorded by token-aware chunking
+    embedding: Optional[List[float]] = Field(default=None, exclude=True, repr=False)  # Stored vector, if requested
+    terms: SkipValidation[Optional[FrozenSet[str]]] = Field(default=None, exclude=True, repr=False)  # Stored at ingestion
+    terms_text: Optional[str] = Field(default=None, exclude=True, repr=False)
 
 
 class VectorStore:
@@ -35,6 +56,19 @@ class VectorStore:
         self.index = None
         self.chunks = []  # Store chunk data
         self.metadata = []  # Store metadata for each chunk
+        self.version = 0  # Bumped whenever chunk positions change
+        self.read_only = False  # Replicas only change by swapping in pulled snapshots
+        self.shared_dir: Optional[Path] = None  # Set when serving a shared snapshot
+        self._shared_version = None
+        self._shared_mtime = None
+        self._store_version = None  # Manifest version of the saved store this state reflects
+        self._path: Optional[Path] = None  # Saved store this state was loaded from or saved to
+        self._dirty = False  # Changed since it was loaded or saved
+        self._state_lock = threading.Lock()  # Guards swapping index, chunks and metadata
+        self._write_lock = threading.RLock()  # Serialises changes with reloads
+        self._write_depth = 0  # Nesting of writing() blocks on the thread holding the write lock
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
         self._initialize_index()
     
     def _initialize_index(self):
@@ -60,23 +94,26 @@ class VectorStore:
         if not embeddings:
             return
         
+        self._ensure_writable()
+        
         # Convert to numpy array
         embeddings_array = np.array(embeddings, dtype=np.float32)
         
-        # Add to FAISS index
-        self.index.add(embeddings_array)
+        # Add to a copy of the FAISS index; searches keep the current one
+        index = faiss.clone_index(self.index)
+        index.add(embeddings_array)
         
         # Store chunks and metadata
-        self.chunks.extend(chunks)
-        self.metadata.extend(metadata)
+        self._replace_state(index, self.chunks + list(chunks), self.metadata + list(metadata))
         
-        print(f"Added {len(embeddings)} documents to vector store. Total: {self.index.ntotal}")
+        print(f"Added {len(embeddings)} documents to vector store. Total: {index.ntotal}")
     
     def search(
         self,
         query_embedding: List[float],
         top_k: int = None,
-        filters: Optional[Dict] = None
+        filters: Optional[Dict] = None,
+        with_vectors: bool = False
     ) -> List[RetrievalResult]:
         """
         Search for similar documents.
@@ -85,47 +122,112 @@ class VectorStore:
             query_embedding: Query embedding vector
             top_k: Number of results to return
             filters: Optional metadata filters (e.g., {"doc_type": "bias"})
+            with_vectors: Attach each result's stored vector (embedding)
             
         Returns:
             List of retrieval results
         """
-        if self.index.ntotal == 0:
-            return []
+        return self.search_batch([query_embedding], top_k, filters, with_vectors)[0]
+    
+    def search_batch(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int = None,
+        filters: Optional[Dict] = None,
+        with_vectors: bool = False
+    ) -> List[List[RetrievalResult]]:
+        """
+        Search for several queries with a single FAISS call.
+        
+        Args:
+            query_embeddings: Query embedding vectors
+            top_k: Number of results to return per query
+            filters: Optional metadata filters applied to every query
+            with_vectors: Attach each result's stored vector (embedding)
+            
+        Returns:
+            Retrieval results of each query, in order
+        """
+        self._refresh_shared()
+        
+        # Search one consistent state, even if a new snapshot is mapped meanwhile
+        with self._state_lock:
+            index, chunks, metadata = self.index, self.chunks, self.metadata
+        
+        if index.ntotal == 0 or not query_embeddings:
+            return [[] for _ in query_embeddings]
         
         top_k = top_k or settings.TOP_K_RETRIEVAL
         
-        # Convert query to numpy array
-        query_array = np.array([query_embedding], dtype=np.float32)
+        # Convert queries to numpy array
+        query_array = np.array(query_embeddings, dtype=np.float32)
         
         # Search in FAISS
         # Get more results if filtering is needed
         search_k = top_k * 3 if filters else top_k
-        distances, indices = self.index.search(query_array, min(search_k, self.index.ntotal))
+        distances, indices = index.search(query_array, min(search_k, index.ntotal))
         
-        # Convert to results
+        # Reconstruct from the same index the hits came from
+        vectors = None
+        if with_vectors:
+            ids = np.unique(indices[indices >= 0])
+            vectors = dict(zip(ids.tolist(), index.reconstruct_batch(ids.astype(np.int64))))
+        
+        return [
+            self._to_results(row_distances, row_indices, top_k, filters, chunks, metadata, vectors)
+            for row_distances, row_indices in zip(distances, indices)
+        ]
+    
+    def _to_results(
+        self,
+        distances: np.ndarray,
+        indices: np.ndarray,
+        top_k: int,
+        filters: Optional[Dict],
+        chunks: List[Dict],
+        metadata: List[Dict],
+        vectors: Optional[Dict[int, np.ndarray]] = None
+    ) -> List[RetrievalResult]:
+        """Convert one query's FAISS hits to filtered retrieval results."""
         results = []
-        for dist, idx in zip(distances[0], indices[0]):
+        for dist, idx in zip(distances, indices):
             if idx == -1:  # FAISS returns -1 for empty slots
                 continue
             
-            chunk = self.chunks[idx]
-            meta = self.metadata[idx]
+            chunk = chunks[idx]
+            meta = metadata[idx]
+            chunk_id, section_title = chunk["chunk_id"], chunk["section_title"]
             
             # Apply filters if provided
-            if filters:
-                if not self._matches_filters(meta, filters):
+            if filters and not self._matches_filters(meta, filters):
+                # A near-duplicate is stored once, under the first document's
+                # metadata; match the other documents containing it too
+                source = next(
+                    (
+                        source for source in chunk.get("duplicate_sources", [])
+                        if self._matches_filters(source["metadata"], filters)
+                    ),
+                    None
+                )
+                if source is None:
                     continue
+                chunk_id, section_title, meta = source["chunk_id"], source["section_title"], source["metadata"]
             
             # Convert L2 distance to similarity score (inverse)
             # Normalize to 0-1 range
             score = 1.0 / (1.0 + dist)
             
             result = RetrievalResult(
-                chunk_id=chunk["chunk_id"],
+                chunk_id=chunk_id,
                 text=chunk["text"],
                 score=float(score),
                 metadata=meta,
-                section_title=chunk["section_title"]
+                section_title=section_title,
+                duplicate_sources=chunk.get("duplicate_sources", []),
+                sentence_offsets=chunk.get("sentence_offsets"),
+                terms=chunk.get("terms"),
+                terms_text=chunk.get("terms_text"),
+                embedding=vectors[idx].tolist() if vectors is not None else None
             )
             results.append(result)
             
@@ -135,6 +237,136 @@ class VectorStore:
         
         return results
     
+    def find_document(
+        self,
+        filename: str,
+        model_name: Optional[str] = None,
+        title: Optional[str] = None
+    ) -> List[int]:
+        """
+        Find the positions of all chunks belonging to a previously indexed document.
+        
+        Matches on filename first. If nothing matches, falls back to the single
+        document with the same model name and title (a renamed revision).
+        
+        Returns:
+            Sorted list of index positions (empty if the document is new)
+        """
+        positions = [
+            i for i, meta in enumerate(self.metadata)
+            if meta.get("filename") == filename
+        ]
+        if positions or not model_name or not title:
+            return positions
+        
+        positions = [
+            i for i, meta in enumerate(self.metadata)
+            if meta.get("model_name") == model_name and meta.get("title") == title
+        ]
+        
+        # Only treat it as a revision if exactly one document matches
+        filenames = {self.metadata[i].get("filename") for i in positions}
+        return positions if len(filenames) == 1 else []
+    
+    def get_embeddings(self, positions: List[int]) -> np.ndarray:
+        """Reconstruct stored embedding vectors for the given positions."""
+        if not positions:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        
+        ids = np.array(positions, dtype=np.int64)
+        return self.index.reconstruct_batch(ids)
+    
+    def remove_positions(self, positions: List[int]):
+        """
+        Remove chunks at the given positions.
+        Remaining chunks keep their relative order.
+        """
+        if not positions:
+            return
+        
+        self._ensure_writable()
+        ids = np.array(sorted(set(positions)), dtype=np.int64)
+        index = faiss.clone_index(self.index)
+        index.remove_ids(ids)
+        
+        removed = set(positions)
+        self._replace_state(
+            index,
+            [c for i, c in enumerate(self.chunks) if i not in removed],
+            [m for i, m in enumerate(self.metadata) if i not in removed]
+        )
+        
+        print(f"Removed {len(removed)} documents from vector store. Total: {index.ntotal}")
+    
+    def find_file(self, file_hash: str) -> Optional[str]:
+        """
+        Find an indexed document by the hash of its file content.
+        
+        Returns:
+            Filename of the indexed document, or None
+        """
+        for chunk, meta in zip(self.chunks, self.metadata):
+            if meta.get("file_hash") == file_hash:
+                return meta.get("filename")
+            
+            # Documents whose chunks were all near-duplicates only appear as sources
+            for source in chunk.get("duplicate_sources", []):
+                if source["metadata"].get("file_hash") == file_hash:
+                    return source["metadata"].get("filename")
+        
+        return None
+    
+    def update_chunk(self, position: int, chunk: Dict, metadata: Dict = None):
+        """Replace the stored data of a chunk, keeping its vector."""
+        self._ensure_writable()
+        chunks = list(self.chunks)
+        chunks[position] = chunk
+        metadatas = self.metadata
+        if metadata is not None:
+            metadatas = list(metadatas)
+            metadatas[position] = metadata
+        self._replace_state(self.index, chunks, metadatas, positions_changed=False)
+    
+    def add_duplicate_sources(self, sources: List[Tuple[int, Dict]]):
+        """
+        Record other documents that contain (nearly) the same chunk texts.
+        
+        Args:
+            sources: (position, source) pairs
+        """
+        if not sources:
+            return
+        
+        self._ensure_writable()
+        chunks = list(self.chunks)
+        for position, source in sources:
+            chunk = chunks[position]
+            chunks[position] = {**chunk, "duplicate_sources": chunk.get("duplicate_sources", []) + [source]}
+        self._replace_state(self.index, chunks, self.metadata, positions_changed=False)
+    
+    def remove_duplicate_sources(self, filename: str):
+        """Forget duplicate-source records pointing at a document."""
+        changed = {}
+        for position, chunk in enumerate(self.chunks):
+            sources = chunk.get("duplicate_sources")
+            if not sources:
+                continue
+            remaining = [
+                source for source in sources
+                if source["metadata"].get("filename") != filename
+            ]
+            if len(remaining) < len(sources):
+                changed[position] = {**chunk, "duplicate_sources": remaining}
+        
+        if not changed:
+            return
+        
+        self._ensure_writable()
+        chunks = list(self.chunks)
+        for position, chunk in changed.items():
+            chunks[position] = chunk
+        self._replace_state(self.index, chunks, self.metadata, positions_changed=False)
+    
     def _matches_filters(self, metadata: Dict, filters: Dict) -> bool:
         """Check if metadata matches all filters."""
         for key, value in filters.items():
@@ -143,25 +375,75 @@ class VectorStore:
         return True
     
     def save(self, path: Path = None):
-        """Save vector store to disk."""
-        path = path or settings.VECTOR_STORE_DIR / "vector_store.pkl"
+        """
+        Save vector store to disk.
+        Files are written next to their targets and renamed into place, so a
+        crash mid-save never leaves a half-written store behind. A version
+        manifest written last tells running servers to reload.
+        
+        Raises:
+            RuntimeError: If another process saved the store since this state
+                was loaded, so saving would overwrite its changes
+        """
+        path = path or self._saved_path()
+        with self.writing(path, refresh=False):
+            self._save(path)
+    
+    def _save(self, path: Path):
+        """Write the store; callers hold the write lock."""
         path.parent.mkdir(parents=True, exist_ok=True)
         
+        index, chunks, metadata = self.index, self.chunks, self.metadata
+        mapped = isinstance(index, MappedFlatIndex)
+        if mapped:
+            # Unchanged shared snapshot: nothing new to publish
+            index, chunks, metadata = index.to_writable(), list(chunks), list(metadata)
+        
+        previous = read_manifest(path.parent)
+        if previous and path == self._saved_path() and previous["version"] != self._store_version:
+            raise RuntimeError(
+                f"Vector store v{previous['version']} was saved by another process since "
+                f"v{self._store_version} was loaded; reload and reapply the changes"
+            )
+        store_version = (previous["version"] if previous else 0) + 1
+        
         # Save FAISS index
         index_path = path.parent / "faiss.index"
-        faiss.write_index(self.index, str(index_path))
+        tmp_index_path = index_path.with_name(index_path.name + ".tmp")
+        faiss.write_index(index, str(tmp_index_path))
         
         # Save chunks and metadata
         data = {
-            "chunks": self.chunks,
-            "metadata": self.metadata,
-            "dimension": self.dimension
+            "chunks": chunks,
+            "metadata": metadata,
+            "dimension": self.dimension,
+            "store_version": store_version
         }
         
-        with open(path, 'wb') as f:
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
             pickle.dump(data, f)
         
+        # Chunks before the index: a reader loading the index first, then
+        # the chunks, sees a newer store_version if it raced with this save
+        os.replace(tmp_path, path)
+        os.replace(tmp_index_path, index_path)
+        write_manifest(path.parent, {
+            "version": store_version,
+            "count": index.ntotal,
+            "dimension": self.dimension,
+            "saved_at": time.time()
+        })
+        self._store_version = store_version
+        self._path, self._dirty = path, False
+        
         print(f"Saved vector store to {path}")
+        
+        if settings.SNAPSHOT_BUNDLE_DIR is not None and not settings.REPLICA_MODE:
+            publish_bundle(path.parent, settings.SNAPSHOT_BUNDLE_DIR, store_version)
+        
+        if self.shared_dir is not None and not mapped:
+            self._publish_shared()
     
     def load(self, path: Path = None) -> bool:
         """
@@ -171,28 +453,129 @@ class VectorStore:
             True if loaded successfully, False otherwise
         """
         path = path or settings.VECTOR_STORE_DIR / "vector_store.pkl"
-        index_path = path.parent / "faiss.index"
+        self._path = path
         
-        if not path.exists() or not index_path.exists():
+        loaded = self.read_saved(path)
+        if loaded is None:
             print("No saved vector store found")
             return False
         
-        # Load FAISS index
-        self.index = faiss.read_index(str(index_path))
+        index, data = loaded
+        with self._state_lock:
+            self.index, self.chunks, self.metadata = index, data["chunks"], data["metadata"]
+        self.dimension = data["dimension"]
+        self._store_version = data.get("store_version")
+        self._dirty = False
+        self.version += 1
+        
+        print(f"Loaded vector store with {self.index.ntotal} documents")
+        return True
+    
+    def read_saved(self, path: Path) -> Optional[Tuple[faiss.Index, Dict]]:
+        """Read a saved index and its chunk data (index first, see save)."""
+        index_path = path.parent / "faiss.index"
+        if not path.exists() or not index_path.exists():
+            return None
         
-        # Load chunks and metadata
+        index = faiss.read_index(str(index_path))
         with open(path, 'rb') as f:
             data = pickle.load(f)
         
-        self.chunks = data["chunks"]
-        self.metadata = data["metadata"]
-        self.dimension = data["dimension"]
+        return index, data
+    
+    def reload_if_changed(self, path: Path = None) -> bool:
+        """
+        Load the saved store if another process saved a newer version, and
+        swap it in. Searches keep using the previous state until the swap.
+        
+        Returns:
+            True if a new version was swapped in
+        """
+        path = path or self._saved_path()
+        self._refresh_shared()  # Another worker may have published it already
+        
+        manifest = read_manifest(path.parent)
+        if manifest is None or manifest["version"] == self._store_version:
+            return False
+        
+        loaded = self.read_saved(path)
+        if loaded is None:
+            return False
+        
+        index, data = loaded
+        if data.get("store_version") != manifest["version"] or index.ntotal != len(data["chunks"]):
+            return False  # Read while a save was in progress; retry on the next check
+        
+        if not self.swap(index, data):
+            return False
+        self._path = path
+        
+        print(f"Reloaded vector store v{manifest['version']} with {index.ntotal} documents")
+        return True
+    
+    def swap(self, index: faiss.Index, data: Dict) -> bool:
+        """
+        Replace the whole store by a loaded version of it.
+        Searches keep using the previous state until the swap.
+        
+        Args:
+            index: Loaded FAISS index
+            data: Loaded chunk data (chunks, metadata, dimension, store_version)
+        
+        Returns:
+            False if the store already holds that version (or a newer one)
+        """
+        with self.writing(refresh=False):
+            loaded_version = data.get("store_version")
+            if loaded_version is not None and self._store_version is not None and loaded_version <= self._store_version:
+                return False  # Published by another worker, or saved by a writer, meanwhile
+            
+            with self._state_lock:
+                self.index, self.chunks, self.metadata = index, data["chunks"], data["metadata"]
+            self.dimension = data["dimension"]
+            self._store_version = loaded_version
+            self._dirty = False
+            self.version += 1
+            
+            if self.shared_dir is not None:
+                self._publish_shared()
         
-        print(f"Loaded vector store with {self.index.ntotal} documents")
         return True
     
+    def watch(self, interval: float = None, path: Path = None):
+        """
+        Check for a newer saved store every interval seconds on a background thread.
+        
+        Args:
+            interval: Seconds between checks (defaults to settings.VECTOR_STORE_RELOAD_SECONDS)
+            path: Saved store to watch
+        """
+        interval = settings.VECTOR_STORE_RELOAD_SECONDS if interval is None else interval
+        if self._watcher is not None:
+            return
+        
+        def run():
+            while not self._stop_watching.wait(interval):
+                try:
+                    self.reload_if_changed(path)
+                except Exception as e:
+                    print(f"Vector store reload failed: {e}")
+        
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(target=run, name="vector-store-watcher", daemon=True)
+        self._watcher.start()
+    
+    def stop_watching(self):
+        """Stop the background reload checks."""
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+    
     def get_stats(self) -> Dict:
         """Get statistics about the vector store."""
+        self._refresh_shared()
+        
         doc_types = {}
         for meta in self.metadata:
             doc_type = meta.get("doc_type", "unknown")
@@ -201,18 +584,170 @@ class VectorStore:
         return {
             "total_chunks": self.index.ntotal,
             "dimension": self.dimension,
-            "doc_types": doc_types
+            "doc_types": doc_types,
+            "store_version": self._store_version,
+            "read_only": self.read_only,
+            "shared_version": self._shared_version
         }
+    
+    def attach_shared(self, directory: Path = None):
+        """
+        Serve from the snapshot shared by all worker processes.
+        The first worker to attach publishes the locally saved store.
+        
+        Args:
+            directory: Snapshot directory (defaults to settings.SHARED_INDEX_DIR)
+        """
+        self.shared_dir = directory or settings.SHARED_INDEX_DIR
+        with shared_write_lock(self.shared_dir):
+            if read_manifest(self.shared_dir) is None:
+                self.load()
+                self._publish_shared()
+            else:
+                self._refresh_shared()
+        
+        print(f"Serving shared vector store snapshot v{self._shared_version} from {self.shared_dir}")
+    
+    @contextmanager
+    def writing(self, path: Path = None, refresh: bool = True):
+        """
+        Hold the write lock around a change, so reloads never swap the store
+        out from under it. The lock is held across processes (on the shared
+        snapshot when shared, otherwise on the saved store), and the change
+        starts from the latest snapshot or saved store, so save() never
+        overwrites a store saved by another process (e.g. the bulk indexer).
+        
+        Args:
+            path: Saved store (defaults to the one loaded or last saved)
+            refresh: Pick up a newer saved store first, unless there are unsaved changes
+        """
+        with self._write_lock:
+            if self._write_depth:  # Nested in a change already holding the lock
+                self._write_depth += 1
+                try:
+                    yield
+                finally:
+                    self._write_depth -= 1
+                return
+            
+            path = path or self._saved_path()
+            lock_dir = self.shared_dir if self.shared_dir is not None else path.parent
+            with shared_write_lock(lock_dir):
+                self._write_depth = 1
+                try:
+                    self._refresh_shared()
+                    if refresh and not self._dirty:
+                        self.reload_if_changed(path)
+                    yield
+                finally:
+                    self._write_depth = 0
+    
+    def _refresh_shared(self):
+        """Map a newer snapshot if another worker published one."""
+        if self.shared_dir is None:
+            return
+        
+        mtime = manifest_mtime(self.shared_dir)
+        if mtime is None or mtime == self._shared_mtime:
+            return
+        
+        with self._state_lock:
+            # Unpublished local changes stay until save() publishes them
+            if mtime == self._shared_mtime or self._has_local_changes():
+                return
+            
+            manifest = read_manifest(self.shared_dir)
+            if manifest["version"] != self._shared_version:
+                self._map_shared(manifest)
+                self.version += 1
+            self._shared_mtime = mtime
+    
+    def _publish_shared(self):
+        """Publish the current state as a new snapshot and serve from it."""
+        manifest = publish_snapshot(
+            self.shared_dir,
+            self.index,
+            self.chunks,
+            self.metadata,
+            self.dimension,
+            store_version=self._store_version
+        )
+        mtime = manifest_mtime(self.shared_dir)
+        with self._state_lock:
+            # Same content, so positions (and self.version) are unchanged
+            self._map_shared(manifest)
+            self._shared_mtime = mtime
+        
+        print(f"Published vector store snapshot v{manifest['version']} ({manifest['count']} chunks)")
+    
+    def _map_shared(self, manifest: Dict):
+        """Swap in the memory-mapped snapshot a manifest points at."""
+        self.index, self.chunks, self.metadata = load_snapshot(self.shared_dir, manifest)
+        self.dimension = manifest["dimension"]
+        self._shared_version = manifest["version"]
+        self._store_version = manifest.get("store_version")
+    
+    def _has_local_changes(self) -> bool:
+        """Whether the mapped snapshot was replaced by a modified private copy."""
+        return self._shared_version is not None and not isinstance(self.index, MappedFlatIndex)
+    
+    def _replace_state(
+        self,
+        index: faiss.Index,
+        chunks: List[Dict],
+        metadata: List[Dict],
+        positions_changed: bool = True
+    ):
+        """
+        Swap in a changed copy of the store.
+        Changes are never made in place: searches that already took the
+        previous state keep a consistent index, chunks and metadata.
+        """
+        with self._state_lock:
+            self.index, self.chunks, self.metadata = index, chunks, metadata
+            if positions_changed:
+                self.version += 1
+        self._dirty = True
+    
+    def _saved_path(self) -> Path:
+        """Saved store this state belongs to."""
+        return self._path or settings.VECTOR_STORE_DIR / "vector_store.pkl"
+    
+    def _ensure_writable(self):
+        """Replace a mapped snapshot by a private, mutable copy before a change."""
+        if self.read_only:
+            raise RuntimeError("Vector store is a read-only replica; change it on the writer node")
+        if not isinstance(self.index, MappedFlatIndex):
+            return
+        
+        index = self.index.to_writable()
+        chunks, metadata = list(self.chunks), list(self.metadata)
+        with self._state_lock:
+            self.index, self.chunks, self.metadata = index, chunks, metadata
 
 
 # Global vector store instance
 _vector_store = None
+_vector_store_lock = threading.Lock()
 
 
 def get_vector_store() -> VectorStore:
     """Get or create the global vector store instance."""
     global _vector_store
     if _vector_store is None:
-        _vector_store = VectorStore()
-        _vector_store.load()  # Try to load existing store
+        with _vector_store_lock:
+            if _vector_store is None:
+                # Publish only once loaded, so other threads never see an empty store
+                vector_store = VectorStore()
+                vector_store.read_only = settings.REPLICA_MODE
+                if settings.MULTI_WORKER_MODE:
+                    vector_store.attach_shared()
+                elif not settings.REPLICA_MODE:
+                    vector_store.load()  # Try to load existing store
+                
+                if settings.REPLICA_MODE:
+                    SnapshotReplica(vector_store).start()
+                elif settings.VECTOR_STORE_RELOAD_SECONDS:
+                    vector_store.watch()
+                _vector_store = vector_store
     return _vector_store
@@ -1,9 +1,10 @@
 """Init file for risk module."""
-from .classifier import RiskClassifier, get_risk_classifier
+from .classifier import RiskClassifier, RiskScores, get_risk_classifier
 from .confidence import ConfidenceCalibrator, get_confidence_calibrator
 
 __all__ = [
     "RiskClassifier",
+    "RiskScores",
     "get_risk_classifier",
     "ConfidenceCalibrator",
     "get_confidence_calibrator"
@@ -2,10 +2,25 @@
 Risk classification module.
 Hybrid approach using rule-based and embedding-based classification.
 """
-from typing import List
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+from pydantic import BaseModel
+from config import settings
 from rag.response_schemas import RiskCategory
+from rag.embedding_context import EmbeddingContext
 from ingestion.embeddings import get_embedding_generator
-import numpy as np
+from ingestion.keyword_matcher import KeywordMatcher
+
+
+class RiskScores(BaseModel):
+    """Risk scores of one question/answer pair."""
+    scores: Dict[RiskCategory, float]  # Combined score of every category
+    category: RiskCategory  # Single-label result
+    categories: List[RiskCategory]  # Multi-label result (every category above the threshold)
 
 
 class RiskClassifier:
@@ -35,26 +50,61 @@ class RiskClassifier:
         ]
     }
     
+    # Built once; finds every category keyword in a single pass
+    KEYWORD_MATCHER = KeywordMatcher(CATEGORY_KEYWORDS)
+    
+    # Score matrix columns
+    CATEGORIES = list(CATEGORY_KEYWORDS)
+    KEYWORD_COUNTS = np.array([len(keywords) for keywords in CATEGORY_KEYWORDS.values()], dtype=np.float32)
+    
+    # Weight of rule-based scores; embedding-based scores get the rest
+    RULE_WEIGHT = 0.6
+    MIN_SCORE = 0.1  # Below this, the single-label result is UNKNOWN
+    MULTI_LABEL_THRESHOLD = 0.2
+    
     def __init__(self):
         """Initialize risk classifier."""
         self.embedding_gen = get_embedding_generator()
         self._prepare_category_embeddings()
     
     def _prepare_category_embeddings(self):
-        """Prepare embeddings for each risk category."""
-        self.category_embeddings = {}
+        """
+        Build the prototype matrix: one L2-normalised embedding per category,
+        so scoring a text is a single matrix product. The matrix is cached on
+        disk per embedding model and keyword set.
+        """
+        texts = [" ".join(self.CATEGORY_KEYWORDS[c]) for c in self.CATEGORIES]
+        key = hashlib.sha256(
+            json.dumps([self.embedding_gen.model_name, texts]).encode("utf-8")
+        ).hexdigest()[:16]
+        cache_path = settings.RISK_PROTOTYPE_CACHE_DIR / f"prototypes-{key}.npy"
+        
+        prototypes = None
+        if cache_path.exists():
+            try:
+                prototypes = np.load(cache_path)
+            except (OSError, ValueError):
+                prototypes = None
+        
+        if prototypes is None or prototypes.shape[0] != len(texts):
+            prototypes = _normalize_rows(
+                np.asarray(self.embedding_gen.generate_embeddings(texts), dtype=np.float32)
+            )
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+            with open(tmp_path, 'wb') as f:
+                np.save(f, prototypes)
+            os.replace(tmp_path, cache_path)
         
-        for category, keywords in self.CATEGORY_KEYWORDS.items():
-            # Create a representative text for each category
-            category_text = " ".join(keywords)
-            embedding = self.embedding_gen.generate_embedding(category_text)
-            self.category_embeddings[category] = embedding
+        self.prototypes = prototypes
     
     def classify(
         self,
         question: str,
         answer: str,
-        retrieved_chunks: List = None
+        retrieved_chunks: List = None,
+        use_embeddings: bool = True,
+        context: Optional[EmbeddingContext] = None
     ) -> RiskCategory:
         """
         Classify the risk category using hybrid approach.
@@ -63,94 +113,23 @@ class RiskClassifier:
             question: User question
             answer: Generated answer
             retrieved_chunks: Retrieved evidence chunks
+            use_embeddings: False to classify by keywords only (no embedding call)
+            context: The request's embeddings; only the answer is encoded
             
         Returns:
             Risk category
         """
-        # Combine question and answer for classification
-        combined_text = f"{question} {answer}".lower()
-        
-        # Rule-based classification
-        rule_scores = self._rule_based_classification(combined_text)
-        
-        # Embedding-based classification
-        embedding_scores = self._embedding_based_classification(combined_text)
-        
-        # Combine scores (weighted average)
-        combined_scores = {}
-        for category in RiskCategory:
-            if category == RiskCategory.UNKNOWN:
-                continue
-            
-            rule_score = rule_scores.get(category, 0.0)
-            emb_score = embedding_scores.get(category, 0.0)
-            
-            # Weight: 60% rule-based, 40% embedding-based
-            combined_scores[category] = 0.6 * rule_score + 0.4 * emb_score
-        
-        # Return category with highest score
-        if combined_scores and max(combined_scores.values()) > 0.1:
-            return max(combined_scores, key=combined_scores.get)
-        
-        return RiskCategory.UNKNOWN
-    
-    def _rule_based_classification(self, text: str) -> dict:
-        """Rule-based classification using keyword matching."""
-        scores = {}
-        
-        for category, keywords in self.CATEGORY_KEYWORDS.items():
-            # Count keyword occurrences
-            count = sum(1 for keyword in keywords if keyword in text)
-            
-            # Normalize by number of keywords
-            score = count / len(keywords) if keywords else 0.0
-            scores[category] = score
-        
-        # Normalize scores to sum to 1
-        total = sum(scores.values())
-        if total > 0:
-            scores = {k: v / total for k, v in scores.items()}
-        
-        return scores
-    
-    def _embedding_based_classification(self, text: str) -> dict:
-        """Embedding-based classification using semantic similarity."""
-        # Generate embedding for input text
-        text_embedding = self.embedding_gen.generate_embedding(text)
-        
-        scores = {}
-        
-        for category, category_embedding in self.category_embeddings.items():
-            # Calculate cosine similarity
-            similarity = self._cosine_similarity(text_embedding, category_embedding)
-            scores[category] = max(0.0, similarity)  # Ensure non-negative
-        
-        # Normalize scores
-        total = sum(scores.values())
-        if total > 0:
-            scores = {k: v / total for k, v in scores.items()}
-        
-        return scores
-    
-    def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """Calculate cosine similarity between two vectors."""
-        vec1 = np.array(vec1)
-        vec2 = np.array(vec2)
-        
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
-        
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
-        
-        return dot_product / (norm1 * norm2)
+        return self.classify_batch(
+            [(question, answer)],
+            use_embeddings=use_embeddings,
+            contexts=[context]
+        )[0].category
     
     def classify_multi_label(
         self,
         question: str,
         answer: str,
-        threshold: float = 0.2
+        threshold: float = MULTI_LABEL_THRESHOLD
     ) -> List[RiskCategory]:
         """
         Multi-label classification - return all categories above threshold.
@@ -163,36 +142,131 @@ class RiskClassifier:
         Returns:
             List of risk categories
         """
-        combined_text = f"{question} {answer}".lower()
+        return self.classify_batch([(question, answer)], threshold=threshold)[0].categories
+    
+    def classify_batch(
+        self,
+        pairs: List[Tuple[str, str]],
+        threshold: float = MULTI_LABEL_THRESHOLD,
+        use_embeddings: bool = True,
+        contexts: Optional[List[Optional[EmbeddingContext]]] = None
+    ) -> List[RiskScores]:
+        """
+        Score many question/answer pairs at once: one embedding batch and one
+        matrix product. Single- and multi-label results come from the same scores.
+        
+        Args:
+            pairs: (question, answer) pairs
+            threshold: Minimum score of multi-label categories
+            use_embeddings: False to score by keywords only (no embedding call)
+            contexts: Embedding context of each pair (or None), reused
+                instead of encoding the question again
+            
+        Returns:
+            Scores of each pair, in order
+        """
+        texts = [f"{question} {answer}".lower() for question, answer in pairs]
+        if not texts:
+            return []
+        
+        scores = self._rule_based_classification(texts)
+        if use_embeddings:
+            embeddings = self._text_embeddings(pairs, texts, contexts or [None] * len(pairs))
+            scores = (
+                self.RULE_WEIGHT * scores
+                + (1 - self.RULE_WEIGHT) * self._embedding_based_classification(embeddings)
+            )
+        
+        return [self._to_result(row, threshold) for row in scores]
+    
+    def _text_embeddings(
+        self,
+        pairs: List[Tuple[str, str]],
+        texts: List[str],
+        contexts: List[Optional[EmbeddingContext]]
+    ) -> np.ndarray:
+        """
+        Embeddings of the combined texts, in one encoder call.
+        With a context, the question's vector is reused and only the answer
+        is encoded (and recorded for later stages); the text is represented
+        by the sum of the question and answer unit vectors.
+        """
+        to_encode = {}
+        for (_, answer), text, context in zip(pairs, texts, contexts):
+            if context is None:
+                to_encode.setdefault(text, None)
+            elif context.answer(answer) is None:
+                to_encode.setdefault(answer, None)
         
-        rule_scores = self._rule_based_classification(combined_text)
-        embedding_scores = self._embedding_based_classification(combined_text)
+        if to_encode:
+            encoded = self.embedding_gen.generate_embeddings(list(to_encode))
+            to_encode = dict(zip(to_encode, encoded))
         
-        combined_scores = {}
-        for category in RiskCategory:
-            if category == RiskCategory.UNKNOWN:
+        rows = []
+        for (_, answer), text, context in zip(pairs, texts, contexts):
+            if context is None:
+                rows.append(np.asarray(to_encode[text], dtype=np.float32))
                 continue
             
-            rule_score = rule_scores.get(category, 0.0)
-            emb_score = embedding_scores.get(category, 0.0)
-            combined_scores[category] = 0.6 * rule_score + 0.4 * emb_score
+            vector = context.answer(answer)
+            if vector is None:
+                vector = context.add_answer(answer, to_encode[answer])
+            rows.append(context.query + vector)
         
-        # Return all categories above threshold
-        categories = [
-            cat for cat, score in combined_scores.items()
-            if score >= threshold
-        ]
+        return np.stack(rows)
+    
+    def _to_result(self, row: np.ndarray, threshold: float) -> RiskScores:
+        """Single- and multi-label results of one score vector."""
+        best = int(np.argmax(row))
+        categories = [self.CATEGORIES[i] for i in np.flatnonzero(row >= threshold)]
         
-        return categories if categories else [RiskCategory.UNKNOWN]
+        return RiskScores(
+            scores={category: float(score) for category, score in zip(self.CATEGORIES, row)},
+            category=self.CATEGORIES[best] if row[best] > self.MIN_SCORE else RiskCategory.UNKNOWN,
+            categories=categories or [RiskCategory.UNKNOWN]
+        )
+    
+    def _rule_based_classification(self, texts: List[str]) -> np.ndarray:
+        """Keyword scores (texts x categories), each row summing to 1 if any keyword matched."""
+        counts = np.array(
+            [
+                [matches[category] for category in self.CATEGORIES]
+                for matches in map(self.KEYWORD_MATCHER.group_matches, texts)
+            ],
+            dtype=np.float32
+        )
+        
+        # Normalize by number of keywords, then to sum to 1
+        return _normalize_sums(counts / self.KEYWORD_COUNTS)
+    
+    def _embedding_based_classification(self, embeddings: np.ndarray) -> np.ndarray:
+        """Cosine similarity to each category prototype (texts x categories), rows summing to 1."""
+        similarities = _normalize_rows(embeddings) @ self.prototypes.T
+        return _normalize_sums(np.maximum(similarities, 0.0))
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale rows to unit L2 norm (zero rows stay zero)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def _normalize_sums(matrix: np.ndarray) -> np.ndarray:
+    """Scale rows to sum to 1 (zero rows stay zero)."""
+    totals = matrix.sum(axis=1, keepdims=True)
+    return np.divide(matrix, totals, out=np.zeros_like(matrix), where=totals > 0)
 
 
 # Global classifier instance
 _risk_classifier = None
+_risk_classifier_lock = threading.Lock()
 
 
 def get_risk_classifier() -> RiskClassifier:
     """Get or create the global risk classifier instance."""
     global _risk_classifier
     if _risk_classifier is None:
-        _risk_classifier = RiskClassifier()
+        with _risk_classifier_lock:
+            if _risk_classifier is None:
+                _risk_classifier = RiskClassifier()
     return _risk_classifier
@@ -2,14 +2,28 @@
 Confidence calibration and uncertainty detection.
 Provides calibrated confidence scores for RAG responses.
 """
-from typing import List
+from typing import List, Optional
+import threading
 import numpy as np
 from config import settings
+from ingestion.keyword_matcher import KeywordMatcher
+from ingestion.term_features import contained_terms, extract_terms, result_terms
+from rag.embedding_context import EmbeddingContext
 
 
 class ConfidenceCalibrator:
     """Calibrates confidence scores for RAG responses."""
     
+    # Uncertainty indicators
+    UNCERTAINTY_PHRASES = [
+        "may", "might", "could", "possibly", "perhaps",
+        "unclear", "uncertain", "not sure", "appears to",
+        "seems to", "likely", "probably"
+    ]
+    
+    # Built once; finds every uncertainty phrase in a single pass
+    UNCERTAINTY_MATCHER = KeywordMatcher({"uncertainty": UNCERTAINTY_PHRASES})
+    
     def __init__(self):
         """Initialize confidence calibrator."""
         pass
@@ -19,7 +33,8 @@ class ConfidenceCalibrator:
         question: str,
         answer: str,
         retrieved_chunks: List,
-        risk_category: str
+        risk_category: str,
+        context: Optional[EmbeddingContext] = None
     ) -> float:
         """
         Calculate calibrated confidence score.
@@ -29,6 +44,8 @@ class ConfidenceCalibrator:
             answer: Generated answer
             retrieved_chunks: Retrieved evidence chunks
             risk_category: Classified risk category
+            context: The request's embeddings; adds semantic support of the
+                answer by the evidence when the answer is already encoded
             
         Returns:
             Confidence score between 0.0 and 1.0
@@ -52,6 +69,10 @@ class ConfidenceCalibrator:
             retrieved_chunks,
             answer
         )
+        if context is not None and retrieved_chunks:
+            support = context.answer_support(answer)
+            if support is not None:
+                consistency_score = 0.5 * consistency_score + 0.5 * max(0.0, support)
         
         # Weighted combination
         confidence = (
@@ -98,10 +119,10 @@ class ConfidenceCalibrator:
         # Check how many question terms appear in retrieved chunks
         covered_terms = set()
         for chunk in chunks:
-            chunk_text = chunk.text.lower()
-            for term in question_terms:
-                if term in chunk_text:
-                    covered_terms.add(term)
+            uncovered = question_terms - covered_terms
+            if not uncovered:
+                break
+            covered_terms |= contained_terms(uncovered, *result_terms(chunk))
         
         # Calculate coverage ratio
         coverage = len(covered_terms) / len(question_terms) if question_terms else 0.0
@@ -138,18 +159,17 @@ class ConfidenceCalibrator:
             return 0.0
         
         # Simple heuristic: check if answer contains terms from evidence
-        answer_lower = answer.lower()
-        
         # Extract key terms from chunks (excluding common words)
         common_words = {"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for"}
         chunk_terms = set()
         
         for chunk in chunks:
-            terms = chunk.text.lower().split()
+            terms, _ = result_terms(chunk)
             chunk_terms.update(t for t in terms if t not in common_words and len(t) > 3)
         
         # Count how many chunk terms appear in answer
-        matching_terms = sum(1 for term in chunk_terms if term in answer_lower)
+        answer_terms = extract_terms(answer)
+        matching_terms = len(contained_terms(chunk_terms, answer_terms, " ".join(answer_terms)))
         
         # Normalize
         consistency = min(1.0, matching_terms / max(1, len(chunk_terms) * 0.3))
@@ -163,16 +183,7 @@ class ConfidenceCalibrator:
         Returns:
             Penalty factor between 0.0 and 0.5
         """
-        answer_lower = answer.lower()
-        
-        # Uncertainty indicators
-        uncertainty_phrases = [
-            "may", "might", "could", "possibly", "perhaps",
-            "unclear", "uncertain", "not sure", "appears to",
-            "seems to", "likely", "probably"
-        ]
-        
-        count = sum(1 for phrase in uncertainty_phrases if phrase in answer_lower)
+        count = self.UNCERTAINTY_MATCHER.group_matches(answer)["uncertainty"]
         
         # Penalty increases with number of uncertainty indicators
         penalty = min(0.5, count * 0.1)
@@ -214,11 +225,14 @@ class ConfidenceCalibrator:
 
 # Global calibrator instance
 _confidence_calibrator = None
+_confidence_calibrator_lock = threading.Lock()
 
 
 def get_confidence_calibrator() -> ConfidenceCalibrator:
     """Get or create the global confidence calibrator instance."""
     global _confidence_calibrator
     if _confidence_calibrator is None:
-        _confidence_calibrator = ConfidenceCalibrator()
+        with _confidence_calibrator_lock:
+            if _confidence_calibrator is None:
+                _confidence_calibrator = ConfidenceCalibrator()
     return _confidence_calibrator
@@ -0,0 +1,51 @@
+"""
+Shared test fixtures.
+Tests run against the backend package directly (as the API does), with a
+deterministic embedding generator instead of the sentence transformer.
+"""
+import sys
+import hashlib
+import re
+from pathlib import Path
+import numpy as np
+import pytest
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from config import settings
+import rag  # noqa: F401  Imported before risk, as by the API (risk.classifier and rag.qa_engine import each other)
+
+
+class HashingEmbeddingGenerator:
+    """Hashed bag-of-words embeddings: texts sharing words get similar vectors."""
+    
+    model_name = "hashing"
+    
+    def __init__(self, dimension: int = None):
+        self.dimension = dimension or settings.VECTOR_DIMENSION
+    
+    def generate_embedding(self, text: str):
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for word in re.findall(r"[a-z]{3,}", text.lower()):
+            vector[int(hashlib.md5(word.encode()).hexdigest()[:8], 16) % self.dimension] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+    
+    def generate_embeddings(self, texts):
+        return [self.generate_embedding(text) for text in texts]
+
+
+@pytest.fixture
+def embedding_gen():
+    return HashingEmbeddingGenerator()
+
+
+@pytest.fixture
+def store_dir(tmp_path, monkeypatch):
+    """Keep every saved store of a test in its own directory."""
+    directory = tmp_path / "vector_store"
+    monkeypatch.setattr(settings, "VECTOR_STORE_DIR", directory)
+    monkeypatch.setattr(settings, "SNAPSHOT_BUNDLE_DIR", None)
+    return directory
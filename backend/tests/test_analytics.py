@@ -0,0 +1,79 @@
+"""
+Tests for analytics tracking and storage.
+"""
+import threading
+from analytics.metrics import AnalyticsTracker
+from analytics.storage import AnalyticsStorage
+
+
+def test_concurrent_tracking_and_saving(tmp_path):
+    tracker = AnalyticsTracker()
+    storage = AnalyticsStorage(tmp_path / "analytics.json")
+    errors = []
+    
+    def answer(worker: int):
+        try:
+            for i in range(200):
+                tracker.track_question(
+                    question_id=f"{worker}-{i}",
+                    question="What are the model limitations?",
+                    risk_category="limitations",
+                    confidence_score=0.7,
+                    evidence_coverage=0.6,
+                    retrieved_chunks=5
+                )
+                # New stages are added while other threads save and report
+                tracker.track_stage_timings({"retrieval": 12.0, f"stage-{worker}-{i % 50}": 3.0})
+                if i % 20 == 0:
+                    storage.save(tracker)
+                    tracker.get_system_metrics()
+                    tracker.get_stage_latency_stats()
+        except Exception as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=answer, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert not errors
+    storage.save(tracker)
+    
+    restored = AnalyticsTracker()
+    storage.load(restored)
+    assert len(restored.questions) == 800
+    assert restored.risk_categories["limitations"] == 800
+    assert restored.stage_latencies["retrieval"].count == 800
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_latency_endpoint_serialises_slow_tail(monkeypatch):
+    import asyncio
+    from fastapi.responses import JSONResponse
+    import analytics.metrics
+    from api.analytics import get_stage_latency_stats
+    
+    tracker = AnalyticsTracker()
+    tracker.track_stage_timings({"generation": 45000.0})
+    tracker.track_stage_timings({"generation": 120.0})
+    monkeypatch.setattr(analytics.metrics, "_analytics_tracker", tracker)
+    
+    payload = asyncio.run(get_stage_latency_stats())
+    JSONResponse(payload)  # Raises on inf or nan
+    
+    generation = payload["stages"]["generation"]
+    assert generation["p99_ms"] == generation["max_ms"] == 45000.0
+    assert generation["overflow"] == 1
+
+
+def test_engine_stats_do_not_start_the_engine(monkeypatch):
+    import asyncio
+    import rag.qa_engine
+    from api.analytics import get_coalescing_stats, get_generation_stats
+    
+    monkeypatch.setattr(rag.qa_engine, "_qa_engine", None)
+    
+    assert asyncio.run(get_generation_stats())["generation"] == {"started": False}
+    assert asyncio.run(get_coalescing_stats())["coalescing"] == {"started": False}
+    assert rag.qa_engine._qa_engine is None
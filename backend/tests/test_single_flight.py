@@ -0,0 +1,45 @@
+"""
+Tests for single-flight coalescing.
+"""
+import threading
+import time
+from rag.single_flight import SingleFlight
+
+
+def test_followers_wait_only_within_their_timeout():
+    flight = SingleFlight()
+    leader_started = threading.Event()
+    release = threading.Event()
+    results = {}
+    
+    def slow():
+        leader_started.set()
+        release.wait(5)
+        return "leader"
+    
+    def call(name, fn, timeout=None):
+        started = time.monotonic()
+        results[name] = flight.run("question", fn, timeout=timeout) + (time.monotonic() - started,)
+    
+    leader = threading.Thread(target=call, args=("leader", slow))
+    leader.start()
+    leader_started.wait(5)
+    
+    patient = threading.Thread(target=call, args=("patient", lambda: "patient"))
+    patient.start()
+    call("hurried", lambda: "hurried", timeout=0.05)
+    
+    release.set()
+    leader.join()
+    patient.join()
+    
+    assert results["leader"][:2] == ("leader", False)
+    assert results["patient"][:2] == ("leader", True)
+    # Ran its own call instead of waiting for the leader
+    assert results["hurried"][:2] == ("hurried", False)
+    assert results["hurried"][2] < 1
+    
+    stats = flight.get_stats()
+    assert stats["coalesced"] == 2
+    assert stats["abandoned"] == 1
+    assert stats["in_flight"] == 0
@@ -0,0 +1,69 @@
+"""
+Tests for snapshot bundle distribution to read replicas.
+"""
+import json
+import shutil
+from config import settings
+from retrieval.snapshot_bundles import BUNDLE_MANIFEST, SnapshotReplica, bundle_name
+from retrieval.vector_store import VectorStore
+
+
+def test_replica_rejects_bundle_holding_another_store_version(tmp_path, store_dir, embedding_gen, monkeypatch):
+    bundle_dir = tmp_path / "bundles"
+    monkeypatch.setattr(settings, "SNAPSHOT_BUNDLE_DIR", bundle_dir)
+    
+    writer = VectorStore()
+    writer.add_documents(
+        embedding_gen.generate_embeddings(["credit risk scoring"]),
+        [{"chunk_id": "c0", "text": "credit risk scoring", "section_title": "Overview"}],
+        [{"filename": "doc0.md"}]
+    )
+    writer.save()
+    
+    replica_store = VectorStore()
+    replica_store.read_only = True
+    replica = SnapshotReplica(replica_store, source_dir=bundle_dir, local_dir=tmp_path / "replica")
+    assert replica.pull()
+    assert replica_store.get_stats()["store_version"] == 1
+    
+    # Checksums match, but the store inside is still version 1
+    mislabelled = bundle_dir / bundle_name(2)
+    shutil.copytree(bundle_dir / bundle_name(1), mislabelled)
+    manifest = json.loads((mislabelled / BUNDLE_MANIFEST).read_text())
+    (mislabelled / BUNDLE_MANIFEST).write_text(json.dumps({**manifest, "version": 2}))
+    
+    assert not replica.pull()
+    assert replica.rejected == 1
+    assert replica.version == 1
+    assert replica_store.get_stats()["store_version"] == 1
+
+
+def test_restarted_replica_serves_pulled_bundle_while_source_is_empty(tmp_path, store_dir, embedding_gen, monkeypatch):
+    bundle_dir = tmp_path / "bundles"
+    monkeypatch.setattr(settings, "SNAPSHOT_BUNDLE_DIR", bundle_dir)
+    
+    writer = VectorStore()
+    writer.add_documents(
+        embedding_gen.generate_embeddings(["credit risk scoring"]),
+        [{"chunk_id": "c0", "text": "credit risk scoring", "section_title": "Overview"}],
+        [{"filename": "doc0.md"}]
+    )
+    writer.save()
+    
+    replica = SnapshotReplica(VectorStore(), source_dir=bundle_dir, local_dir=tmp_path / "replica")
+    assert replica.pull()
+    
+    # e.g. the writer's bundle directory was recreated empty
+    shutil.rmtree(bundle_dir)
+    bundle_dir.mkdir()
+    
+    restarted_store = VectorStore()
+    restarted_store.read_only = True
+    restarted = SnapshotReplica(restarted_store, source_dir=bundle_dir, local_dir=tmp_path / "replica")
+    restarted.start(interval=60)
+    try:
+        assert restarted.version == 1
+        assert restarted_store.get_stats()["store_version"] == 1
+        assert [c["chunk_id"] for c in restarted_store.chunks] == ["c0"]
+    finally:
+        restarted.stop()
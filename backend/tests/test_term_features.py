@@ -0,0 +1,129 @@
+"""
+Tests that term matching on stored term features gives the same scores as
+the substring matching on lowercased texts it replaced.
+"""
+import random
+import pytest
+from ingestion.term_features import term_fields
+from retrieval.reranker import Reranker
+from retrieval.vector_store import RetrievalResult
+from risk.confidence import ConfidenceCalibrator
+
+
+VOCABULARY = [
+    "model", "models", "Model", "risk", "risk-based", "bias", "biased", "unbiased",
+    "data", "dataset", "the", "a", "an", "and", "for", "fairness", "fair", "limitations",
+    "limitations.", "limitation", "(limitations)", "drift", "monitoring", "validation,",
+    "validated", "compliance;", "credit", "over-fitting", "fit", "AUC=0.82", "0.8",
+    "explainability", "SHAP", "shap-values", "e.g.", "governance", "what", "are", "is",
+    "how", "why?", "does", "approval", "approved"
+]
+
+CASES = [
+    # Whole terms, substrings of longer terms, and punctuation
+    ("What are the model limitations?", "The model has known limitations. See (limitations) below."),
+    ("bias fair", "Unbiased scoring is fairness-aware; biased inputs are rejected."),
+    ("risk-based approval", "A risk based approval process for credit risk-based-pricing."),
+    ("AUC 0.8", "Validation AUC=0.82 on the holdout set."),
+    ("e.g. SHAP", "Explanations (e.g., SHAP values) are logged."),
+    ("   ", "Empty query terms."),
+    ("MODEL Drift", "model drift MONITORING"),
+]
+
+
+def substring_rerank_score(query: str, result: RetrievalResult) -> float:
+    """Reranked score as computed before terms were stored."""
+    query_terms = set(query.lower().split())
+    text_lower = result.text.lower()
+    matching_terms = sum(1 for term in query_terms if term in text_lower)
+    term_boost = matching_terms / len(query_terms) if query_terms else 0
+    section_boost = 0.1 if any(term in result.section_title.lower() for term in query_terms) else 0.0
+    return result.score * (1.0 + term_boost * 0.2 + section_boost)
+
+
+def substring_coverage(question: str, chunks) -> float:
+    if not chunks:
+        return 0.0
+    question_terms = set(question.lower().split())
+    covered_terms = set()
+    for chunk in chunks:
+        chunk_text = chunk.text.lower()
+        for term in question_terms:
+            if term in chunk_text:
+                covered_terms.add(term)
+    return len(covered_terms) / len(question_terms) if question_terms else 0.0
+
+
+def substring_consistency(chunks, answer: str) -> float:
+    if not chunks:
+        return 0.0
+    answer_lower = answer.lower()
+    common_words = {"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for"}
+    chunk_terms = set()
+    for chunk in chunks:
+        terms = chunk.text.lower().split()
+        chunk_terms.update(t for t in terms if t not in common_words and len(t) > 3)
+    matching_terms = sum(1 for term in chunk_terms if term in answer_lower)
+    return min(1.0, matching_terms / max(1, len(chunk_terms) * 0.3))
+
+
+def make_result(i: int, text: str, stored: bool, score: float = 0.5) -> RetrievalResult:
+    """Retrieval result with stored term features, or as indexed before they were stored."""
+    fields = term_fields(text) if stored else {}
+    return RetrievalResult(
+        chunk_id=f"chunk-{i}",
+        text=text,
+        score=score,
+        metadata={"filename": f"doc-{i}.md"},
+        section_title="Model Limitations" if i % 3 == 0 else "Overview",
+        **fields
+    )
+
+
+def random_text(rng: random.Random, length: int) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(length))
+
+
+def random_cases(count: int = 200):
+    rng = random.Random(49)
+    for _ in range(count):
+        query = random_text(rng, rng.randint(1, 8))
+        texts = [random_text(rng, rng.randint(0, 40)) for _ in range(rng.randint(1, 6))]
+        answer = random_text(rng, rng.randint(0, 30))
+        yield query, texts, answer
+
+
+@pytest.mark.parametrize("stored", [True, False, None])
+def test_rerank_matches_substring_scores(stored):
+    reranker = Reranker()
+    cases = [(query, [text, text.upper()], text) for query, text in CASES] + list(random_cases())
+    
+    for query, texts, _ in cases:
+        # None mixes chunks with and without stored terms
+        results = [
+            make_result(i, text, stored if stored is not None else i % 2 == 0, score=0.3 + 0.1 * i)
+            for i, text in enumerate(texts)
+        ]
+        reranked = reranker._rerank(query, results, top_k=len(results), terms_cache={})
+        
+        expected = {result.chunk_id: substring_rerank_score(query, result) for result in results}
+        for result in reranked:
+            assert result.reranked_score == pytest.approx(expected[result.chunk_id]), (query, result.text)
+
+
+@pytest.mark.parametrize("stored", [True, False, None])
+def test_confidence_terms_match_substring_scores(stored):
+    calibrator = ConfidenceCalibrator()
+    cases = [(query, [text], text.lower() + " extra") for query, text in CASES] + list(random_cases())
+    
+    for question, texts, answer in cases:
+        chunks = [
+            make_result(i, text, stored if stored is not None else i % 2 == 0)
+            for i, text in enumerate(texts)
+        ]
+        assert calibrator._calculate_coverage_score(question, chunks) == pytest.approx(
+            substring_coverage(question, chunks)
+        ), (question, texts)
+        assert calibrator._calculate_consistency_score(chunks, answer) == pytest.approx(
+            substring_consistency(chunks, answer)
+        ), (texts, answer)
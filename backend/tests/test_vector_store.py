@@ -0,0 +1,170 @@
+"""
+Tests for the vector store.
+"""
+import pytest
+from retrieval.vector_store import VectorStore
+from ingestion.pipeline import IngestionPipeline, prepare_document
+
+
+SHARED_SECTION = """## Regulatory Compliance
+
+The model complies with the fair lending regulations and the adverse action
+notice requirements. Compliance is reviewed quarterly by the model risk
+management team, and every review is documented in the model inventory.
+"""
+
+
+def write_document(directory, filename, model_name, body):
+    path = directory / filename
+    path.write_text(f"# {model_name} Model Card\n\nModel Name: {model_name}\n\n{body}\n{SHARED_SECTION}")
+    return path
+
+
+def test_filtered_search_matches_deduplicated_chunk(tmp_path, store_dir, embedding_gen):
+    vector_store = VectorStore()
+    pipeline = IngestionPipeline(embedding_gen=embedding_gen, vector_store=vector_store)
+    
+    alpha = write_document(tmp_path, "alpha.md", "Alpha", "## Overview\n\nAlpha scores retail credit applications.\n")
+    beta = write_document(tmp_path, "beta.md", "Beta", "## Overview\n\nBeta forecasts commercial loan losses.\n")
+    pipeline.ingest_file(alpha, save=False)
+    result = pipeline.ingest_file(beta, save=False)
+    assert result.chunks_suppressed > 0
+    
+    query = embedding_gen.generate_embedding("regulatory compliance fair lending review")
+    results = vector_store.search(query, top_k=5, filters={"model_name": "Beta"})
+    
+    compliance = [r for r in results if "fair lending" in r.text]
+    assert compliance, "Beta's compliance section is only stored as a duplicate of Alpha's"
+    assert compliance[0].metadata["model_name"] == "Beta"
+    assert compliance[0].metadata["filename"] == "beta.md"
+    
+    # Unfiltered, the chunk is still returned once, under the first document
+    unfiltered = [r for r in vector_store.search(query, top_k=5) if "fair lending" in r.text]
+    assert [r.metadata["model_name"] for r in unfiltered] == ["Alpha"]
+
+
+def test_changes_leave_searched_state_untouched(store_dir, embedding_gen):
+    vector_store = VectorStore()
+    texts = ["credit risk scoring", "loss forecasting", "fraud detection"]
+    vector_store.add_documents(
+        embedding_gen.generate_embeddings(texts),
+        [{"chunk_id": f"c{i}", "text": text, "section_title": "Overview"} for i, text in enumerate(texts)],
+        [{"filename": f"doc{i}.md"} for i in range(len(texts))]
+    )
+    
+    # The state a running search holds on to
+    index, chunks, metadata = vector_store.index, vector_store.chunks, vector_store.metadata
+    
+    vector_store.remove_positions([0])
+    vector_store.add_documents(
+        embedding_gen.generate_embeddings(["model monitoring"]),
+        [{"chunk_id": "c3", "text": "model monitoring", "section_title": "Overview"}],
+        [{"filename": "doc3.md"}]
+    )
+    vector_store.update_chunk(0, {"chunk_id": "c1", "text": "loss forecasting", "section_title": "Scope"})
+    vector_store.add_duplicate_sources([(1, {"chunk_id": "d2", "section_title": "Overview", "metadata": {}})])
+    
+    assert index.ntotal == len(chunks) == len(metadata) == 3
+    assert [c["chunk_id"] for c in chunks] == ["c0", "c1", "c2"]
+    assert all("duplicate_sources" not in c and c["section_title"] == "Overview" for c in chunks)
+    
+    assert vector_store.index.ntotal == len(vector_store.chunks) == 3
+    assert [c["chunk_id"] for c in vector_store.chunks] == ["c1", "c2", "c3"]
+    assert vector_store.chunks[1]["duplicate_sources"][0]["chunk_id"] == "d2"
+
+
+def add_chunk(vector_store, embedding_gen, chunk_id, text):
+    vector_store.add_documents(
+        embedding_gen.generate_embeddings([text]),
+        [{"chunk_id": chunk_id, "text": text, "section_title": "Overview"}],
+        [{"filename": f"{chunk_id}.md"}]
+    )
+
+
+def test_writer_starts_from_store_saved_by_another_process(store_dir, embedding_gen):
+    server = VectorStore()
+    server.load()
+    
+    # e.g. the bulk indexer, with its own copy of the store
+    indexer = VectorStore()
+    indexer.load()
+    add_chunk(indexer, embedding_gen, "bulk", "bulk indexed document")
+    indexer.save()
+    
+    with server.writing():
+        add_chunk(server, embedding_gen, "upload", "uploaded document")
+        server.save()
+    
+    reloaded = VectorStore()
+    reloaded.load()
+    assert [c["chunk_id"] for c in reloaded.chunks] == ["bulk", "upload"]
+
+
+def test_save_refuses_to_overwrite_newer_store(store_dir, embedding_gen):
+    first, second = VectorStore(), VectorStore()
+    first.load()
+    second.load()
+    
+    add_chunk(first, embedding_gen, "first", "first document")
+    first.save()
+    add_chunk(second, embedding_gen, "second", "second document")
+    
+    with pytest.raises(RuntimeError):
+        second.save()
+    
+    reloaded = VectorStore()
+    reloaded.load()
+    assert [c["chunk_id"] for c in reloaded.chunks] == ["first"]
+
+
+def test_failed_ingestion_leaves_no_near_duplicate_entries(tmp_path, store_dir, embedding_gen, monkeypatch):
+    vector_store = VectorStore()
+    pipeline = IngestionPipeline(embedding_gen=embedding_gen, vector_store=vector_store)
+    pipeline.ingest_file(write_document(tmp_path, "alpha.md", "Alpha", "## Overview\n\nAlpha scores retail credit applications.\n"), save=False)
+    
+    monitoring = "## Monitoring\n\nDrift in the population stability index triggers a quarterly recalibration.\n"
+    gamma = write_document(tmp_path, "gamma.md", "Gamma", monitoring)
+    with monkeypatch.context() as patch:
+        patch.setattr(embedding_gen, "generate_embeddings", lambda texts: 1 / 0)
+        with pytest.raises(ZeroDivisionError):
+            pipeline.ingest_file(gamma, save=False)
+    
+    assert not any(chunk.get("duplicate_sources") for chunk in vector_store.chunks if "Gamma" not in chunk["text"])
+    
+    # The failed document's chunks were never indexed, so they cannot be duplicated
+    result = pipeline.ingest_file(write_document(tmp_path, "delta.md", "Delta", monitoring), save=False)
+    texts = [chunk["text"] for chunk in vector_store.chunks]
+    assert sum("population stability index" in text for text in texts) == 1
+    assert result.chunks_created == result.chunks_embedded + result.chunks_suppressed
+
+
+def test_failed_reupload_keeps_previous_version(tmp_path, store_dir, embedding_gen, monkeypatch):
+    vector_store = VectorStore()
+    pipeline = IngestionPipeline(embedding_gen=embedding_gen, vector_store=vector_store)
+    pipeline.ingest_file(write_document(tmp_path, "alpha.md", "Alpha", "## Overview\n\nAlpha scores retail credit applications.\n"), save=False)
+    before = [chunk["text"] for chunk in vector_store.chunks]
+    
+    revised = write_document(tmp_path, "alpha.md", "Alpha", "## Overview\n\nAlpha now scores small business loans.\n")
+    with monkeypatch.context() as patch:
+        patch.setattr(embedding_gen, "generate_embeddings", lambda texts: 1 / 0)
+        with pytest.raises(ZeroDivisionError):
+            pipeline.ingest_file(revised, save=False)
+    
+    assert [chunk["text"] for chunk in vector_store.chunks] == before
+    assert vector_store.index.ntotal == len(before)
+
+
+def test_indexing_leaves_prepared_chunks_untouched(tmp_path, store_dir, embedding_gen):
+    import copy
+    vector_store = VectorStore()
+    pipeline = IngestionPipeline(embedding_gen=embedding_gen, vector_store=vector_store)
+    pipeline.ingest_file(write_document(tmp_path, "alpha.md", "Alpha", "## Overview\n\nAlpha scores retail credit applications.\n"), save=False)
+    
+    # The shared section repeats within the document and duplicates Alpha's
+    path = write_document(tmp_path, "beta.md", "Beta", SHARED_SECTION + "\n## Overview\n\nBeta forecasts commercial loan losses.\n")
+    prepared = prepare_document(pipeline.processor, pipeline.chunker, path)
+    before = copy.deepcopy(prepared.chunk_data)
+    pipeline.index_prepared(prepared, save=False)
+    
+    assert prepared.chunk_data == before
+    assert not any("minhash" in chunk for chunk in vector_store.chunks)
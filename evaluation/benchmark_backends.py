@@ -0,0 +1,186 @@
+"""
+Latency and quality parity benchmark for generation backends.
+Generates answers to the evaluation questions with each backend from the
+same retrieved context, and compares latency, expected-term containment
+and agreement with the reference (fp32 pipeline) answers.
+
+Usage:
+    python benchmark_backends.py --backends pipeline int8 onnx
+"""
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+import numpy as np
+from typing import List, Dict
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from rag import QAEngine, create_generation_backend
+from config import settings
+
+
+REFERENCE_BACKEND = "pipeline"
+
+
+def build_prompts(qa_engine: QAEngine, test_questions: List[Dict]) -> List[str]:
+    """Retrieve context once per question, so every backend sees the same prompts."""
+    prompts = []
+    for test_case in test_questions:
+        question = test_case["question"]
+        query_embedding = qa_engine.embedding_gen.generate_embedding(question)
+        reranked = qa_engine._retrieve(question, query_embedding, None, 5)
+        prompts.append(qa_engine._build_prompt(question, reranked))
+    return prompts
+
+
+def containment(answer: str, expected_terms: List[str]) -> float:
+    """Fraction of expected terms found in the answer."""
+    answer_lower = answer.lower()
+    return sum(term.lower() in answer_lower for term in expected_terms) / len(expected_terms)
+
+
+def token_f1(answer: str, reference: str) -> float:
+    """Token overlap F1 between an answer and the reference answer."""
+    answer_tokens = answer.lower().split()
+    reference_tokens = reference.lower().split()
+    if not answer_tokens or not reference_tokens:
+        return float(answer_tokens == reference_tokens)
+    
+    common = sum(
+        min(answer_tokens.count(token), reference_tokens.count(token))
+        for token in set(answer_tokens)
+    )
+    if common == 0:
+        return 0.0
+    
+    precision = common / len(answer_tokens)
+    recall = common / len(reference_tokens)
+    return 2 * precision * recall / (precision + recall)
+
+
+def benchmark_backend(
+    name: str,
+    prompts: List[str],
+    test_questions: List[Dict],
+    batch_size: int
+) -> Dict:
+    """Measure load time, per-prompt latency, batch throughput and containment."""
+    start = time.time()
+    backend = create_generation_backend(name)
+    load_time = time.time() - start
+    
+    # Warm up (first call includes lazy initialisation)
+    backend.generate(prompts[:1])
+    
+    answers = []
+    latencies = []
+    for prompt in prompts:
+        start = time.time()
+        answers.append(backend.generate([prompt])[0])
+        latencies.append(time.time() - start)
+    
+    start = time.time()
+    for i in range(0, len(prompts), batch_size):
+        backend.generate(prompts[i:i + batch_size])
+    batch_time = time.time() - start
+    
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "backend": name,
+        "load_time": load_time,
+        "latency_ms_mean": float(latencies_ms.mean()),
+        "latency_ms_p50": float(np.percentile(latencies_ms, 50)),
+        "latency_ms_p95": float(np.percentile(latencies_ms, 95)),
+        "batched_prompts_per_second": len(prompts) / batch_time,
+        "avg_containment_score": float(np.mean([
+            containment(answer, test_case["expected_answer_contains"])
+            for answer, test_case in zip(answers, test_questions)
+        ])),
+        "answers": answers
+    }
+
+
+def run_benchmark(backends: List[str], batch_size: int):
+    """Run the parity benchmark over the evaluation questions."""
+    print("=" * 60)
+    print("Axiom Generation Backend Benchmark")
+    print("=" * 60)
+    print()
+    
+    test_file = Path(__file__).parent / "test_questions.json"
+    with open(test_file, 'r') as f:
+        test_questions = json.load(f)
+    
+    print(f"Loaded {len(test_questions)} test questions")
+    
+    # Retrieval is shared; the reference backend is also used for parity
+    if REFERENCE_BACKEND not in backends:
+        backends = [REFERENCE_BACKEND] + backends
+    
+    qa_engine = QAEngine(generator=create_generation_backend(REFERENCE_BACKEND))
+    prompts = build_prompts(qa_engine, test_questions)
+    print(f"Built {len(prompts)} prompts")
+    print()
+    
+    results = {}
+    for name in backends:
+        print(f"Benchmarking {name} backend...")
+        try:
+            results[name] = benchmark_backend(name, prompts, test_questions, batch_size)
+        except Exception as e:
+            print(f"  ✗ ERROR: {str(e)}")
+    
+    reference = results.get(REFERENCE_BACKEND)
+    for result in results.values():
+        if reference is None:
+            continue
+        pairs = list(zip(result["answers"], reference["answers"]))
+        result["exact_match_vs_reference"] = float(np.mean([a == r for a, r in pairs]))
+        result["token_f1_vs_reference"] = float(np.mean([token_f1(a, r) for a, r in pairs]))
+        result["speedup_vs_reference"] = reference["latency_ms_mean"] / result["latency_ms_mean"]
+    
+    print()
+    print("=" * 60)
+    print("Benchmark Results")
+    print("=" * 60)
+    print(f"{'backend':<10}{'load s':>8}{'mean ms':>10}{'p95 ms':>10}{'batch/s':>9}"
+          f"{'contain':>9}{'exact':>7}{'F1':>6}{'speedup':>9}")
+    for name, result in results.items():
+        print(f"{name:<10}{result['load_time']:>8.1f}{result['latency_ms_mean']:>10.0f}"
+              f"{result['latency_ms_p95']:>10.0f}{result['batched_prompts_per_second']:>9.2f}"
+              f"{result['avg_containment_score']:>9.2f}"
+              f"{result.get('exact_match_vs_reference', 0.0):>7.2f}"
+              f"{result.get('token_f1_vs_reference', 0.0):>6.2f}"
+              f"{result.get('speedup_vs_reference', 0.0):>8.2f}x")
+    
+    results_file = Path(__file__).parent / "backend_benchmark_results.json"
+    with open(results_file, 'w') as f:
+        json.dump(results, f, indent=2)
+    
+    print(f"\n💾 Detailed results saved to: {results_file}")
+    print()
+    
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark generation backends.")
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=["pipeline", "int8", "onnx"],
+        help="Backends to compare"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=settings.GENERATION_MAX_BATCH_SIZE,
+        help="Batch size for the throughput measurement"
+    )
+    args = parser.parse_args()
+    
+    run_benchmark(args.backends, args.batch_size)
@@ -0,0 +1,198 @@
+"""
+Local multi-process harness for read-replica snapshot distribution.
+Runs one writer process and several replica processes, each with its own
+vector store directory (standing in for separate nodes) and sharing only the
+bundle directory. Checks that replicas converge on every published version,
+reject a corrupted bundle while still serving the previous one, and return
+the writer's search results.
+
+Usage:
+    python replication_harness.py --replicas 3
+"""
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import multiprocessing as mp
+from pathlib import Path
+import numpy as np
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+
+DIMENSION = 64
+CHUNKS_PER_ROUND = 50
+QUERY_COUNT = 10
+TOP_K = 5
+
+
+def configure(root: Path, node: str):
+    """Point this process's settings at its own node directory."""
+    from config import settings
+    settings.VECTOR_STORE_DIR = root / node
+    settings.SNAPSHOT_BUNDLE_DIR = root / "bundles"
+    settings.VECTOR_DIMENSION = DIMENSION
+    return settings
+
+
+def queries() -> np.ndarray:
+    return np.random.default_rng(1).standard_normal((QUERY_COUNT, DIMENSION)).astype(np.float32)
+
+
+def search_ids(vector_store) -> list:
+    return [
+        [result.chunk_id for result in results]
+        for results in vector_store.search_batch(queries().tolist(), TOP_K)
+    ]
+
+
+def writer(root: Path, first_round: int, rounds: int, results: mp.Queue):
+    """Ingest a batch of chunks per round; every save publishes a bundle."""
+    configure(root, "writer")
+    from retrieval.vector_store import VectorStore
+    
+    vector_store = VectorStore()
+    vector_store.load()
+    rng = np.random.default_rng(first_round)
+    
+    for round_number in range(first_round, first_round + rounds):
+        chunks = [
+            {"chunk_id": f"r{round_number}-{i}", "text": f"chunk {i}", "section_title": ""}
+            for i in range(CHUNKS_PER_ROUND)
+        ]
+        embeddings = rng.standard_normal((CHUNKS_PER_ROUND, DIMENSION)).astype(np.float32)
+        vector_store.add_documents(embeddings.tolist(), chunks, [{"round": round_number}] * CHUNKS_PER_ROUND)
+        vector_store.save()
+        time.sleep(0.2)
+    
+    results.put(("writer", vector_store.get_stats()["store_version"], search_ids(vector_store)))
+
+
+def replica(root: Path, name: str, interval: float, status: mp.Queue, stop: mp.Event):
+    """Pull bundles until stopped, reporting every change of state."""
+    settings = configure(root, name)
+    settings.REPLICA_MODE = True
+    from retrieval.vector_store import VectorStore
+    from retrieval.snapshot_bundles import SnapshotReplica
+    
+    vector_store = VectorStore()
+    vector_store.read_only = True
+    puller = SnapshotReplica(vector_store)
+    puller.start(interval)
+    
+    reported = None
+    while not stop.wait(interval / 2):
+        state = (puller.version, puller.rejected)
+        if state != reported:
+            reported = state
+            status.put((name, puller.version, puller.rejected, None))
+    
+    puller.stop()
+    try:
+        vector_store.add_documents([[0.0] * DIMENSION], [{}], [{}])
+        writable = True
+    except RuntimeError:
+        writable = False
+    status.put((name, puller.version, puller.rejected, (search_ids(vector_store), writable)))
+
+
+def wait_for(states: dict, names: list, status: mp.Queue, condition, timeout: float = 30.0):
+    """Consume status updates until condition holds for every replica."""
+    deadline = time.time() + timeout
+    while not all(condition(states.get(name)) for name in names):
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise TimeoutError(f"Replicas did not converge: {states}")
+        name, version, rejected, final = status.get(timeout=remaining)
+        states[name] = (version, rejected, final)
+
+
+def corrupt_bundle(root: Path, version: int):
+    """Publish a copy of the newest bundle under a new version, with a flipped byte."""
+    from retrieval.snapshot_bundles import bundle_name, list_bundles
+    
+    bundle_dir = root / "bundles"
+    _, latest = list_bundles(bundle_dir)[-1]
+    staging = bundle_dir / ".corrupt.tmp"
+    shutil.copytree(latest, staging)
+    with open(staging / "vector_store.pkl", 'r+b') as f:
+        f.seek(10)
+        byte = f.read(1)
+        f.seek(10)
+        f.write(bytes([byte[0] ^ 0xFF]))
+    target = bundle_dir / bundle_name(version)
+    staging.rename(target)
+    return target
+
+
+def run_harness(replicas: int, interval: float) -> bool:
+    """Run every phase and report whether all checks passed."""
+    ctx = mp.get_context("spawn")
+    root = Path(tempfile.mkdtemp(prefix="replication-"))
+    status, results, stop = ctx.Queue(), ctx.Queue(), ctx.Event()
+    names = [f"replica-{i}" for i in range(replicas)]
+    states = {}
+    checks = []
+    
+    processes = [ctx.Process(target=replica, args=(root, name, interval, status, stop)) for name in names]
+    for process in processes:
+        process.start()
+    
+    try:
+        # Phase 1: two published versions
+        process = ctx.Process(target=writer, args=(root, 1, 2, results))
+        process.start()
+        process.join()
+        version, _ = results.get()[1:]
+        wait_for(states, names, status, lambda s: s is not None and s[0] == version)
+        checks.append((f"replicas converge on v{version}", True))
+        
+        # Phase 2: a corrupted bundle is rejected, the previous version keeps serving
+        corrupted = corrupt_bundle(root, version + 1)
+        wait_for(states, names, status, lambda s: s is not None and s[1] > 0)
+        checks.append(("corrupted bundle rejected", all(states[name][0] == version for name in names)))
+        shutil.rmtree(corrupted)
+        
+        # Phase 3: the writer continues; replicas follow
+        process = ctx.Process(target=writer, args=(root, 3, 2, results))
+        process.start()
+        process.join()
+        version, expected = results.get()[1:]
+        wait_for(states, names, status, lambda s: s is not None and s[0] == version)
+        checks.append((f"replicas converge on v{version}", True))
+        
+        stop.set()
+        wait_for(states, names, status, lambda s: s is not None and s[2] is not None)
+        checks.append(("search results match the writer", all(states[name][2][0] == expected for name in names)))
+        checks.append(("replicas reject writes", not any(states[name][2][1] for name in names)))
+    except TimeoutError as e:
+        checks.append((str(e), False))
+    finally:
+        stop.set()
+        for process in processes:
+            process.join(timeout=10)
+        shutil.rmtree(root, ignore_errors=True)
+    
+    print("\n" + "=" * 60)
+    print("REPLICATION HARNESS")
+    print("=" * 60)
+    for description, passed in checks:
+        print(f"  {'✓' if passed else '✗'} {description}")
+    
+    return all(passed for _, passed in checks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-process read-replica harness")
+    parser.add_argument("--replicas", type=int, default=3, help="Replica processes")
+    parser.add_argument("--interval", type=float, default=0.2, help="Seconds between replica pulls")
+    args = parser.parse_args()
+    
+    sys.exit(0 if run_harness(args.replicas, args.interval) else 1)
+
+
+if __name__ == "__main__":
+    main()